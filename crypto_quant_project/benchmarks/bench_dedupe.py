@@ -0,0 +1,56 @@
+"""
+近重复合并耗时基准：N条推文（含一定比例的转发/改写）一次collapse的耗时。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_dedupe --items 5000 --dup-ratio 0.3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.dedupe import NearDuplicateIndex, simhash_fingerprints
+
+WORDS = ("bitcoin ethereum solana etf sec approval pump dump moon bear bull whale hack fed rate cut "
+         "price new high low market crypto exchange listing token airdrop halving miners liquidation").split()
+
+
+def make_corpus(n, dup_ratio, seed=42):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        if texts and rng.random() < dup_ratio:
+            base = rng.choice(texts)
+            texts.append(rng.choice([f"RT @user{rng.randint(1, 99)}: {base}", base.upper(), base + " 🚀"]))
+        else:
+            texts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 40))))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="近重复合并耗时基准")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--dup-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = make_corpus(args.items, args.dup_ratio)
+    fp_times, collapse_times = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        simhash_fingerprints(texts)
+        fp_times.append(time.perf_counter() - start)
+        index = NearDuplicateIndex()
+        start = time.perf_counter()
+        clusters = index.collapse(texts)
+        collapse_times.append(time.perf_counter() - start)
+    print(f"条数: {args.items}，重复比例: {args.dup_ratio}")
+    print(f"SimHash指纹: {min(fp_times) * 1000:.1f}ms")
+    print(f"collapse总耗时: {min(collapse_times) * 1000:.1f}ms -> {len(clusters)} 簇")
+
+
+if __name__ == '__main__':
+    main()
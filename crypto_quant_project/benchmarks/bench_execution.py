@@ -0,0 +1,88 @@
+"""
+信号到下单延迟基准：对进程内假交易所（benchmarks/fake_exchange.py，可配置往返延迟）比较
+  sync      原有路径：每个信号通过 TradingStrategy.execute 依次同步下单，市场信息在第一次下单时才加载
+  executor  core.execution.OrderExecutor：启动时预热市场信息，本地预校验，多个币种合并为一次 create_orders 后台提交
+每轮所有币种的信号同时翻转（BUY/SELL交替），统计每笔订单从信号产生到交易所确认的延迟。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_execution --symbols 3 --rounds 20 --latency 0.05 --markets-latency 0.3
+"""
+import argparse
+import configparser
+import json
+import time
+
+import numpy as np
+
+from benchmarks.fake_exchange import DEFAULT_MARKETS, FakeExchange
+from core.exchange import ExchangeManager
+from core.execution import OrderExecutor
+from core.strategy import TradingStrategy
+from utils.logger import silenced
+
+
+def run_sync(symbols, rounds, latency, markets_latency, trade_size):
+    exchange = FakeExchange(latency=latency, markets_latency=markets_latency)
+    config = configparser.ConfigParser()
+    config['API'] = {}
+    with silenced():
+        manager = ExchangeManager(config=config)
+    manager.exchanges['fake'] = exchange
+    strategy = TradingStrategy(manager, trade_size)
+    latencies = []
+    with silenced():
+        for i in range(rounds):
+            signal_time = time.monotonic()
+            for symbol in symbols:
+                strategy.execute('BUY' if i % 2 == 0 else 'SELL', 'fake', symbol)
+                latencies.append(time.monotonic() - signal_time)
+    return latencies, exchange.requests
+
+
+def run_executor(symbols, rounds, latency, markets_latency, trade_size, batch=True):
+    exchange = FakeExchange(latency=latency, markets_latency=markets_latency, supports_batch=batch)
+    executor = OrderExecutor({'fake': exchange}, {s.split('/')[0]: s for s in symbols}, trade_size=trade_size)
+    latencies = []
+    with silenced():
+        executor.warm_up()  # 启动时完成，不计入信号路径
+        for i in range(rounds):
+            signal = 'BUY' if i % 2 == 0 else 'SELL'
+            futures = executor.execute_signals({s.split('/')[0]: signal for s in symbols})
+            latencies.extend(order.latency for future in futures for order in future.result())
+        executor.close()
+    return latencies, exchange.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="信号到下单延迟基准（假交易所）")
+    parser.add_argument("--symbols", type=int, default=3, help=f"同时出信号的币种数（最多{len(DEFAULT_MARKETS)}）")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="每次请求的往返延迟（秒）")
+    parser.add_argument("--markets-latency", type=float, default=0.3, help="load_markets 的耗时（秒）")
+    parser.add_argument("--trade-size", type=float, default=0.01)
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    symbols = list(DEFAULT_MARKETS)[:args.symbols]
+    report = {'symbols': symbols, 'rounds': args.rounds, 'latency': args.latency, 'modes': {}}
+    modes = {
+        'sync': lambda: run_sync(symbols, args.rounds, args.latency, args.markets_latency, args.trade_size),
+        'executor': lambda: run_executor(symbols, args.rounds, args.latency, args.markets_latency, args.trade_size),
+        'executor_nobatch': lambda: run_executor(symbols, args.rounds, args.latency, args.markets_latency,
+                                                 args.trade_size, batch=False),
+    }
+    print(f"{'模式':<18} {'p50':>9} {'p90':>9} {'max':>9}  请求数")
+    for name, run in modes.items():
+        latencies, requests = run()
+        ms = np.asarray(latencies) * 1000
+        stats = {'p50_ms': float(np.percentile(ms, 50)), 'p90_ms': float(np.percentile(ms, 90)),
+                 'max_ms': float(ms.max()), 'requests': requests}
+        report['modes'][name] = stats
+        print(f"{name:<18} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms  {requests}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+RSS解析耗时基准：对同一份大feed比较
+  feedparser     原解析路径（feedparser.parse 构建全部条目）
+  stream         流式解析全部条目（格式与feedparser路径一致）
+  stream_max     流式解析，取到 --max-items 条即停止（Home时间线每轮只取前20条）
+  stream_seen    流式解析，遇到已处理的推文即停止（前 --new 条为新推文，其余已处理）
+每种方式重复 --repeat 次，报告 p50/p90 耗时与返回条数。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_feed_parse --items 200,1000,5000 --payload 300
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import build_rss
+from rsshub_twitter_fetcher import RssHubTwitterFetcher
+
+
+def time_parse(parse, repeat):
+    times, count = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(parse())
+        times.append(time.perf_counter() - start)
+    ms = np.asarray(times) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p90_ms': float(np.percentile(ms, 90)), 'items': count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="feedparser vs 流式提前停止解析耗时对比")
+    parser.add_argument("--items", default="200,1000,5000", help="feed条目数，逗号分隔")
+    parser.add_argument("--payload", type=int, default=300, help="每条推文正文的填充字节数")
+    parser.add_argument("--max-items", type=int, default=20)
+    parser.add_argument("--new", type=int, default=5, help="stream_seen 中未处理的推文数")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    report = {'payload': args.payload, 'max_items': args.max_items, 'new': args.new, 'feeds': {}}
+    print(f"{'条目数':<8} {'大小':>8}  {'方式':<12} {'p50':>9} {'p90':>9}  条数  加速比(p50)")
+    for n in (int(x) for x in args.items.split(',')):
+        content = build_rss('home', n, payload_bytes=args.payload)
+        seen = {f"https://twitter.com/home/status/{i}" for i in range(args.new, n)}
+        fetcher = RssHubTwitterFetcher('http://localhost:1200/twitter/home_latest')
+        seen_fetcher = RssHubTwitterFetcher('http://localhost:1200/twitter/home_latest', seen=seen)
+        modes = {
+            'feedparser': lambda: RssHubTwitterFetcher._parse(content, {}),
+            'stream': lambda: fetcher._parse_fast(content)[0],
+            'stream_max': lambda: fetcher._parse_fast(content, max_items=args.max_items)[0],
+            'stream_seen': lambda: seen_fetcher._parse_fast(content)[0],
+        }
+        results = {name: time_parse(parse, args.repeat) for name, parse in modes.items()}
+        report['feeds'][n] = {'bytes': len(content), 'modes': results}
+        baseline = results['feedparser']['p50_ms']
+        for name, stats in results.items():
+            print(f"{n:<8} {len(content) / 1024:>6.0f}KB  {name:<12} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms"
+                  f"  {stats['items']:>4}  {baseline / stats['p50_ms']:.1f}x")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+对比VIP用户抓取的串行路径与并发路径耗时。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_fetch_concurrency --users 40 --latency 0.5
+    python -m benchmarks.bench_fetch_concurrency --users 40 --latency 0.5 --instances 3   # RSSHub实例池
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.resource_fetcher import ResourceFetcher
+
+
+def make_fetcher(base_urls, max_workers, per_host_limit, timeout):
+    with tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False) as f:
+        f.write(f"""[Cache]
+FEED_CACHE = false
+
+[Fetch]
+RSSHUB_BASE_URLS = {', '.join(base_urls)}
+MAX_WORKERS = {max_workers}
+PER_HOST_LIMIT = {per_host_limit}
+TIMEOUT = {timeout}
+""")
+        path = f.name
+    try:
+        return ResourceFetcher(config_file=path)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="串行 vs 并发 VIP 抓取耗时对比")
+    parser.add_argument("--users", type=int, default=40, help="VIP用户数量")
+    parser.add_argument("--latency", type=float, default=0.5, help="假RSSHub单请求延迟（秒）")
+    parser.add_argument("--items", type=int, default=20, help="每个feed的条目数")
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--per-host-limit", type=int, default=8)
+    parser.add_argument("--instances", type=int, default=1, help="假RSSHub实例数（用户按一致性哈希分片）")
+    args = parser.parse_args()
+
+    users = [f"user{i}" for i in range(args.users)]
+    with contextlib.ExitStack() as stack:
+        hubs = [stack.enter_context(FakeRssHub(latency=args.latency, items_per_feed=args.items))
+                for _ in range(args.instances)]
+        fetcher = make_fetcher([hub.base_url for hub in hubs], args.max_workers, args.per_host_limit, timeout=10)
+
+        start = time.perf_counter()
+        serial = fetcher.fetch_nitter_rss(users)
+        serial_time = time.perf_counter() - start
+
+        for hub in hubs:
+            hub.max_in_flight = 0
+        start = time.perf_counter()
+        concurrent = fetcher.fetch_nitter_rss_concurrent(users)
+        concurrent_time = time.perf_counter() - start
+
+    assert [t['url'] for t in serial] == [t['url'] for t in concurrent], "concurrent result order differs"
+    print("\n=== 抓取耗时对比 ===")
+    print(f"用户数: {args.users}，单请求延迟: {args.latency}s，每host并发上限: {args.per_host_limit}，"
+          f"RSSHub实例数: {args.instances}")
+    print(f"串行: {serial_time:.2f}s ({len(serial)} 条)")
+    print(f"并发: {concurrent_time:.2f}s ({len(concurrent)} 条，"
+          f"最大并发 {'/'.join(str(hub.max_in_flight) for hub in hubs)})")
+    print(f"加速比: {serial_time / concurrent_time:.1f}x")
+    for s in fetcher.rsshub_pool.stats():
+        print(f"  {s['instance']}: 请求 {s['requests']}，条目 {s['items']}，平均延迟 {s['latency_ms']}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+端到端流水线基准：本地假RSSHub + 假OpenAI兼容服务，测量不同VIP用户数与feed大小下
+每轮的总耗时、吞吐（条/秒）以及各阶段的 p50/p99，结果保存为JSON，便于不同版本间对比回归。
+
+阶段：
+  feed_request  单个feed的下载+解析（RssHubTwitterFetcher.fetch）
+  llm_request   单次LLM请求（含限流等待与重试；--stream 时只计到响应开始）
+  fetch         一轮的 aggregate_twitter_content（并发抓取、去重过滤）
+  analysis      一轮的打分与信号生成
+  cycle         一轮端到端
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_pipeline --users 5,20 --items 20,100 --cycles 5
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/bench_pipeline-abc1234.json
+    python -m benchmarks.bench_pipeline --mode prompt --llm-payload 3000 --llm-chunk-delay 0.002 --stream --compact
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.fake_rsshub import FakeRssHub
+from core.llm_analyzer import LLMAnalyzer
+from core.prescorer import PreScorer
+from core.resource_fetcher import ResourceFetcher
+from core.signal_engine import SignalEngine
+from main_twitter_llm import aggregate_twitter_content, generate_signal_from_llm, generate_symbol_signals
+from rsshub_twitter_fetcher import RssHubTwitterFetcher
+from utils.logger import silenced
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SYMBOLS = ['BTC', 'ETH']
+
+
+class StageTimer:
+    """按阶段收集耗时样本（线程安全）。"""
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def wrap(self, stage, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.time(stage):
+                return func(*args, **kwargs)
+        return timed
+
+    def summary(self):
+        result = {}
+        for stage, values in self.samples.items():
+            ms = np.asarray(values) * 1000
+            result[stage] = {'count': len(values), 'mean_ms': float(ms.mean()),
+                             'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99))}
+        return result
+
+
+def write_config(path, rsshub_url, llm_url, args):
+    with open(path, 'w') as f:
+        f.write(f"""[Cache]
+FEED_CACHE = false
+LLM_CACHE = false
+
+[Fetch]
+RSSHUB_BASE_URL = {rsshub_url}
+MAX_WORKERS = {args.max_workers}
+PER_HOST_LIMIT = {args.per_host_limit}
+TIMEOUT = 10
+
+[LLM]
+DEEPSEEK_API_KEY = benchmark
+DEEPSEEK_API_BASE = {llm_url}
+RETRY_BASE_DELAY = 0.01
+REQUESTS_PER_MINUTE = 100000
+TOKENS_PER_MINUTE = 100000000
+STREAM = {str(args.stream).lower()}
+COMPACT_PROMPT = {str(args.compact).lower()}
+""")
+
+
+def run_case(users, items, args):
+    """一个（用户数, feed条数）组合：启动两个假服务，跑 args.cycles 轮，返回结果字典。"""
+    timer = StageTimer()
+    vip_users = [f"user{i}" for i in range(users)]
+    with FakeRssHub(latency=args.rss_latency, items_per_feed=items, error_rate=args.rss_error_rate,
+                    payload_bytes=args.rss_payload) as hub, \
+            FakeOpenAI(latency=args.llm_latency, error_rate=args.llm_error_rate,
+                       payload_bytes=args.llm_payload, stream_chunk_delay=args.llm_chunk_delay) as llm, \
+            tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        write_config(config_path, hub.base_url, llm.base_url, args)
+        fetcher = ResourceFetcher(config_file=config_path)
+        analyzer = LLMAnalyzer(config_file=config_path)
+        analyzer._create_completion = timer.wrap('llm_request', analyzer._create_completion)
+        # 关闭本地判定（阈值无穷大），让所有相关推文都经过LLM
+        prescorer = PreScorer(SYMBOLS, local_threshold=float('inf'))
+        engine = SignalEngine(SYMBOLS)
+        home_url = f"{hub.base_url}/twitter/home_latest"
+
+        original_fetch = RssHubTwitterFetcher.fetch
+        RssHubTwitterFetcher.fetch = timer.wrap('feed_request', original_fetch)
+        total_items = 0
+        try:
+            for _ in range(args.cycles):
+                with silenced(), timer.time('cycle'):
+                    # 每轮使用新的已处理集合，所有推文都按新推文处理
+                    with timer.time('fetch'):
+                        texts = aggregate_twitter_content(fetcher, vip_users, rsshub_url=home_url, max_items=items,
+                                                          tweet_log=set(), concurrent=True)
+                    with timer.time('analysis'):
+                        if args.mode == 'batch':
+                            generate_symbol_signals(analyzer, texts, SYMBOLS, engine, prescorer)
+                        else:
+                            generate_signal_from_llm(analyzer, texts, SYMBOLS)
+                total_items += len(texts)
+        finally:
+            RssHubTwitterFetcher.fetch = original_fetch
+        cycle_seconds = sum(timer.samples['cycle'])
+        return {
+            'users': users,
+            'items_per_feed': items,
+            'cycles': args.cycles,
+            'items': total_items,
+            'items_per_second': total_items / cycle_seconds if cycle_seconds else 0.0,
+            'stages': timer.summary(),
+            'rss_requests': hub.requests,
+            'rss_errors': hub.errors,
+            'llm_requests': llm.requests,
+            'llm_errors': llm.errors,
+        }
+
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    old_cases = {(c['users'], c['items_per_feed']): c for c in baseline['results']}
+    print(f"\n=== 与 {baseline.get('version', '?')} 对比（p50 比值，>1 表示变慢）===")
+    for case in current['results']:
+        old = old_cases.get((case['users'], case['items_per_feed']))
+        if old is None:
+            continue
+        ratios = [f"{stage} {case['stages'][stage]['p50_ms'] / old['stages'][stage]['p50_ms']:.2f}x"
+                  for stage in case['stages'] if stage in old['stages'] and old['stages'][stage]['p50_ms'] > 0]
+        print(f"users={case['users']:<4} items={case['items_per_feed']:<4} " + "  ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端流水线基准（假RSSHub + 假OpenAI兼容服务）")
+    parser.add_argument("--users", default="5,20", help="VIP用户数，逗号分隔的多个取值")
+    parser.add_argument("--items", default="20,100", help="每个feed的条目数，逗号分隔的多个取值")
+    parser.add_argument("--cycles", type=int, default=5, help="每个组合运行的轮数")
+    parser.add_argument("--mode", choices=['batch', 'prompt'], default='batch',
+                        help="batch: 按币种逐条打分；prompt: 整体prompt情绪分")
+    parser.add_argument("--rss-latency", type=float, default=0.05)
+    parser.add_argument("--rss-error-rate", type=float, default=0.0)
+    parser.add_argument("--rss-payload", type=int, default=0, help="每条推文的填充字节数")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-payload", type=int, default=0, help="每条结果reasoning的填充字节数")
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.0, help="流式响应每块之间的间隔（秒），模拟逐token生成")
+    parser.add_argument("--stream", action="store_true", help="prompt模式下使用流式响应，解析出分数后立即返回")
+    parser.add_argument("--compact", action="store_true", help="prompt模式下使用精简prompt（不要求reasoning）")
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--per-host-limit", type=int, default=8)
+    parser.add_argument("--output", help="结果JSON路径，默认 benchmarks/results/bench_pipeline-<git版本>.json")
+    parser.add_argument("--compare", help="与之前保存的结果JSON对比")
+    args = parser.parse_args()
+
+    version = git_version()
+    report = {'version': version, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}, 'results': []}
+    print(f"{'users':>5} {'items':>5} {'条/秒':>8} {'cycle p50':>10} {'cycle p99':>10} "
+          f"{'feed p50':>9} {'feed p99':>9} {'llm p50':>9} {'llm p99':>9}")
+    for users in [int(u) for u in args.users.split(',')]:
+        for items in [int(i) for i in args.items.split(',')]:
+            case = run_case(users, items, args)
+            report['results'].append(case)
+            stages = case['stages']
+            llm = stages.get('llm_request', {'p50_ms': 0.0, 'p99_ms': 0.0})
+            print(f"{users:>5} {items:>5} {case['items_per_second']:>8.0f} "
+                  f"{stages['cycle']['p50_ms']:>8.0f}ms {stages['cycle']['p99_ms']:>8.0f}ms "
+                  f"{stages['feed_request']['p50_ms']:>7.0f}ms {stages['feed_request']['p99_ms']:>7.0f}ms "
+                  f"{llm['p50_ms']:>7.0f}ms {llm['p99_ms']:>7.0f}ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_pipeline-{version}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
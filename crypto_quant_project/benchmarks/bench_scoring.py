@@ -0,0 +1,95 @@
+"""
+离线批量情绪打分基准：生成合成的推文CSV（与抓取脚本输出的 tweets.csv 同列），比较
+  textblob   逐行 TextBlob(text).sentiment（只测前 --textblob-rows 行，按速度折算）
+  bulk-1     core.analysis.score_corpus 单进程（分块流式读取 + 向量化词典打分）
+  bulk-N     同上，N 个进程
+每种方式在独立子进程中运行，报告吞吐（条/s）与进程峰值内存（RSS），用于验证内存不随语料规模增长。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_scoring --rows 200000,1000000 --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+WORDS = ['btc', 'eth', 'bullish', 'bearish', 'breakout', 'crash', 'moon', 'dump', 'the', 'market', 'is', 'not',
+         'great', 'terrible', 'today', 'fed', 'rate', 'cut', 'etf', 'approved', 'whales', 'buying', 'selling', 'gm']
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {project!r})
+mode, path, out, workers, chunksize, limit = {args!r}
+start = time.perf_counter()
+if mode == 'textblob':
+    import csv
+    from textblob import TextBlob
+    rows = 0
+    with open(path, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            TextBlob(row['text']).sentiment
+            rows += 1
+            if rows >= limit:
+                break
+else:
+    from core.analysis import iter_csv_chunks, score_corpus
+    from utils.logger import silenced
+    with silenced():
+        rows = score_corpus(iter_csv_chunks(path, chunksize), out, workers=workers)['rows']
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+print(json.dumps({{'rows': rows, 'seconds': time.perf_counter() - start, 'peak_mb': peak_kb / 1024}}))
+"""
+
+
+def write_corpus(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['created_at', 'user', 'text'])
+        for i in range(rows):
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+            writer.writerow([f"2025-06-{1 + i % 28:02d}T{i % 24:02d}:00:00Z", f"user{i % 500}", text])
+
+
+def run(mode, path, out, workers, chunksize, limit):
+    code = CHILD.format(project=PROJECT_DIR, args=(mode, path, out, workers, chunksize, limit))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=PROJECT_DIR).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线批量情绪打分基准")
+    parser.add_argument("--rows", default="200000", help="语料行数，逗号分隔多个规模")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=20000)
+    parser.add_argument("--textblob-rows", type=int, default=5000)
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    report = []
+    print(f"{'行数':>9} {'方式':<10} {'条/s':>10} {'峰值内存':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(r) for r in args.rows.split(',')):
+            path = os.path.join(tmp, f'corpus-{rows}.csv')
+            write_corpus(path, rows)
+            modes = [('textblob', 1), ('bulk-1', 1), (f'bulk-{args.workers}', args.workers)]
+            for name, workers in modes:
+                result = run(name.split('-')[0], path, os.path.join(tmp, name), workers, args.chunksize,
+                             args.textblob_rows)
+                rate = result['rows'] / result['seconds'] if result['seconds'] > 0 else 0.0
+                report.append(dict(result, corpus_rows=rows, mode=name, rows_per_second=rate))
+                print(f"{rows:>9} {name:<10} {rate:>10.0f} {result['peak_mb']:>8.0f}MB")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+启动耗时基准：在全新的Python进程中测量
+  import    导入 main_twitter_llm 与 pipeline_daemon
+  config    第一次与第二次 load_config（第二次应命中缓存）
+  clients   创建 ResourceFetcher + LLMAnalyzer
+  process   进程从启动到退出的总耗时（含解释器启动）
+并列出启动阶段已加载的重量级依赖（openai / praw / feedparser / requests），
+用于守护进程被supervisor频繁重启的场景。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ('openai', 'praw', 'feedparser', 'requests')
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {project!r})
+t0 = time.perf_counter()
+import main_twitter_llm, pipeline_daemon
+t1 = time.perf_counter()
+from core.config import load_config
+config = load_config({config!r})
+t2 = time.perf_counter()
+load_config({config!r})
+t3 = time.perf_counter()
+from core.resource_fetcher import ResourceFetcher
+from core.llm_analyzer import LLMAnalyzer
+ResourceFetcher(config=config)
+LLMAnalyzer(config=config)
+t4 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'config': t2 - t1, 'config_cached': t3 - t2, 'clients': t4 - t3,
+                  'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def write_config(path):
+    with open(path, 'w') as f:
+        f.write("[Trading]\nSYMBOLS = BTC/USDT, ETH/USDT\n"
+                "[Users]\nVIP_USERS = alice, bob\n"
+                "[Cache]\nFEED_CACHE = false\nLLM_CACHE = false\n"
+                "[LLM]\nDEEPSEEK_API_KEY = benchmark\nDEEPSEEK_API_BASE = http://127.0.0.1:9/v1\n")
+
+
+def run_once(config_path):
+    code = CHILD.format(project=PROJECT_DIR, config=config_path, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=PROJECT_DIR).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准（全新进程）")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'config.ini')
+        write_config(config_path)
+        run_once(config_path)  # 预热（磁盘缓存、.pyc）
+        runs = [run_once(config_path) for _ in range(args.runs)]
+
+    report = {'runs': args.runs, 'loaded_at_startup': runs[-1]['loaded'], 'stages': {}}
+    print(f"{'阶段':<14} {'p50':>9} {'p90':>9}")
+    for stage in ('import', 'config', 'config_cached', 'clients', 'process'):
+        ms = np.asarray([r[stage] for r in runs]) * 1000
+        report['stages'][stage] = {'p50_ms': float(np.percentile(ms, 50)), 'p90_ms': float(np.percentile(ms, 90))}
+        print(f"{stage:<14} {report['stages'][stage]['p50_ms']:>7.1f}ms {report['stages'][stage]['p90_ms']:>7.1f}ms")
+    print(f"\n启动阶段已加载的重量级依赖: {', '.join(report['loaded_at_startup']) or '无'}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
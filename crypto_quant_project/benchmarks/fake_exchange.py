@@ -0,0 +1,95 @@
+"""
+进程内的假交易所（接口与 ccxt 的同步交易所对象一致的子集），用于离线测试与下单延迟基准。
+
+实现 load_markets / amount_to_precision / fetch_ticker / fetch_balance / create_order / create_orders：
+  - 市场信息含精度（TICK_SIZE 模式）与最小下单量、最小下单金额限制；
+  - 每次请求先睡眠 ``latency`` 秒（load_markets 为 ``markets_latency`` 秒），模拟网络往返；
+  - 与 ccxt 一样，未预加载市场时第一次下单会先隐式调用 load_markets；
+  - ``requests`` 按方法名统计请求次数，``orders`` 保存收到的全部订单。
+"""
+import itertools
+import math
+import threading
+import time
+
+DEFAULT_MARKETS = {
+    'BTC/USDT': {'price': 60000.0, 'amount_step': 0.00001, 'min_amount': 0.00001, 'min_cost': 5.0},
+    'ETH/USDT': {'price': 3000.0, 'amount_step': 0.0001, 'min_amount': 0.0001, 'min_cost': 5.0},
+    'SOL/USDT': {'price': 150.0, 'amount_step': 0.001, 'min_amount': 0.001, 'min_cost': 5.0},
+}
+
+
+class FakeExchange:
+    def __init__(self, latency=0.0, markets_latency=0.0, specs=None, supports_batch=True, exchange_id='fake'):
+        self.id = exchange_id
+        self.latency = latency
+        self.markets_latency = markets_latency
+        self.specs = dict(specs or DEFAULT_MARKETS)
+        self.has = {'createOrders': supports_batch, 'fetchOHLCV': False}
+        self.markets = None
+        self.requests = {}
+        self.orders = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _request(self, method, delay):
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+        if delay:
+            time.sleep(delay)
+
+    def load_markets(self, reload=False):
+        if self.markets is not None and not reload:
+            return self.markets
+        self._request('load_markets', self.markets_latency)
+        base_quote = (s.split('/') for s in self.specs)
+        self.markets = {
+            symbol: {'symbol': symbol, 'base': base, 'quote': quote, 'active': True, 'spot': True,
+                     'precision': {'amount': spec['amount_step'], 'price': 0.01},
+                     'limits': {'amount': {'min': spec['min_amount'], 'max': 10000.0},
+                                'cost': {'min': spec['min_cost'], 'max': None}}}
+            for (symbol, spec), (base, quote) in zip(self.specs.items(), base_quote)}
+        return self.markets
+
+    def amount_to_precision(self, symbol, amount):
+        step = self.load_markets()[symbol]['precision']['amount']
+        rounded = math.floor(amount / step + 1e-9) * step
+        if rounded <= 0:
+            raise ValueError(f"amount of {symbol} must be greater than minimum amount precision of {step}")
+        return f"{rounded:.{max(0, -int(math.floor(math.log10(step))))}f}"
+
+    def fetch_ticker(self, symbol):
+        self._request('fetch_ticker', self.latency)
+        return {'symbol': symbol, 'last': self.specs[symbol]['price']}
+
+    def fetch_balance(self):
+        self._request('fetch_balance', self.latency)
+        return {'free': {}, 'total': {}}
+
+    def _fill(self, symbol, type, side, amount, price):
+        market = self.load_markets()[symbol]
+        fill_price = price if type == 'limit' and price else self.specs[symbol]['price']
+        if amount < market['limits']['amount']['min'] or amount * fill_price < market['limits']['cost']['min']:
+            raise ValueError(f"{symbol} order below exchange limits")
+        order = {'id': str(next(self._ids)), 'symbol': symbol, 'type': type, 'side': side, 'amount': amount,
+                 'filled': amount, 'price': fill_price, 'average': fill_price, 'cost': amount * fill_price,
+                 'status': 'closed', 'timestamp': int(time.time() * 1000)}
+        with self._lock:
+            self.orders.append(order)
+        return order
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.load_markets()
+        self._request('create_order', self.latency)
+        return self._fill(symbol, type, side, amount, price)
+
+    def create_orders(self, orders, params=None):
+        if not self.has['createOrders']:
+            raise NotSupported(f"{self.id} createOrders() is not supported")
+        self.load_markets()
+        self._request('create_orders', self.latency)
+        return [self._fill(o['symbol'], o['type'], o['side'], o['amount'], o.get('price')) for o in orders]
+
+
+class NotSupported(Exception):
+    """Same class name as ccxt.NotSupported."""
@@ -0,0 +1,185 @@
+"""
+本地假 OpenAI 兼容 Chat Completions 服务（DeepSeek 同协议），用于离线测试与基准测试。
+
+路由：
+  POST /v1/chat/completions 及 /chat/completions
+每个请求先睡眠 ``latency`` 秒；按 ``error_rate`` 的概率返回429（带 Retry-After: 0）或500；
+``payload_bytes`` 为每条结果的 reasoning 填充长度，用于模拟较大的响应。
+请求带 "stream": true 时以SSE分块返回（每块 ``stream_chunk_chars`` 个字符，块间隔 ``stream_chunk_delay`` 秒，
+模拟逐token生成，非流式请求则等待同样的总生成时间后一次返回）；客户端提前断开时停止发送，``cancelled_streams`` 记录被提前取消的流数。
+
+返回内容与 LLMAnalyzer 的两种prompt对应：
+  - 批量prompt（含 JSON 行 {"id": ..., "text": ...}）返回 {"results": [...]}，每个id一条；
+  - 其他prompt返回单个 {"sentiment_score", "confidence", "reasoning"}。
+情绪分由文本内容的哈希确定，同一文本每次结果相同。
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_score(text):
+    """文本 -> [-1, 1] 之间确定性的情绪分。"""
+    digest = hashlib.md5(text.encode("utf-8")).digest()
+    return round(int.from_bytes(digest[:4], "little") / 0xFFFFFFFF * 2 - 1, 3)
+
+
+def build_answer(prompt, payload_bytes=0):
+    reasoning = ("synthetic " * (payload_bytes // 10 + 1))[:payload_bytes]
+    results = []
+    for line in prompt.splitlines():
+        line = line.strip()
+        if not (line.startswith("{") and '"id"' in line):
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+        results.append({"id": item.get("id"), "sentiment_score": fake_score(item.get("text", "")),
+                        "confidence": 0.8, "reasoning": reasoning})
+    if results:
+        return {"results": results}
+    return {"sentiment_score": fake_score(prompt), "confidence": 0.8, "reasoning": reasoning}
+
+
+class FakeOpenAI:
+    """
+    在后台线程中运行的假 Chat Completions 服务，可用作上下文管理器。
+
+    ``base_url`` 可直接作为 [LLM] DEEPSEEK_API_BASE 使用；``requests`` / ``errors`` 记录总请求数
+    与注入的错误数，``max_in_flight`` 记录观察到的最大并发请求数。
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, payload_bytes=0, host="127.0.0.1", port=0, seed=0,
+                 stream_chunk_chars=8, stream_chunk_delay=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_delay = stream_chunk_delay
+        self.cancelled_streams = 0
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _make_handler(self):
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status, payload, headers=()):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, request_id, model, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                pieces = [content[i:i + hub.stream_chunk_chars] for i in range(0, len(content), hub.stream_chunk_chars)]
+                try:
+                    for i, piece in enumerate(pieces + [None]):
+                        chunk = {"id": request_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                                 "model": model, "choices": [{"index": 0, "delta": {} if piece is None else {"content": piece},
+                                                              "finish_reason": "stop" if piece is None else None}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                        if hub.stream_chunk_delay and piece is not None:
+                            time.sleep(hub.stream_chunk_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    with hub._lock:
+                        hub.cancelled_streams += 1
+
+            def do_POST(self):
+                with hub._lock:
+                    hub.requests += 1
+                    hub.in_flight += 1
+                    hub.max_in_flight = max(hub.max_in_flight, hub.in_flight)
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                        self._send_json(404, {"error": {"message": "not found"}})
+                        return
+                    if hub.latency:
+                        time.sleep(hub.latency)
+                    with hub._lock:
+                        fail = hub.error_rate and hub._random.random() < hub.error_rate
+                        if fail:
+                            hub.errors += 1
+                            rate_limited = hub._random.random() < 0.5
+                    if fail:
+                        if rate_limited:
+                            self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                                            headers=[("Retry-After", "0")])
+                        else:
+                            self._send_json(500, {"error": {"message": "internal error", "type": "server_error"}})
+                        return
+                    prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+                    content = json.dumps(build_answer(prompt, hub.payload_bytes), ensure_ascii=False)
+                    if request.get("stream"):
+                        self._send_stream(f"chatcmpl-{hub.requests}", request.get("model", "fake"), content)
+                        return
+                    if hub.stream_chunk_delay:
+                        # 非流式请求同样要等整段回答“生成”完毕
+                        time.sleep(hub.stream_chunk_delay * -(-len(content) // hub.stream_chunk_chars))
+                    prompt_tokens = len(prompt) // 4
+                    completion_tokens = len(content) // 4
+                    self._send_json(200, {
+                        "id": f"chatcmpl-{hub.requests}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "fake"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                  "total_tokens": prompt_tokens + completion_tokens},
+                    })
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 客户端已超时断开
+                finally:
+                    with hub._lock:
+                        hub.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
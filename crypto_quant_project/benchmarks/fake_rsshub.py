@@ -0,0 +1,147 @@
+"""
+本地假RSSHub服务，用于离线测试与基准测试。
+
+路由：
+  /twitter/user/<name>     返回该用户的推文RSS
+  /twitter/home_latest     返回Home时间线RSS
+  /healthz                 健康检查，返回 ok
+每个请求会先睡眠 ``latency`` 秒，模拟真实RSSHub的响应时间；按 ``error_rate`` 的概率返回503；
+``payload_bytes`` 为每条推文正文追加的填充字节数，用于模拟较大的feed。
+``down`` 为真时所有请求返回503，用于模拟实例宕机。
+响应带ETag，请求携带匹配的If-None-Match时返回304（与RSSHub行为一致）。
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+
+def build_rss(name, n_items, start=0, payload_bytes=0):
+    """生成包含 n_items 条推文的RSS 2.0文档（bytes）。"""
+    padding = (" lorem" * (payload_bytes // 6 + 1))[:payload_bytes]
+    items = []
+    for i in range(start, start + n_items):
+        items.append(
+            "<item>"
+            f"<title>{escape(name)} tweet {i}</title>"
+            f"<description>{escape(name)} says something about BTC #{i}{padding}</description>"
+            f"<link>https://twitter.com/{escape(name)}/status/{i}</link>"
+            f"<guid>https://twitter.com/{escape(name)}/status/{i}</guid>"
+            "<pubDate>Mon, 23 Jun 2025 08:00:00 GMT</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>Twitter @{escape(name)}</title><link>https://twitter.com/{escape(name)}</link>"
+        "<description>fake rsshub</description>"
+        + "".join(items) +
+        "</channel></rss>"
+    ).encode("utf-8")
+
+
+class FakeRssHub:
+    """
+    在后台线程中运行的假RSSHub，可用作上下文管理器。
+
+    ``max_in_flight`` 记录观察到的最大并发请求数，``requests`` 记录总请求数，
+    ``not_modified`` 记录返回304的次数，``errors`` 记录注入的503次数。
+    """
+    def __init__(self, latency=0.0, items_per_feed=20, host="127.0.0.1", port=0,
+                 error_rate=0.0, payload_bytes=0, seed=0):
+        self.latency = latency
+        self.items_per_feed = items_per_feed
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.down = False
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with hub._lock:
+                    hub.requests += 1
+                    hub.in_flight += 1
+                    hub.max_in_flight = max(hub.max_in_flight, hub.in_flight)
+                try:
+                    if hub.latency:
+                        time.sleep(hub.latency)
+                    with hub._lock:
+                        fail = hub.down or (hub.error_rate and hub._random.random() < hub.error_rate)
+                        if fail:
+                            hub.errors += 1
+                    if fail:
+                        self.send_error(503)
+                        return
+                    parts = self.path.strip("/").split("/")
+                    if parts == ["healthz"]:
+                        body = b"ok"
+                        self.send_response(200)
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+                    if len(parts) == 3 and parts[:2] == ["twitter", "user"]:
+                        body = build_rss(parts[2], hub.items_per_feed, payload_bytes=hub.payload_bytes)
+                    elif parts == ["twitter", "home_latest"]:
+                        body = build_rss("home", hub.items_per_feed, payload_bytes=hub.payload_bytes)
+                    else:
+                        self.send_error(404)
+                        return
+                    etag = '"%s"' % hashlib.md5(body).hexdigest()
+                    if self.headers.get("If-None-Match") == etag:
+                        with hub._lock:
+                            hub.not_modified += 1
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 客户端已超时断开
+                finally:
+                    with hub._lock:
+                        hub.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
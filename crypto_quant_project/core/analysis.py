@@ -0,0 +1,223 @@
+import argparse
+import collections
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from core.prescorer import PreScorer
+from utils.logger import get_logger
+
+logger = get_logger('analysis')
+
+# Article fields joined into the text that is scored (NewsAPI articles, RSS items, CSV rows).
+TEXT_FIELDS = ('title', 'description', 'summary', 'text')
+
+
+def article_text(article):
+    return ' '.join(str(article[f]) for f in TEXT_FIELDS if article.get(f))
+
+
+class Analysis:
+    """
+    Offline lexical sentiment for articles and posts, scored a whole batch at a time with
+    PreScorer's vectorized lexicon (crypto terms plus TextBlob's general English words),
+    and a threshold signal on the mean polarity.
+
+    Unlike the live prescorer, pure adverbs are left out of the lexicon: pattern uses them as
+    intensifiers of the next word, so averaged on their own "crashes spectacularly" scores
+    as neutral. Routing in front of the LLM is not affected.
+    """
+    def __init__(self, symbols=('BTC', 'ETH')):
+        self.symbols = list(symbols)
+        self._scorer = None
+
+    @property
+    def scorer(self):
+        if self._scorer is None:
+            self._scorer = PreScorer(self.symbols, lexicon_adverbs=False)
+        return self._scorer
+
+    def analyze_sentiment_of_articles(self, articles):
+        """
+        :param articles: Dicts with any of 'title' / 'description' / 'summary' / 'text'.
+        :return: DataFrame with 'text', 'polarity' (-1..1) and 'hits' (lexicon words found), one row per article.
+        """
+        import pandas as pd
+        texts = [article_text(a) for a in articles]
+        polarity, hits = self.scorer.lexical_scores(texts)
+        return pd.DataFrame({'text': texts, 'polarity': polarity, 'hits': hits})
+
+    def generate_trading_signal(self, sentiment_df, threshold=0.1):
+        """'BUY' / 'SELL' when the mean polarity is beyond +/- ``threshold``, otherwise 'HOLD'."""
+        if sentiment_df is None or not len(sentiment_df):
+            return 'HOLD'
+        mean = float(sentiment_df['polarity'].mean())
+        if mean > threshold:
+            return 'BUY'
+        if mean < -threshold:
+            return 'SELL'
+        return 'HOLD'
+
+
+# ---- bulk scoring of large corpora -------------------------------------------------------
+
+def iter_csv_chunks(path, chunksize, text_column='text', time_column='created_at'):
+    """Yields (texts, epoch seconds or NaN) per chunk of a CSV export, e.g. the scraper's tweets.csv."""
+    import pandas as pd
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [text_column] + ([time_column] if time_column in header else [])
+    for frame in pd.read_csv(path, usecols=usecols, chunksize=chunksize, dtype=str, keep_default_na=False):
+        texts = frame[text_column].tolist()
+        if time_column in frame:
+            stamps = pd.to_datetime(frame[time_column], errors='coerce', utc=True)
+            times = (stamps - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            times = np.full(len(texts), np.nan)
+        yield texts, times
+
+
+def iter_recording_chunks(path, chunksize):
+    """Yields (texts, record time) per chunk of the items in a Recorder .jsonl.gz file."""
+    from core.recorder import read_records
+    texts, times = [], []
+    for record in read_records(path):
+        if record['kind'] != 'items':
+            continue
+        for item in record['items']:
+            texts.append(article_text(item))
+            times.append(record['t'])
+            if len(texts) >= chunksize:
+                yield texts, np.asarray(times, dtype=np.float64)
+                texts, times = [], []
+    if texts:
+        yield texts, np.asarray(times, dtype=np.float64)
+
+
+class NpyColumnWriter:
+    """
+    Streams a 1-D column into a .npy file of unknown final length: the header is written for
+    an empty array, data is appended, and ``close`` rewrites the header with the real shape
+    (numpy pads .npy headers so the shape can grow without moving the data).
+    """
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self._file = open(path, 'wb')
+        self._header_len = self._write_header(0)
+
+    def _write_header(self, rows):
+        start = self._file.tell()
+        np.lib.format.write_array_header_1_0(self._file, {'descr': np.lib.format.dtype_to_descr(self.dtype),
+                                                          'fortran_order': False, 'shape': (rows,)})
+        return self._file.tell() - start
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._file.write(values.tobytes())
+        self.rows += len(values)
+
+    def close(self):
+        self._file.seek(0)
+        if self._write_header(self.rows) != self._header_len:
+            raise ValueError(f"{self.path}: .npy header grew past its padding")
+        self._file.close()
+
+
+_worker_scorer = None
+
+
+def _init_worker(symbols):
+    global _worker_scorer
+    _worker_scorer = PreScorer(symbols, lexicon_adverbs=False)
+
+
+def _score_chunk(texts):
+    scores, hits = _worker_scorer.lexical_scores(texts)
+    return scores.astype(np.float32), hits.astype(np.int32)
+
+
+def score_corpus(chunks, output_dir, workers=None, symbols=('BTC', 'ETH'), source=None):
+    """
+    Scores a stream of (texts, times) chunks and writes ``polarity.npy`` (float32),
+    ``hits.npy`` (int32) and ``time.npy`` (float64 epoch seconds, NaN if unknown) to
+    ``output_dir``, row i being the i-th input text, plus ``meta.json``.
+
+    Chunks are scored in a process pool of ``workers`` (default: CPU count; 0 or 1 scores
+    in-process) with at most two chunks per worker in flight and results written in input
+    order, so memory stays bounded by the chunk size however large the corpus is.
+    Returns the meta dict.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    os.makedirs(output_dir, exist_ok=True)
+    columns = {'polarity': NpyColumnWriter(os.path.join(output_dir, 'polarity.npy'), np.float32),
+               'hits': NpyColumnWriter(os.path.join(output_dir, 'hits.npy'), np.int32),
+               'time': NpyColumnWriter(os.path.join(output_dir, 'time.npy'), np.float64)}
+    start = time.perf_counter()
+
+    def write(times, scored):
+        polarity, hits = scored
+        columns['polarity'].append(polarity)
+        columns['hits'].append(hits)
+        columns['time'].append(times)
+
+    try:
+        if workers <= 1:
+            _init_worker(list(symbols))
+            for texts, times in chunks:
+                write(times, _score_chunk(texts))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(list(symbols),)) as pool:
+                pending = collections.deque()
+                for texts, times in chunks:
+                    pending.append((times, pool.submit(_score_chunk, texts)))
+                    if len(pending) >= 2 * workers:
+                        times_done, future = pending.popleft()
+                        write(times_done, future.result())
+                while pending:
+                    times_done, future = pending.popleft()
+                    write(times_done, future.result())
+    finally:
+        for column in columns.values():
+            column.close()
+    seconds = time.perf_counter() - start
+    meta = {'source': source, 'rows': columns['polarity'].rows, 'columns': list(columns), 'workers': workers,
+            'seconds': seconds}
+    with open(os.path.join(output_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    logger.info("已打分 %d 条（%.1fs，%.0f 条/s），结果写入 %s", meta['rows'], seconds,
+                meta['rows'] / seconds if seconds > 0 else 0.0, output_dir)
+    return meta
+
+
+def load_scores(output_dir):
+    """Columns written by ``score_corpus``, memory-mapped read-only."""
+    return {name: np.load(os.path.join(output_dir, f'{name}.npy'), mmap_mode='r')
+            for name in ('polarity', 'hits', 'time')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线批量情绪打分（CSV导出或录制文件 -> 列式 .npy）")
+    parser.add_argument("input", help="CSV 文件（如抓取脚本输出的 tweets.csv）或 Recorder 的 .jsonl.gz 录制文件")
+    parser.add_argument("--output", required=True, help="输出目录")
+    parser.add_argument("--text-column", default='text')
+    parser.add_argument("--time-column", default='created_at')
+    parser.add_argument("--chunksize", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认CPU核数；1为单进程")
+    args = parser.parse_args()
+
+    if args.input.endswith('.jsonl.gz'):
+        chunks = iter_recording_chunks(args.input, args.chunksize)
+    else:
+        chunks = iter_csv_chunks(args.input, args.chunksize, args.text_column, args.time_column)
+    meta = score_corpus(chunks, args.output, workers=args.workers, source=os.path.abspath(args.input))
+    scores = load_scores(args.output)
+    if meta['rows']:
+        print(f"{meta['rows']} 条，平均情绪分 {float(np.mean(scores['polarity'])):+.3f}，"
+              f"命中词典 {int(np.count_nonzero(scores['hits']))} 条，耗时 {meta['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import threading
+import time
+from utils.logger import metrics
+
+HIGH, NORMAL = 0, 1
+LANE_NAMES = {HIGH: 'high', NORMAL: 'normal'}
+
+
+class Batch:
+    __slots__ = ('sources', 'texts', 'ids', 'priority', 'reason', 'waited')
+
+    def __init__(self, sources, texts, ids, priority, reason, waited):
+        self.sources = sources
+        self.texts = texts
+        self.ids = ids
+        self.priority = priority
+        self.reason = reason
+        self.waited = waited
+
+
+class MicroBatcher:
+    """
+    Event-driven micro-batcher with a high-priority lane.
+
+    Producers ``put`` groups of texts (plus the item IDs to commit once they are analyzed)
+    into the HIGH or NORMAL lane. ``get_batch`` returns as soon as one of these holds:
+
+    - at least ``flush_items`` texts are pending (``reason='size'``);
+    - a HIGH entry has waited ``high_priority_wait`` seconds (``'priority'``), so important
+      items are analyzed right away, taking pending routine items along;
+    - the oldest NORMAL entry has waited ``max_wait`` seconds (``'wait'``).
+
+    A batch holds HIGH entries first, then NORMAL ones in arrival order, up to ``max_items``
+    texts (always at least one entry). At most ``capacity`` entries are pending; ``put``
+    blocks beyond that (backpressure). After ``close`` everything pending is flushed
+    immediately and ``get_batch`` returns None once empty.
+    """
+    def __init__(self, flush_items=50, max_items=200, max_wait=5.0, high_priority_wait=0.0, capacity=64):
+        self.flush_items = flush_items
+        self.max_items = max(max_items, 1)
+        self.max_wait = max_wait
+        self.high_priority_wait = high_priority_wait
+        self.capacity = capacity
+        self._lanes = {HIGH: [], NORMAL: []}  # entries: (arrival, source, texts, ids)
+        self._pending_items = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._lanes[HIGH]) + len(self._lanes[NORMAL])
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def pending_items(self):
+        with self._cond:
+            return self._pending_items
+
+    def put(self, texts, ids, priority=NORMAL, source=None, timeout=None):
+        """Adds one entry; returns False if it could not be queued within ``timeout`` or the batcher is closed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed and len(self._lanes[HIGH]) + len(self._lanes[NORMAL]) >= self.capacity:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            if self._closed:
+                return False
+            self._lanes[priority].append((time.monotonic(), source, list(texts), set(ids)))
+            self._pending_items += len(texts)
+            self._cond.notify_all()
+            return True
+
+    def _flush_reason(self, now):
+        """(reason, None) when a batch is due, else (None, the time at which one will be)."""
+        high, normal = self._lanes[HIGH], self._lanes[NORMAL]
+        if self._closed:
+            return 'close', None
+        if self._pending_items >= self.flush_items:
+            return 'size', None
+        due = []
+        if high:
+            due.append((high[0][0] + self.high_priority_wait, 'priority'))
+        if normal:
+            due.append((normal[0][0] + self.max_wait, 'wait'))
+        at, reason = min(due)
+        return (reason, None) if at <= now else (None, at)
+
+    def get_batch(self, timeout=None):
+        """Blocks until a batch is due (or ``timeout`` elapses, returning None)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due_at = None
+                if self._lanes[HIGH] or self._lanes[NORMAL]:
+                    reason, due_at = self._flush_reason(now)
+                    if reason is not None:
+                        return self._take(reason, now)
+                elif self._closed:
+                    return None
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    due_at = deadline if due_at is None else min(due_at, deadline)
+                self._cond.wait(None if due_at is None else due_at - now)
+
+    def _take(self, reason, now):
+        sources, texts, ids = [], [], set()
+        priority, waited = NORMAL, 0.0
+        for lane in (HIGH, NORMAL):
+            entries = self._lanes[lane]
+            while entries and (not texts or len(texts) + len(entries[0][2]) <= self.max_items):
+                arrival, source, entry_texts, entry_ids = entries.pop(0)
+                texts.extend(entry_texts)
+                ids.update(entry_ids)
+                if source not in sources:
+                    sources.append(source)
+                priority = min(priority, lane)
+                waited = max(waited, now - arrival)
+                metrics.observe(f'batch_wait_{LANE_NAMES[lane]}', now - arrival)
+            if entries:
+                break
+        self._pending_items -= len(texts)
+        metrics.inc('batches_flushed_total', reason=reason)
+        self._cond.notify_all()
+        return Batch(sources, texts, ids, priority, reason, waited)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,126 @@
+import configparser
+import os
+import threading
+from utils.logger import get_logger
+
+logger = get_logger('config')
+
+# Typed options: (type, minimum or None). Options not listed here are plain strings.
+SCHEMA = {
+    'Fetch': {'MAX_WORKERS': (int, 1), 'PER_HOST_LIMIT': (int, 1), 'TIMEOUT': (float, 0), 'CONCURRENT': (bool, None),
+              'RSSHUB_FAILURE_THRESHOLD': (int, 1), 'RSSHUB_RESET_SECONDS': (float, 0),
+              'RSSHUB_HEALTH_INTERVAL': (float, 0), 'FAST_PARSE': (bool, None), 'EARLY_STOP': (bool, None)},
+    'Cache': {'FEED_CACHE': (bool, None), 'LLM_CACHE': (bool, None), 'LLM_CACHE_MAX_ENTRIES': (int, 1),
+              'LLM_CACHE_TTL_HOURS': (float, 0)},
+    'Storage': {'SEEN_TTL_DAYS': (int, 0), 'SEEN_MAX_ITEMS': (int, 1)},
+    'LLM': {'BATCH_SIZE': (int, 1), 'BATCH_MAX_TOKENS': (int, 1), 'MAX_CONCURRENT_REQUESTS': (int, 1),
+            'MAX_RETRIES': (int, 0), 'RETRY_BASE_DELAY': (float, 0), 'REQUESTS_PER_MINUTE': (int, 1),
+            'TOKENS_PER_MINUTE': (int, 1), 'PROMPT_TOKEN_BUDGET': (int, 1), 'CHUNK_PARALLELISM': (int, 1),
+            'STREAM': (bool, None), 'STREAM_EARLY_STOP': (bool, None), 'COMPACT_PROMPT': (bool, None)},
+    'Dedupe': {'ENABLED': (bool, None), 'MAX_DISTANCE': (int, 0), 'WINDOW_HOURS': (float, 0)},
+    'PreScore': {'ENABLED': (bool, None), 'VIP_TO_LLM': (bool, None), 'LOCAL_THRESHOLD': (float, 0),
+                 'MIN_HITS': (int, 0)},
+    'Signals': {'ENGINE': (bool, None), 'HALF_LIFE_MINUTES': (float, 0), 'MIN_WEIGHT': (float, 0),
+                'BUY_THRESHOLD': (float, None), 'SELL_THRESHOLD': (float, None), 'CAPACITY': (int, 1)},
+    'Daemon': {'VIP_INTERVAL': (float, 0), 'HOME_INTERVAL': (float, 0), 'NEWS_INTERVAL': (float, 0),
+               'REDDIT_INTERVAL': (float, 0), 'REDDIT_STREAM_INTERVAL': (float, 0), 'MAX_ITEMS': (int, 1),
+               'QUEUE_SIZE': (int, 1), 'MAX_BATCH_ITEMS': (int, 1), 'FLUSH_ITEMS': (int, 1),
+               'MAX_WAIT': (float, 0), 'VIP_MAX_WAIT': (float, 0)},
+    'Ingestion': {'DEADLINE': (float, 0), 'BREAKER_FAILURES': (int, 1), 'BREAKER_RESET_SECONDS': (float, 0),
+                  'REDDIT_LIMIT': (int, 1), 'REDDIT_STREAM_QUEUE_SIZE': (int, 1)},
+    'Logging': {'VERBOSE_ITEMS': (bool, None), 'METRICS_INTERVAL': (float, 0)},
+    'Backtest': {'RECORD': (bool, None)},
+    'Execution': {'ENABLED': (bool, None), 'TRADE_SIZE': (float, 0), 'MAX_WORKERS': (int, 1),
+                  'BATCH_ORDERS': (bool, None), 'PAPER_FEE_RATE': (float, 0)},
+    'MarketData': {'HISTORY_DAYS': (float, 0), 'PAGE_LIMIT': (int, 1), 'MAX_WORKERS': (int, 1)},
+}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class Config(configparser.ConfigParser):
+    """
+    config.ini parsed once and checked against ``SCHEMA``.
+
+    A regular ConfigParser (``get``/``getint``/``getfloat``/``getboolean`` keep working),
+    plus ``getlist`` for comma-separated values. Trailing `` # comments`` after a value are
+    stripped, so options can be annotated the way the README shows them; ``;`` is only a
+    comment at the start of a line, so values may contain it.
+    """
+    def __init__(self, path=None):
+        super().__init__(inline_comment_prefixes=('#',))
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path)) if path else os.getcwd()
+
+    def getlist(self, section, option, fallback=()):
+        value = self.get(section, option, fallback=None)
+        if value is None:
+            return list(fallback)
+        return [part.strip() for part in value.split(',') if part.strip()]
+
+    def validate(self):
+        """Raises ConfigError listing every typed option that does not parse or is out of range."""
+        problems = []
+        getters = {int: self.getint, float: self.getfloat, bool: self.getboolean}
+        for section, options in SCHEMA.items():
+            if not self.has_section(section):
+                continue
+            for option, (kind, minimum) in options.items():
+                if not self.has_option(section, option):
+                    continue
+                try:
+                    value = getters[kind](section, option)
+                except ValueError:
+                    problems.append(f"[{section}] {option} = {self.get(section, option)!r} is not a valid {kind.__name__}")
+                    continue
+                if minimum is not None and value < minimum:
+                    problems.append(f"[{section}] {option} = {value} must be >= {minimum}")
+        if problems:
+            raise ConfigError(f"Invalid config {self.path or ''}: " + "; ".join(problems))
+        return self
+
+
+_cache = {}  # absolute path -> (file signature, Config)
+_cache_lock = threading.Lock()
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_config(path):
+    """
+    Returns the parsed, validated Config for ``path``.
+
+    The result is cached per file and re-parsed only when the file's mtime or size changes,
+    so calling this every cycle is cheap and picks up edits. A missing file gives an empty
+    Config (like ConfigParser.read). If an edited file fails validation, the error is logged
+    and the previous Config is kept; an invalid file on first load raises ConfigError.
+    """
+    path = os.path.abspath(path)
+    signature = _signature(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        config = Config(path)
+        try:
+            if signature is not None:
+                config.read(path, encoding='utf-8')
+            config.validate()
+        except (configparser.Error, ConfigError) as e:
+            if cached is None:
+                raise
+            logger.error("配置文件重新加载失败，继续使用旧配置: %s", e)
+            _cache[path] = (signature, cached[1])
+            return cached[1]
+        if cached is not None:
+            logger.info("配置文件已变更，重新加载: %s", path)
+        _cache[path] = (signature, config)
+        return config
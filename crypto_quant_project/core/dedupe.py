@@ -0,0 +1,196 @@
+import threading
+import time
+import numpy as np
+from core.llm_cache import normalize_text
+
+_PRIME = np.uint64(1099511628211)
+_MIX1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX2 = np.uint64(0x94d049bb133111eb)
+# Row v holds the 8 bits of byte value v (least significant first).
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little').astype(np.float64)
+
+
+def _splitmix64(h):
+    h = h ^ (h >> np.uint64(30))
+    h = h * _MIX1
+    h = h ^ (h >> np.uint64(27))
+    h = h * _MIX2
+    return h ^ (h >> np.uint64(31))
+
+
+def simhash_fingerprints(texts, shingle_size=4):
+    """
+    64-bit SimHash of every text over character shingles of its normalized form.
+
+    All texts are hashed in one vectorized pass: the UTF-8 bytes are concatenated,
+    a rolling hash is computed at every position, shingles that cross a text boundary
+    are masked out and the per-bit votes are summed per text with ``np.bincount``.
+    :return: np.ndarray of uint64, one fingerprint per text.
+    """
+    encoded = [normalize_text(t).lower().encode('utf-8') for t in texts]
+    # Texts shorter than one shingle are padded so that they still yield one shingle.
+    encoded = [b.ljust(shingle_size, b'\0') for b in encoded]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    if not len(encoded):
+        return np.zeros(0, dtype=np.uint64)
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+    n_pos = len(buf) - shingle_size + 1
+    with np.errstate(over='ignore'):
+        hashes = np.zeros(n_pos, dtype=np.uint64)
+        for k in range(shingle_size):
+            hashes = hashes * _PRIME + buf[k:k + n_pos]
+        hashes = _splitmix64(hashes)
+
+    ends = np.cumsum(lengths)
+    doc_of_pos = np.repeat(np.arange(len(encoded)), lengths)[:n_pos]
+    valid = np.arange(n_pos) + shingle_size <= ends[doc_of_pos]
+    hashes = hashes[valid]
+    doc_of_pos = doc_of_pos[valid]
+
+    # Count, per text and per hash byte, how often each byte value occurs; multiplying the
+    # counts with the bit table of all 256 byte values gives the per-bit vote totals.
+    n_docs = len(encoded)
+    hash_bytes = hashes.view(np.uint8).reshape(-1, 8)
+    slot = doc_of_pos * 256
+    ones = np.empty((n_docs, 64))
+    for j in range(8):
+        counts = np.bincount(slot + hash_bytes[:, j], minlength=n_docs * 256).reshape(n_docs, 256)
+        ones[:, j * 8:(j + 1) * 8] = counts @ _BYTE_BITS
+    n_shingles = lengths - (shingle_size - 1)
+    # A bit is set when more than half of the text's shingles vote for it.
+    packed = np.packbits(ones * 2 > n_shingles[:, None], axis=1, bitorder='little')
+    return packed.view(np.uint64).ravel()
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(x):
+        return bin(x).count('1')
+
+
+class NearDuplicateIndex:
+    """
+    SimHash + banded LSH index that collapses near-duplicate texts within a rolling time window.
+
+    Two texts are near-duplicates when their fingerprints differ in at most ``max_distance``
+    bits. Fingerprints are split into ``max_distance + 1`` bands, so by the pigeonhole
+    principle any near-duplicate shares at least one band exactly and is found by lookup.
+    Clusters seen in earlier cycles stay in the index for ``window_seconds``.
+    The index is safe to share between threads (e.g. several pipeline sources).
+    """
+    def __init__(self, max_distance=3, window_seconds=6 * 3600, shingle_size=4):
+        self.max_distance = max_distance
+        self.window_seconds = window_seconds
+        self.shingle_size = shingle_size
+        self.n_bands = max_distance + 1
+        self.band_bits = 64 // self.n_bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._bands = [dict() for _ in range(self.n_bands)]
+        self._clusters = {}  # cluster id -> [fingerprint, last_seen, mentions]
+        self._next_id = 0
+        self.collapsed = 0    # texts merged into a cluster of the same batch
+        self.suppressed = 0   # texts matching a cluster from an earlier batch
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def _band_keys(self, fp):
+        return [(fp >> (b * self.band_bits)) & self._band_mask for b in range(self.n_bands)]
+
+    def _find(self, fp, keys):
+        clusters, max_distance = self._clusters, self.max_distance
+        for band, key in zip(self._bands, keys):
+            for cluster_id in band.get(key, ()):
+                if _popcount(clusters[cluster_id][0] ^ fp) <= max_distance:
+                    return cluster_id
+        return None
+
+    def _insert(self, fp, keys, now):
+        cluster_id = self._next_id
+        self._next_id += 1
+        self._clusters[cluster_id] = [fp, now, 1]
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(cluster_id)
+        return cluster_id
+
+    def prune(self, now=None):
+        """Drops clusters not seen within the window. Returns the number removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._prune(now)
+
+    def _prune(self, now):
+        expired = [cid for cid, (_, last_seen, _) in self._clusters.items()
+                   if last_seen < now - self.window_seconds]
+        for cluster_id in expired:
+            self._remove(cluster_id)
+        return len(expired)
+
+    def collapse(self, texts, now=None):
+        """
+        Groups a batch of texts into near-duplicate clusters.
+
+        :return: List of (index, mentions) for every new cluster, in order of first appearance:
+                 ``texts[index]`` is the representative and ``mentions`` how many texts of
+                 this batch it stands for. Texts that repeat a cluster from an earlier
+                 batch are dropped and only raise that cluster's mention count.
+        """
+        now = time.time() if now is None else now
+        fingerprints = simhash_fingerprints(texts, self.shingle_size)
+        with self._lock:
+            self._prune(now)
+            return self._collapse(fingerprints, now)
+
+    def _collapse(self, fingerprints, now):
+        known_ids = set(self._clusters)
+        result = {}  # cluster id -> [index, mentions]
+        for index, fp in enumerate(fingerprints.tolist()):
+            keys = self._band_keys(fp)
+            cluster_id = self._find(fp, keys)
+            if cluster_id is None:
+                cluster_id = self._insert(fp, keys, now)
+                result[cluster_id] = [index, 1]
+                continue
+            cluster = self._clusters[cluster_id]
+            cluster[1] = now
+            cluster[2] += 1
+            if cluster_id in known_ids:
+                self.suppressed += 1
+            else:
+                result[cluster_id][1] += 1
+                self.collapsed += 1
+        return [tuple(v) for v in result.values()]
+
+    def forget(self, texts):
+        """
+        Removes the clusters these texts belong to, e.g. the new clusters of a batch whose
+        analysis failed, so the texts are not suppressed as repeats when fetched again.
+        Returns the number of clusters removed.
+        """
+        fingerprints = simhash_fingerprints(texts, self.shingle_size).tolist() if texts else []
+        removed = 0
+        with self._lock:
+            for fp in fingerprints:
+                cluster_id = self._find(fp, self._band_keys(fp))
+                if cluster_id is None:
+                    continue
+                self._remove(cluster_id)
+                removed += 1
+        return removed
+
+    def _remove(self, cluster_id):
+        fp = self._clusters.pop(cluster_id)[0]
+        for band, key in zip(self._bands, self._band_keys(fp)):
+            members = band[key]
+            members.remove(cluster_id)
+            if not members:
+                del band[key]
+
+    def mentions(self, text):
+        """Total mentions of the cluster a text belongs to within the window (0 if unknown)."""
+        fp = int(simhash_fingerprints([text], self.shingle_size)[0])
+        with self._lock:
+            cluster_id = self._find(fp, self._band_keys(fp))
+            return 0 if cluster_id is None else self._clusters[cluster_id][2]
@@ -0,0 +1,133 @@
+import ccxt
+import configparser
+import time
+from utils.logger import get_logger
+
+logger = get_logger('exchange')
+
+
+class ExchangeManager:
+    def __init__(self, config_file='config.ini', config=None):
+        if config is None:
+            config = configparser.ConfigParser()
+            config.read(config_file)
+        self.config = config
+        self.exchanges = {}
+        self._load_exchanges()
+
+    def _load_exchanges(self):
+        """Loads exchange instances from the config file."""
+        if 'API' not in self.config:
+            raise ValueError("API section not found in config file.")
+
+        api_config = self.config['API']
+
+        # Binance
+        if 'BINANCE_API_KEY' in api_config:
+            self.exchanges['binance'] = ccxt.binance({
+                'apiKey': api_config['BINANCE_API_KEY'],
+                'secret': api_config['BINANCE_API_SECRET'],
+                'options': {
+                    'defaultType': 'spot',
+                },
+            })
+
+        # OKX
+        if 'OKX_API_KEY' in api_config:
+            self.exchanges['okx'] = ccxt.okx({
+                'apiKey': api_config['OKX_API_KEY'],
+                'secret': api_config['OKX_API_SECRET'],
+                'password': api_config['OKX_API_PASSWORD'],
+                'options': {
+                    'defaultType': 'spot',
+                },
+            })
+
+        if not self.exchanges:
+            logger.warning("No exchange API keys found in config file. Trading functions will be disabled.")
+
+    def get_exchange(self, name):
+        """Returns the exchange instance by name."""
+        return self.exchanges.get(name.lower())
+
+    def warm_up(self, names=None):
+        """
+        Loads market metadata (precision, limits) once, so order validation happens locally
+        and the first order does not pay for a load_markets round trip. Returns the names
+        that loaded.
+        """
+        loaded = []
+        for name in names or list(self.exchanges):
+            exchange = self.get_exchange(name)
+            if not exchange:
+                continue
+            start = time.perf_counter()
+            try:
+                exchange.load_markets()
+            except ccxt.Error as e:
+                logger.error("Error loading markets from %s: %s", name, e)
+                continue
+            logger.info("Loaded %d markets from %s in %.0fms", len(exchange.markets or {}), name,
+                        (time.perf_counter() - start) * 1000)
+            loaded.append(name)
+        return loaded
+
+    def fetch_ohlcv(self, exchange_name, symbol, timeframe='1h', limit=100):
+        """Fetches OHLCV data for a symbol from a specific exchange."""
+        exchange = self.get_exchange(exchange_name)
+        if not exchange or not exchange.has['fetchOHLCV']:
+            logger.warning("%s does not support fetching OHLCV data.", exchange_name)
+            return []
+        try:
+            return exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        except ccxt.Error as e:
+            logger.error("Error fetching OHLCV from %s: %s", exchange_name, e)
+            return []
+
+    def get_balance(self, exchange_name):
+        """Fetches account balance from a specific exchange."""
+        exchange = self.get_exchange(exchange_name)
+        if not exchange:
+            logger.warning("Exchange %s not configured.", exchange_name)
+            return {}
+        try:
+            return exchange.fetch_balance()
+        except ccxt.Error as e:
+            logger.error("Error fetching balance from %s: %s", exchange_name, e)
+            return {}
+
+    def create_order(self, exchange_name, symbol, order_type, side, amount, price=None):
+        """Creates an order on a specific exchange."""
+        exchange = self.get_exchange(exchange_name)
+        if not exchange:
+            logger.warning("Exchange %s not configured.", exchange_name)
+            return None
+        try:
+            return exchange.create_order(symbol, order_type, side, amount, price)
+        except ccxt.Error as e:
+            logger.error("Error creating order on %s: %s", exchange_name, e)
+            return None
+
+
+if __name__ == '__main__':
+    try:
+        manager = ExchangeManager(config_file='../config.ini')
+        binance = manager.get_exchange('binance')
+        if binance:
+            print("Binance loaded successfully.")
+            btc_usdt = manager.fetch_ohlcv('binance', 'BTC/USDT', '1d')
+            if btc_usdt:
+                print(f"Fetched last {len(btc_usdt)} 1-day candles for BTC/USDT from Binance.")
+                print(btc_usdt[-1])
+        okx = manager.get_exchange('okx')
+        if okx:
+            print("OKX loaded successfully.")
+            eth_usdt = manager.fetch_ohlcv('okx', 'ETH/USDT', '1h')
+            if eth_usdt:
+                print(f"Fetched last {len(eth_usdt)} 1-hour candles for ETH/USDT from OKX.")
+                print(eth_usdt[-1])
+    except ValueError as e:
+        print(e)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        print("Please ensure 'config.ini' exists in the project root directory.")
@@ -0,0 +1,324 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import get_logger, metrics
+
+logger = get_logger('execution')
+
+
+class OrderRejected(ValueError):
+    """An order failed local pre-validation (unknown market, precision or limits, paper funds)."""
+
+
+class Order:
+    """One order on its way from a signal to the exchange; ``result``/``error``/``latency`` are set on completion."""
+    __slots__ = ('exchange', 'symbol', 'side', 'amount', 'order_type', 'price', 'signal_time',
+                 'result', 'error', 'latency')
+
+    def __init__(self, exchange, symbol, side, amount, order_type='market', price=None, signal_time=None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.order_type = order_type
+        self.price = price
+        self.signal_time = time.monotonic() if signal_time is None else signal_time
+        self.result = None
+        self.error = None
+        self.latency = None
+
+    def __repr__(self):
+        return f"Order({self.exchange}, {self.side} {self.amount} {self.symbol})"
+
+
+def prepare_order(exchange, order, reference_price=None):
+    """
+    Rounds ``order.amount`` down to the market's amount precision and checks it against the
+    market's amount and cost limits, using only the markets the exchange already loaded.
+    Raises OrderRejected instead of letting the exchange reject the order a round trip later.
+    """
+    market = (exchange.markets or {}).get(order.symbol)
+    if market is None:
+        raise OrderRejected(f"{order.symbol} is not listed on {order.exchange}")
+    if market.get('active') is False:
+        raise OrderRejected(f"{order.symbol} is not trading on {order.exchange}")
+    try:
+        amount = float(exchange.amount_to_precision(order.symbol, order.amount))
+    except Exception as e:  # ccxt raises InvalidOrder when the amount rounds to zero
+        raise OrderRejected(f"{order.symbol} amount {order.amount}: {e}")
+    limits = market.get('limits') or {}
+    min_amount = (limits.get('amount') or {}).get('min')
+    max_amount = (limits.get('amount') or {}).get('max')
+    if amount <= 0 or (min_amount and amount < min_amount):
+        raise OrderRejected(f"{order.symbol} amount {amount} is below the minimum {min_amount}")
+    if max_amount and amount > max_amount:
+        raise OrderRejected(f"{order.symbol} amount {amount} is above the maximum {max_amount}")
+    price = order.price or reference_price
+    min_cost = (limits.get('cost') or {}).get('min')
+    if price and min_cost and amount * price < min_cost:
+        raise OrderRejected(f"{order.symbol} order value {amount * price:.4f} is below the minimum {min_cost}")
+    order.amount = amount
+    return order
+
+
+class PaperExchange:
+    """
+    Paper-trading stand-in for a ccxt exchange.
+
+    Markets, precision and prices come from ``market_source`` (a keyless public ccxt client,
+    or a local stub offline); orders fill immediately at the last traded price (or the limit
+    price), pay ``fee_rate`` in the quote currency and only change the local ``balance``.
+    """
+    has = {'createOrders': True}
+
+    def __init__(self, market_source, balance=None, fee_rate=0.001):
+        self.market_source = market_source
+        self.id = f"paper-{getattr(market_source, 'id', 'exchange')}"
+        self.balance = dict(balance or {'USDT': 10000.0})
+        self.fee_rate = fee_rate
+        self.orders = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def markets(self):
+        return self.market_source.markets
+
+    def load_markets(self, reload=False):
+        return self.market_source.load_markets(reload)
+
+    def amount_to_precision(self, symbol, amount):
+        return self.market_source.amount_to_precision(symbol, amount)
+
+    def fetch_ticker(self, symbol):
+        return self.market_source.fetch_ticker(symbol)
+
+    def fetch_balance(self):
+        with self._lock:
+            return {'free': dict(self.balance), 'total': dict(self.balance)}
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        if type == 'market' or price is None:
+            price = float(self.fetch_ticker(symbol)['last'])
+        base, quote = symbol.split(':')[0].split('/')
+        cost = amount * price
+        fee = cost * self.fee_rate
+        with self._lock:
+            if side == 'buy':
+                if self.balance.get(quote, 0.0) < cost + fee:
+                    raise OrderRejected(f"paper balance {self.balance.get(quote, 0.0)} {quote} < {cost + fee:.4f}")
+                self.balance[quote] = self.balance.get(quote, 0.0) - cost - fee
+                self.balance[base] = self.balance.get(base, 0.0) + amount
+            else:
+                if self.balance.get(base, 0.0) < amount:
+                    raise OrderRejected(f"paper balance {self.balance.get(base, 0.0)} {base} < {amount}")
+                self.balance[base] = self.balance.get(base, 0.0) - amount
+                self.balance[quote] = self.balance.get(quote, 0.0) + cost - fee
+            now = int(time.time() * 1000)
+            order = {'id': f"paper-{next(self._ids)}", 'timestamp': now, 'symbol': symbol, 'type': type, 'side': side,
+                     'amount': amount, 'filled': amount, 'remaining': 0.0, 'price': price, 'average': price,
+                     'cost': cost, 'status': 'closed', 'fee': {'cost': fee, 'currency': quote}}
+            self.orders.append(order)
+        return order
+
+    def create_orders(self, orders, params=None):
+        results = []
+        for o in orders:
+            try:
+                results.append(self.create_order(o['symbol'], o['type'], o['side'], o['amount'], o.get('price')))
+            except OrderRejected as e:
+                results.append({'symbol': o['symbol'], 'status': 'rejected', 'info': str(e)})
+        return results
+
+
+class OrderExecutor:
+    """
+    Low-latency path from signals to orders.
+
+    Exchange clients are created once and warmed up (markets preloaded), so orders are rounded
+    and checked against precision and limits locally. Submission runs on a worker pool and
+    never blocks the caller. Orders for several symbols on the same exchange go out as one
+    ``create_orders`` request when the exchange supports it, otherwise concurrently. Each
+    completed order records its signal-to-order latency (stage ``signal_to_order``).
+
+    ``exchanges`` maps a name to a ccxt exchange or anything with the same methods
+    (PaperExchange, a test stub). ``pairs`` maps a signal key ('BTC') to a market ('BTC/USDT').
+    """
+    def __init__(self, exchanges, pairs, trade_size, default_exchange=None, trade_sizes=None, max_workers=4,
+                 batch_orders=True):
+        self.exchanges = dict(exchanges)
+        self.pairs = dict(pairs)
+        self.trade_size = trade_size
+        self.trade_sizes = dict(trade_sizes or {})
+        self.default_exchange = default_exchange or next(iter(self.exchanges))
+        self.batch_orders = batch_orders
+        self.last_signals = {}
+        self.last_prices = {}
+        self._signal_keys = {symbol: key for key, symbol in self.pairs.items()}
+        self._signals_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='order')
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds an executor from [Execution]: MODE = paper wraps a keyless public client of
+        EXCHANGE in a PaperExchange; MODE = live uses the keyed clients of ExchangeManager.
+        """
+        name = config.get('Execution', 'EXCHANGE',
+                          fallback=config.get('Trading', 'PRIMARY_EXCHANGE', fallback='binance')).lower()
+        mode = config.get('Execution', 'MODE', fallback='paper').lower()
+        if mode == 'live':
+            from core.exchange import ExchangeManager
+            exchange = ExchangeManager(config=config).get_exchange(name)
+            if exchange is None:
+                raise ValueError(f"Exchange {name} has no API keys in [API]")
+        elif mode == 'paper':
+            import ccxt
+            balance = {}
+            for part in config.getlist('Execution', 'PAPER_BALANCE', fallback=['USDT:10000']):
+                currency, _, amount = part.partition(':')
+                balance[currency.strip().upper()] = float(amount)
+            exchange = PaperExchange(getattr(ccxt, name)(), balance=balance,
+                                     fee_rate=config.getfloat('Execution', 'PAPER_FEE_RATE', fallback=0.001))
+        else:
+            raise ValueError(f"Unknown [Execution] MODE: {mode}")
+        pairs = {s.split('/')[0].strip().upper(): s.strip() for s in config.get('Trading', 'SYMBOLS').split(',')}
+        trade_sizes = {}
+        for part in config.getlist('Execution', 'TRADE_SIZES'):
+            base, _, size = part.partition(':')
+            trade_sizes[base.strip().upper()] = float(size)
+        return cls({name: exchange}, pairs,
+                   trade_size=config.getfloat('Execution', 'TRADE_SIZE',
+                                              fallback=config.getfloat('Trading', 'DEFAULT_TRADE_SIZE', fallback=0.01)),
+                   default_exchange=name, trade_sizes=trade_sizes,
+                   max_workers=config.getint('Execution', 'MAX_WORKERS', fallback=4),
+                   batch_orders=config.getboolean('Execution', 'BATCH_ORDERS', fallback=True))
+
+    def _load_markets(self, name, exchange):
+        start = time.perf_counter()
+        try:
+            exchange.load_markets()
+        except Exception as e:
+            raise OrderRejected(f"could not load markets from {name}: {e}")
+        logger.info("%s 市场信息已预加载（%d 个交易对，%.0fms）", name, len(exchange.markets or {}),
+                    (time.perf_counter() - start) * 1000)
+
+    def warm_up(self):
+        """Preloads markets on every exchange; call once at startup, off the signal path. Returns False on failure."""
+        ok = True
+        for name, exchange in self.exchanges.items():
+            try:
+                self._load_markets(name, exchange)
+            except OrderRejected as e:
+                logger.error("%s，首次下单时重试", e)
+                ok = False
+        return ok
+
+    def orders_for_signals(self, signals, signal_time=None):
+        """
+        Orders for the symbols whose signal changed to BUY or SELL since the last call, so a
+        signal that stays BUY across cycles does not buy again every cycle. If the order is
+        rejected (by ``prepare_order`` or the exchange) the signal is forgotten again, so the
+        next cycle with the same signal retries it.
+        """
+        signal_time = time.monotonic() if signal_time is None else signal_time
+        orders = []
+        with self._signals_lock:
+            for key, signal in signals.items():
+                previous = self.last_signals.get(key)
+                self.last_signals[key] = signal
+                if signal not in ('BUY', 'SELL') or signal == previous or key not in self.pairs:
+                    continue
+                orders.append(Order(self.default_exchange, self.pairs[key], signal.lower(),
+                                    self.trade_sizes.get(key, self.trade_size), signal_time=signal_time))
+        return orders
+
+    def _forget_signal(self, order):
+        """Drops the recorded signal a failed order was placed for, unless a newer signal replaced it."""
+        key = self._signal_keys.get(order.symbol)
+        with self._signals_lock:
+            if key is not None and self.last_signals.get(key) == order.side.upper():
+                del self.last_signals[key]
+
+    def execute_signals(self, signals, signal_time=None):
+        """Turns changed signals into orders and submits them; returns the futures (see ``submit``)."""
+        return self.submit(self.orders_for_signals(signals, signal_time))
+
+    def submit(self, orders):
+        """
+        Pre-validates ``orders`` on the calling thread and submits the valid ones in the
+        background. Returns a list of futures, each resolving to the list of Orders it sent.
+        """
+        groups = {}
+        for order in orders:
+            exchange = self.exchanges.get(order.exchange)
+            try:
+                if exchange is None:
+                    raise OrderRejected(f"exchange {order.exchange} is not configured")
+                if not exchange.markets:
+                    self._load_markets(order.exchange, exchange)  # warm_up failed or was skipped
+                prepare_order(exchange, order, self.last_prices.get(order.symbol))
+            except OrderRejected as e:
+                order.error = str(e)
+                metrics.inc('orders_rejected_total', stage='validate')
+                logger.warning("订单预校验未通过: %s", e)
+                self._forget_signal(order)
+                continue
+            groups.setdefault(order.exchange, []).append(order)
+        futures = []
+        for name, group in groups.items():
+            exchange = self.exchanges[name]
+            if self.batch_orders and len(group) > 1 and exchange.has.get('createOrders'):
+                futures.append(self._pool.submit(self._send_batch, exchange, group))
+            else:
+                futures.extend(self._pool.submit(self._send, exchange, [order]) for order in group)
+        return futures
+
+    def _send_batch(self, exchange, orders):
+        try:
+            results = exchange.create_orders([{'symbol': o.symbol, 'type': o.order_type, 'side': o.side,
+                                               'amount': o.amount, 'price': o.price} for o in orders])
+        except Exception as e:
+            if type(e).__name__ != 'NotSupported':  # e.g. binance only batches derivatives orders
+                for order in orders:
+                    self._finish(order, error=e)
+                return orders
+            return self._send(exchange, orders)
+        for order, result in zip(orders, results):
+            if result.get('status') == 'rejected':
+                self._finish(order, error=result.get('info'))
+            else:
+                self._finish(order, result)
+        return orders
+
+    def _send(self, exchange, orders):
+        for order in orders:
+            try:
+                result = exchange.create_order(order.symbol, order.order_type, order.side, order.amount, order.price)
+            except Exception as e:
+                self._finish(order, error=e)
+            else:
+                self._finish(order, result)
+        return orders
+
+    def _finish(self, order, result=None, error=None):
+        order.latency = time.monotonic() - order.signal_time
+        if error is not None:
+            order.error = str(error)
+            metrics.inc('orders_rejected_total', stage='exchange')
+            logger.error("下单失败 %s: %s", order, error)
+            self._forget_signal(order)
+            return
+        order.result = result
+        price = result.get('average') or result.get('price')
+        if price:
+            self.last_prices[order.symbol] = float(price)
+        metrics.inc('orders_total', side=order.side)
+        metrics.observe('signal_to_order', order.latency)
+        logger.info("已下单 %s %s %s @ %s（订单 %s，信号到下单 %.1fms）", order.side, order.amount, order.symbol,
+                    price, result.get('id'), order.latency * 1000,
+                    extra={'symbol': order.symbol, 'side': order.side, 'latency_ms': order.latency * 1000})
+
+    def close(self):
+        self._pool.shutdown(wait=True)
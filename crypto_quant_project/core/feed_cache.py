@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from utils.logger import get_logger
+
+logger = get_logger('feed_cache')
+
+
+class FeedCache:
+    """
+    On-disk cache of feed validators (ETag / Last-Modified) and parsed entries, one JSON file per URL.
+
+    A fetcher sends the stored validators as a conditional GET. When the server answers
+    304 Not Modified, the cached entries are returned and the feed is neither downloaded
+    nor parsed again; the bytes and parse time that were skipped are added to the counters.
+    An entry stored from a ``partial`` parse (stopped early, e.g. at tweets already seen)
+    only keeps the validators: a 304 for it returns no tweets, since nothing is new.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        self.parse_seconds_saved = 0.0
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        """Returns the cached entry for a URL or None."""
+        with self._lock:
+            if url in self._entries:
+                return self._entries[url]
+        path = self._path(url)
+        entry = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable feed cache file %s: %s", path, e)
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def conditional_headers(self, url):
+        """Returns the If-None-Match / If-Modified-Since headers for a URL."""
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, etag, last_modified, tweets, content_length, parse_seconds, partial=False):
+        """Stores a freshly parsed feed and counts a miss."""
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_length': content_length,
+            'parse_seconds': parse_seconds,
+            'tweets': [] if partial else tweets,
+            'partial': partial,
+        }
+        with self._lock:
+            self._entries[url] = entry
+            self.misses += 1
+            self.bytes_downloaded += content_length
+        if not etag and not last_modified:
+            return  # 服务器不支持条件请求，无需落盘
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def record_hit(self, url):
+        """Counts a 304 response and returns the cached tweets ([] for a partial entry)."""
+        entry = self.get(url) or {}
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry.get('content_length', 0)
+            self.parse_seconds_saved += entry.get('parse_seconds', 0.0)
+        return entry.get('tweets', [])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'bytes_downloaded': self.bytes_downloaded,
+            'parse_seconds_saved': self.parse_seconds_saved,
+        }
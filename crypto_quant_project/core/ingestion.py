@@ -0,0 +1,238 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import urlparse
+from core.seen_store import content_digest
+from utils.logger import get_logger, metrics
+
+logger = get_logger('ingestion')
+
+
+class Item:
+    """
+    One ingested post, whatever its source.
+
+    ``id`` is the URL when there is one, otherwise a stable content digest, so it can be
+    used directly as the seen-store key. ``text`` is the raw content used for dedupe;
+    ``prompt_text`` is what the LLM sees (VIP posts carry a ``[VIP][author]`` prefix).
+    """
+    __slots__ = ('id', 'source', 'text', 'url', 'published', 'author', 'vip')
+
+    def __init__(self, source, text, url='', published='', author='', vip=False, item_id=None):
+        self.source = source
+        self.text = text
+        self.url = url or ''
+        self.published = published or ''
+        self.author = author or ''
+        self.vip = vip
+        self.id = item_id or self.url or content_digest(text)
+
+    @property
+    def prompt_text(self):
+        return f"[VIP][{self.author}] {self.text}" if self.vip else self.text
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, Item) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Item(source={self.source!r}, id={self.id!r}, text={self.text[:40]!r})"
+
+
+def items_from_user_tweets(username, tweets, vip=True):
+    """Items from ResourceFetcher's normalized user timeline dicts."""
+    return [Item('twitter', t['text'], url=t.get('url'), published=t.get('published'), author=username, vip=vip)
+            for t in tweets]
+
+
+TWITTER_HOSTS = ('twitter.com', 'x.com', 'www.twitter.com', 'www.x.com', 'mobile.twitter.com')
+
+
+def twitter_handle(url):
+    """Author handle of a tweet link (``https://x.com/<handle>/status/<id>``), or ''."""
+    parsed = urlparse(url or '')
+    if parsed.netloc.lower() not in TWITTER_HOSTS:
+        return ''
+    parts = parsed.path.strip('/').split('/')
+    return parts[0] if len(parts) >= 3 and parts[1] == 'status' else ''
+
+
+def items_from_feed(tweets, source='twitter_home'):
+    """Items from RssHubTwitterFetcher entries (title/summary/url/published); the author comes from the tweet link."""
+    items = []
+    for t in tweets:
+        text = f"{t['title']} {t['summary']}"
+        # Without a link the digest covers title + summary, as before the ingestion layer existed.
+        items.append(Item(source, text, url=t.get('url'), published=t.get('published'), author=twitter_handle(t.get('url')),
+                          item_id=t.get('url') or content_digest(t.get('title', '') + t.get('summary', ''))))
+    return items
+
+
+def items_from_news(articles):
+    return [Item('news', f"{a.get('title') or ''} {a.get('description') or ''}".strip(), url=a.get('url'),
+                 published=a.get('publishedAt'), author=(a.get('source') or {}).get('name', ''))
+            for a in articles]
+
+
+def items_from_reddit(posts):
+    return [Item('reddit', p['text'], url=p.get('url'), published=p.get('published'), author=p.get('source', ''))
+            for p in posts]
+
+
+class CircuitBreaker:
+    """
+    Skips a failing source for a while instead of paying its timeout every cycle.
+
+    After ``failure_threshold`` consecutive failures the breaker opens for ``reset_seconds``;
+    then one trial call is let through (half-open): success closes it, failure re-opens it.
+    """
+    def __init__(self, failure_threshold=3, reset_seconds=300):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if now - self.opened_at >= self.reset_seconds else 'open'
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._state(now) != 'half-open':
+                return self.opened_at is None
+            self.opened_at = now  # one trial call per reset period
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class Source:
+    """
+    A named fetch callable returning a list of Items, with its own deadline and circuit breaker.
+    ``close`` is called when the ingestion layer shuts down (e.g. to stop a background stream);
+    ``commit(item_ids)`` is called once Items are stored as processed (e.g. to move a checkpoint);
+    ``release(item_ids)`` hands back Items that were fetched but not processed (e.g. a result
+    that came in after the deadline), so the source can deliver them again.
+    """
+    def __init__(self, name, fetch, deadline=15.0, breaker=None, close=None, commit=None, release=None):
+        self.name = name
+        self.fetch = fetch
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self.close = close
+        self.commit = commit
+        self.release = release
+
+
+class Ingestion:
+    """
+    Runs all sources concurrently (or one after another with ``concurrent=False``) and merges
+    their Items in source order.
+
+    Each source has a deadline; a source that misses it or raises contributes nothing this
+    round and counts as a failure for its circuit breaker. Sources run on a shared,
+    long-lived thread pool (a source past its deadline keeps its worker until its HTTP
+    timeout expires, so the pool has two workers per source).
+    """
+    def __init__(self, sources, max_workers=None, concurrent=True):
+        self.sources = {s.name: s for s in sources}
+        self.concurrent = concurrent
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or max(2, 2 * len(self.sources)),
+                                        thread_name_prefix='ingest')
+        self.last_status = {}
+
+    def collect(self, names=None):
+        """
+        Fetches the given sources (all by default), concurrently unless ``concurrent`` is off;
+        serially, each source's deadline counts from its own start.
+        :return: List of Items, grouped by source in the order the sources were registered.
+        """
+        sources = [self.sources[n] for n in (names or self.sources)]
+        start = time.monotonic()
+        futures, items = [], []
+        for source in sources:
+            if not source.breaker.allow():
+                self.last_status[source.name] = 'skipped'
+                metrics.inc('source_skipped_total', source=source.name)
+                logger.warning("数据源 %s 熔断中，本轮跳过", source.name, extra={'source': source.name})
+                continue
+            future = self._pool.submit(self._run, source)
+            if self.concurrent:
+                futures.append((source, future))
+            else:
+                items.extend(self._result(source, future, time.monotonic()))
+        for source, future in futures:
+            items.extend(self._result(source, future, start))
+        return items
+
+    def _result(self, source, future, start):
+        remaining = source.deadline - (time.monotonic() - start)
+        try:
+            result = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            self._fail(source, 'timeout', f"超过 {source.deadline:g}s 截止时间")
+            if source.release is not None:
+                # the late result is discarded; hand its Items back so the source delivers them again
+                future.add_done_callback(lambda f: self._release_late(source, f))
+            return []
+        except Exception as e:
+            self._fail(source, 'error', e)
+            return []
+        source.breaker.record_success()
+        self.last_status[source.name] = 'ok'
+        metrics.inc('items_fetched_by_source_total', len(result), source=source.name)
+        return result
+
+    @staticmethod
+    def _run(source):
+        with metrics.span(f'source_{source.name}'):
+            return source.fetch()
+
+    @staticmethod
+    def _release_late(source, future):
+        if not future.cancelled() and future.exception() is None:
+            source.release([item.id for item in future.result()])
+
+    def _fail(self, source, kind, reason):
+        source.breaker.record_failure()
+        self.last_status[source.name] = kind
+        metrics.inc('source_failures_total', source=source.name, kind=kind)
+        logger.warning("数据源 %s 失败（%s）: %s", source.name, kind, reason,
+                       extra={'source': source.name, 'breaker': source.breaker.state})
+
+    def commit(self, item_ids):
+        """Tells the sources that ``item_ids`` are stored as processed."""
+        for source in self.sources.values():
+            if source.commit is not None:
+                source.commit(item_ids)
+
+    def release(self, item_ids):
+        """Tells the sources that ``item_ids`` were fetched but will not be processed this time."""
+        for source in self.sources.values():
+            if source.release is not None:
+                source.release(item_ids)
+
+    def close(self):
+        for source in self.sources.values():
+            if source.close is not None:
+                source.close()
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,97 @@
+import json
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonFieldScanner:
+    """
+    Incremental parser for the top-level fields of a streamed JSON object.
+
+    ``feed`` takes chunks as they arrive and returns the fields completed so far, so a caller
+    can act on ``{"sentiment_score": 0.8, ...`` before the rest of the object (e.g. a long
+    ``reasoning`` string) has been generated. Scalar values (numbers, strings, true/false/null)
+    are decoded; nested objects and arrays are skipped. A number is complete once the
+    character after it arrives, as in any JSON tokenizer.
+    """
+    def __init__(self):
+        self.fields = {}
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'    # key -> colon -> value -> comma -> key ...
+        self._key = None
+        self._token = []        # current string contents or bare literal
+
+    def _finish_literal(self):
+        if self._token and self._depth == 1 and self._expect == 'value':
+            try:
+                self.fields[self._key] = json.loads(''.join(self._token))
+            except ValueError:
+                pass
+            self._expect = 'comma'
+        self._token = []
+
+    def _finish_string(self):
+        raw = ''.join(self._token)
+        self._token = []
+        if self._depth != 1:
+            return
+        try:
+            value = json.loads('"' + raw + '"')
+        except ValueError:
+            value = raw
+        if self._expect == 'key':
+            self._key = value
+            self._expect = 'colon'
+        elif self._expect == 'value':
+            self.fields[self._key] = value
+            self._expect = 'comma'
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._finish_string()
+                    continue
+                if self._depth == 1:
+                    self._token.append(ch)
+                continue
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._token = []
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._finish_literal()
+                self._depth -= 1
+                if self._depth == 1:
+                    self._expect = 'comma'    # a nested value just ended
+                elif self._depth == 0:
+                    self.complete = True
+            elif self._depth > 1:
+                continue
+            elif ch == ':':
+                self._expect = 'value'
+            elif ch == ',':
+                self._finish_literal()
+                self._expect = 'key'
+            elif ch in _WHITESPACE:
+                self._finish_literal()
+            else:
+                self._token.append(ch)
+        return self.fields
+
+    def has(self, *names):
+        return all(name in self.fields for name in names)
@@ -1,12 +1,73 @@
 import os
-import configparser
-from openai import OpenAI
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import json
+from core.config import load_config
+from core.json_stream import JsonFieldScanner
+from core.llm_cache import LLMCache
+from core.rate_limiter import RateLimiter
+from core.token_budget import estimate_tokens
+from utils.logger import get_logger, metrics
+
+logger = get_logger('llm')
+
+# Bump whenever the analyze_text prompt changes so cached answers of the old prompt are not reused.
+SENTIMENT_PROMPT_VERSION = 1
+# Same for the analyze_batch prompt.
+BATCH_PROMPT_VERSION = 1
+# The compact prompt (and streamed answers cut off before the reasoning) have their own cache key.
+COMPACT_SENTIMENT_PROMPT_VERSION = 'compact-1'
+
+SENTIMENT_PROMPT = """Analyze the sentiment of the following text regarding its potential impact on the cryptocurrency market.
+The text is: "{text}"
+
+Your task is to determine if the sentiment is positive, negative, or neutral from a crypto investor's perspective.
+
+Please respond in a structured JSON format with the following fields:
+1. "sentiment_score": A float between -1.0 (very negative) and 1.0 (very positive).
+2. "confidence": A float between 0.0 (not confident) and 1.0 (very confident) in your assessment.
+3. "reasoning": A brief, one-sentence explanation for your analysis.
+
+Example response for a positive text:
+{{
+  "sentiment_score": 0.8,
+  "confidence": 0.9,
+  "reasoning": "The text announces a significant technological breakthrough which is likely to be viewed positively by the market."
+}}
+
+Example response for a negative text:
+{{
+  "sentiment_score": -0.7,
+  "confidence": 0.85,
+  "reasoning": "The text reports a major security breach, which typically leads to a loss of investor confidence."
+}}
+
+Now, analyze the provided text."""
+
+# Hot-path variant: no free-text reasoning, score first so a streamed answer is usable after a few tokens.
+COMPACT_SENTIMENT_PROMPT = """Crypto market sentiment of this text for an investor. Reply with JSON only, in this field order:
+{{"sentiment_score": <float -1.0 .. 1.0>, "confidence": <float 0.0 .. 1.0>}}
+Text: {text}"""
+
+BATCH_PROMPT_HEADER = """Analyze the sentiment of each of the following texts regarding its potential impact on the cryptocurrency market,
+from a crypto investor's perspective. Score every text independently.
+
+Respond with a JSON object of the form:
+{"results": [{"id": "<id of the text>", "sentiment_score": <float -1.0 .. 1.0>, "confidence": <float 0.0 .. 1.0>, "reasoning": "<one sentence>"}]}
+Return exactly one result per text and copy each id unchanged.
+
+Texts:
+"""
+
+# Rough completion size per scored item, used for the tokens-per-minute budget.
+BATCH_OUTPUT_TOKENS_PER_ITEM = 40
+COMPACT_OUTPUT_TOKENS = 20
 
 class LLMAnalyzer:
-    def __init__(self, config_file='config.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
+    def __init__(self, config_file='config.ini', config=None):
+        self.config = config if config is not None else load_config(config_file)
         
         if 'LLM' not in self.config:
             raise ValueError("LLM section not found in the config file.")
@@ -17,55 +78,277 @@ class LLMAnalyzer:
         if not self.api_key or self.api_key == 'YOUR_DEEPSEEK_API_KEY':
             raise ValueError("DEEPSEEK_API_KEY is not configured in the config file.")
 
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.model = self.config['LLM'].get('MODEL', 'deepseek-chat')
+        # Created on first request: importing openai dominates startup time.
+        self._client = None
+        self._client_lock = threading.Lock()
 
-    def analyze_text(self, text: str) -> dict:
+        # Batch scoring, concurrency and rate limits
+        llm = self.config['LLM']
+        self.batch_size = llm.getint('BATCH_SIZE', 20)
+        self.batch_max_tokens = llm.getint('BATCH_MAX_TOKENS', 3000)
+        self.max_concurrent_requests = llm.getint('MAX_CONCURRENT_REQUESTS', 4)
+        self.max_retries = llm.getint('MAX_RETRIES', 4)
+        self.retry_base_delay = llm.getfloat('RETRY_BASE_DELAY', 1.0)
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=llm.getint('REQUESTS_PER_MINUTE', 60),
+            tokens_per_minute=llm.getint('TOKENS_PER_MINUTE', 100000),
+        )
+
+        # Hot path: compact prompt, streamed answers returned once score and confidence are parsed
+        self.compact_prompt = llm.getboolean('COMPACT_PROMPT', False)
+        self.stream = llm.getboolean('STREAM', False)
+        self.stream_early_stop = llm.getboolean('STREAM_EARLY_STOP', True)
+
+        # Disk-backed response cache shared by all processes using the same file
+        self.cache = None
+        if self.config.getboolean('Cache', 'LLM_CACHE', fallback=True):
+            db_path = self.config.get('Cache', 'LLM_CACHE_DB', fallback=os.path.join('.cache', 'llm_cache.db'))
+            if not os.path.isabs(db_path):
+                db_path = os.path.join(self.config.base_dir, db_path)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self.cache = LLMCache(
+                db_path,
+                max_entries=self.config.getint('Cache', 'LLM_CACHE_MAX_ENTRIES', fallback=50000),
+                ttl_seconds=self.config.getfloat('Cache', 'LLM_CACHE_TTL_HOURS', fallback=168) * 3600,
+            )
+
+        # Optional core.recorder.Recorder capturing every answer (cached or not) for replay
+        self.recorder = None
+
+    def analyze_text(self, text: str, compact: bool = None, stream: bool = None) -> dict:
         """
         Analyzes the sentiment of a given text using the DeepSeek LLM.
 
         :param text: The text to analyze (e.g., news headline, tweet).
+        :param compact: Use the short hot-path prompt without ``reasoning`` (default: [LLM] COMPACT_PROMPT).
+        :param stream: Stream the completion and return as soon as ``sentiment_score`` and ``confidence``
+            are parsed (default: [LLM] STREAM).
         :return: A dictionary with the analysis or None if an error occurs.
         """
-        prompt = f"""
-        Analyze the sentiment of the following text regarding its potential impact on the cryptocurrency market.
-        The text is: "{text}"
+        compact = self.compact_prompt if compact is None else compact
+        stream = self.stream if stream is None else stream
+        if self.cache is not None:
+            # A verbose answer also serves a compact request; the reverse would lack the reasoning.
+            versions = (COMPACT_SENTIMENT_PROMPT_VERSION, SENTIMENT_PROMPT_VERSION) if compact else (SENTIMENT_PROMPT_VERSION,)
+            for version in versions:
+                cached = self.cache.get(text, self.model, version)
+                if cached is not None:
+                    metrics.inc('llm_cache_hits_total')
+                    self._record('text', text, cached, 0.0, version)
+                    return cached
+
+        if compact:
+            prompt = COMPACT_SENTIMENT_PROMPT.format(text=text)
+        else:
+            prompt = SENTIMENT_PROMPT.format(text=text)
+        estimated = estimate_tokens(prompt) + (COMPACT_OUTPUT_TOKENS if compact else 100)
 
-        Your task is to determine if the sentiment is positive, negative, or neutral from a crypto investor's perspective.
-        
-        Please respond in a structured JSON format with the following fields:
-        1. "sentiment_score": A float between -1.0 (very negative) and 1.0 (very positive).
-        2. "confidence": A float between 0.0 (not confident) and 1.0 (very confident) in your assessment.
-        3. "reasoning": A brief, one-sentence explanation for your analysis.
-        
-        Example response for a positive text:
-        {{
-          "sentiment_score": 0.8,
-          "confidence": 0.9,
-          "reasoning": "The text announces a significant technological breakthrough which is likely to be viewed positively by the market."
-        }}
-        
-        Example response for a negative text:
-        {{
-          "sentiment_score": -0.7,
-          "confidence": 0.85,
-          "reasoning": "The text reports a major security breach, which typically leads to a loss of investor confidence."
-        }}
-
-        Now, analyze the provided text.
-        """
-        
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,  # Set to 0 for deterministic output
-                response_format={"type": "json_object"}
-            )
-            analysis_json = response.choices[0].message.content
-            return json.loads(analysis_json)
+            start = time.perf_counter()
+            if stream:
+                analysis, complete = self._stream_json(prompt, estimated, start)
+            else:
+                response = self._create_completion(prompt, estimated)
+                analysis, complete = json.loads(response.choices[0].message.content), True
+                metrics.observe('llm_time_to_signal', time.perf_counter() - start)
         except Exception as e:
-            print(f"Error calling LLM API: {e}")
+            logger.error("Error calling LLM API: %s", e)
             return None
+        latency = time.perf_counter() - start
+        # A stream stopped before the reasoning is cached like a compact answer
+        version = SENTIMENT_PROMPT_VERSION if complete and not compact else COMPACT_SENTIMENT_PROMPT_VERSION
+        if self.cache is not None:
+            self.cache.put(text, self.model, version, analysis, latency)
+        self._record('text', text, analysis, latency, version)
+        return analysis
+
+    def _record(self, mode, text, response, latency, version=None):
+        if self.recorder is not None:
+            if version is None:
+                version = SENTIMENT_PROMPT_VERSION if mode == 'text' else BATCH_PROMPT_VERSION
+            self.recorder.llm(mode, self.model, version, text, response, latency)
+
+    @property
+    def client(self):
+        """OpenAI client (retries are handled by _create_completion so they respect the rate limiter)."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @staticmethod
+    def _is_retryable(error):
+        import openai
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    def _retry_delay(self, error, attempt):
+        """Exponential backoff with jitter; honours a Retry-After header when the server sends one."""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_base_delay * (2 ** attempt) * (0.5 + random.random())
+
+    def _create_completion(self, prompt, estimated_tokens, stream=False):
+        """
+        Sends one JSON-mode chat completion under the rate limiter.
+        Retries 429, 5xx, timeout and connection errors with backoff; other errors are raised.
+        With ``stream`` the response is an iterator of chunks (retries cover opening the stream only).
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(estimated_tokens)
+            metrics.inc('llm_requests_total')
+            try:
+                with metrics.span('llm_request'):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0,  # Set to 0 for deterministic output
+                        response_format={"type": "json_object"},
+                        **({'stream': True} if stream else {})
+                    )
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                metrics.inc('llm_errors_total', kind='retryable' if retryable else 'fatal')
+                if attempt >= self.max_retries or not retryable:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                logger.warning("LLM request failed (%s), retrying in %.1fs (%d/%d)...", e, delay, attempt + 1, self.max_retries)
+                time.sleep(delay)
+                continue
+            usage = getattr(response, 'usage', None)
+            metrics.inc('llm_tokens_total', getattr(usage, 'total_tokens', None) or estimated_tokens)
+            return response
+
+    def _stream_json(self, prompt, estimated_tokens, start, required=('sentiment_score', 'confidence')):
+        """
+        Streams one completion and parses the JSON object incrementally.
+
+        Returns the parsed fields as soon as all ``required`` ones are present; with
+        STREAM_EARLY_STOP the stream is closed right there, so the rest of the answer (the
+        reasoning) is neither generated nor waited for. Otherwise reads to the end.
+        :return: (fields, whether the whole object was received)
+        """
+        scanner = JsonFieldScanner()
+        response = self._create_completion(prompt, estimated_tokens, stream=True)
+        signalled = False
+        try:
+            for chunk in response:
+                choices = getattr(chunk, 'choices', None)
+                content = choices[0].delta.content if choices else None
+                if not content:
+                    continue
+                scanner.feed(content)
+                if not signalled and scanner.has(*required):
+                    signalled = True
+                    metrics.observe('llm_time_to_signal', time.perf_counter() - start)
+                    if self.stream_early_stop and not scanner.complete:
+                        metrics.inc('llm_streams_cancelled_total')
+                        break
+                if scanner.complete:
+                    break
+        finally:
+            close = getattr(response, 'close', None)
+            if close is not None:
+                close()
+        if not scanner.has(*required):
+            raise ValueError(f"streamed answer is missing {required}: {scanner.fields}")
+        return dict(scanner.fields), scanner.complete
+
+    def _make_batches(self, items):
+        """Splits (id, text) pairs into batches bounded by BATCH_SIZE and BATCH_MAX_TOKENS."""
+        batches, current, current_tokens = [], [], 0
+        for item_id, text in items:
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.batch_max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((item_id, text))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _parse_batch_result(result):
+        try:
+            score = max(-1.0, min(1.0, float(result['sentiment_score'])))
+            confidence = max(0.0, min(1.0, float(result.get('confidence', 0.0))))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return {'sentiment_score': score, 'confidence': confidence, 'reasoning': result.get('reasoning', '')}
+
+    def _analyze_one_batch(self, batch):
+        """Scores one batch in a single request. Returns {item_id: result}; failed items are omitted."""
+        # Short positional ids keep the prompt small and are mapped back to the caller's ids.
+        prompt = BATCH_PROMPT_HEADER + "\n".join(
+            json.dumps({"id": str(i), "text": text}, ensure_ascii=False) for i, (_, text) in enumerate(batch)
+        )
+        estimated = estimate_tokens(prompt) + BATCH_OUTPUT_TOKENS_PER_ITEM * len(batch)
+        try:
+            start = time.perf_counter()
+            response = self._create_completion(prompt, estimated)
+            payload = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.error("Error calling LLM API for a batch of %d items: %s", len(batch), e)
+            return {}
+        latency = (time.perf_counter() - start) / len(batch)
+        results = {}
+        for raw in payload.get('results', []) if isinstance(payload, dict) else []:
+            try:
+                item_id, text = batch[int(raw.get('id'))]
+            except (AttributeError, IndexError, TypeError, ValueError):
+                continue
+            parsed = self._parse_batch_result(raw)
+            if parsed is None:
+                continue
+            results[item_id] = parsed
+            if self.cache is not None:
+                self.cache.put(text, self.model, BATCH_PROMPT_VERSION, parsed, latency)
+            self._record('batch', text, parsed, latency)
+        return results
+
+    def analyze_batch(self, items):
+        """
+        Scores many texts with few LLM requests.
+
+        Items are packed into batches (BATCH_SIZE / BATCH_MAX_TOKENS), and up to
+        MAX_CONCURRENT_REQUESTS batches run in parallel under the REQUESTS_PER_MINUTE and
+        TOKENS_PER_MINUTE limits. Cached items are answered without a request.
+
+        :param items: Iterable of dicts with 'id' and 'text' keys.
+        :return: Dict of id -> {'sentiment_score', 'confidence', 'reasoning'}, or None for items that failed.
+        """
+        pairs = [(item['id'], item['text']) for item in items]
+        results = {item_id: None for item_id, _ in pairs}
+        pending = []
+        for item_id, text in pairs:
+            cached = self.cache.get(text, self.model, BATCH_PROMPT_VERSION) if self.cache is not None else None
+            if cached is not None:
+                results[item_id] = cached
+                metrics.inc('llm_cache_hits_total')
+                self._record('batch', text, cached, 0.0)
+            else:
+                pending.append((item_id, text))
+        batches = self._make_batches(pending)
+        if not batches:
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(batches))) as pool:
+            for batch_results in pool.map(self._analyze_one_batch, batches):
+                results.update(batch_results)
+        return results
 
 if __name__ == '__main__':
     # This example demonstrates how to use the LLMAnalyzer.
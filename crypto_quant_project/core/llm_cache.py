@@ -0,0 +1,115 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+_URL_RE = re.compile(r'https?://\S+')
+_RETWEET_PREFIX_RE = re.compile(r'^RT @\w+:\s*')
+
+
+def normalize_text(text):
+    """
+    Canonical form of a text for cache keys: NFKC, no retweet prefix, no URLs, collapsed whitespace.
+    Retweets and cross-posts of the same text therefore share one cache entry.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    text = _RETWEET_PREFIX_RE.sub('', text.strip())
+    text = _URL_RE.sub('', text)
+    return " ".join(text.split())
+
+
+class LLMCache:
+    """
+    Content-addressed, on-disk cache of LLM responses.
+
+    Entries are keyed by sha256(model, prompt version, normalized text) and stored in SQLite
+    (WAL mode with a busy timeout), so several processes can share one cache file.
+    ``max_entries`` bounds the size with least-recently-used eviction and ``ttl_seconds``
+    expires old answers. Hits count the original call latency as saved time.
+    """
+    def __init__(self, db_path, max_entries=50000, ttl_seconds=7 * 86400):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, latency REAL NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_access_idx ON llm_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text, model, prompt_version):
+        raw = f"{model}\x00{prompt_version}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, text, model, prompt_version):
+        """Returns the cached response dict or None, refreshing its LRU position on a hit."""
+        key = self.make_key(text, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and row[2] < now - self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.saved_latency += row[1]
+        return json.loads(row[0])
+
+    def put(self, text, model, prompt_version, response, latency):
+        """Stores a response together with the latency of the call that produced it."""
+        key = self.make_key(text, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, latency, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), latency, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'saved_latency': self.saved_latency,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.logger import get_logger, metrics
+
+logger = get_logger('market_data')
+
+COLUMNS = (('timestamp', np.int64), ('open', np.float64), ('high', np.float64), ('low', np.float64),
+           ('close', np.float64), ('volume', np.float64))
+
+_TIMEFRAME_UNITS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_ms(timeframe):
+    """'1m' / '15m' / '1h' / '1d' / '1w' -> candle length in milliseconds."""
+    try:
+        return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+
+
+class CandleSeries:
+    """
+    Append-only OHLCV history for one (exchange, symbol, timeframe) on disk.
+
+    Each column is a raw little-endian file (``timestamp.i8``, ``close.f8``, ...) that is
+    memory-mapped read-only, so opening years of candles costs no parsing and only the pages
+    touched by a query are read. Appends write the value columns before the timestamps; on
+    open every column is cut back to the shortest one, which drops a half-written append.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._views = None
+        self._repair()
+
+    def _path(self, name, dtype):
+        return os.path.join(self.directory, f'{name}.{np.dtype(dtype).kind}{np.dtype(dtype).itemsize}')
+
+    def _rows(self, name, dtype):
+        path = self._path(name, dtype)
+        return os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+
+    def _repair(self):
+        rows = min(self._rows(name, dtype) for name, dtype in COLUMNS)
+        for name, dtype in COLUMNS:
+            path = self._path(name, dtype)
+            size = rows * np.dtype(dtype).itemsize
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                with open(path, 'ab') as f:
+                    f.truncate(size)
+
+    def __len__(self):
+        return self._rows('timestamp', np.int64)
+
+    def columns(self):
+        """{column name: read-only array}, memory-mapped and shared until the next append."""
+        with self._lock:
+            if self._views is None:
+                rows = len(self)
+                self._views = {name: (np.memmap(self._path(name, dtype), dtype=dtype, mode='r', shape=(rows,))
+                                      if rows else np.empty(0, dtype=dtype))
+                               for name, dtype in COLUMNS}
+            return self._views
+
+    def first_timestamp(self):
+        ts = self.columns()['timestamp']
+        return int(ts[0]) if len(ts) else None
+
+    def last_timestamp(self):
+        ts = self.columns()['timestamp']
+        return int(ts[-1]) if len(ts) else None
+
+    def clear(self):
+        """Drops all stored candles (timestamps first). Arrays handed out earlier stay readable."""
+        with self._lock:
+            for name, dtype in COLUMNS:
+                path = self._path(name, dtype)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._views = None
+            self._repair()
+
+    def append(self, rows):
+        """Appends ccxt OHLCV rows ``[[ts, o, h, l, c, v], ...]`` newer than the last stored candle."""
+        if not len(rows):
+            return 0
+        data = np.asarray(rows, dtype=np.float64)
+        ts = data[:, 0].astype(np.int64)
+        last = self.last_timestamp()
+        keep = np.ones(len(ts), dtype=bool) if last is None else ts > last
+        # ccxt pages can overlap or repeat a candle; keep strictly increasing timestamps only
+        keep[1:] &= ts[1:] > np.maximum.accumulate(ts)[:-1]
+        if not keep.any():
+            return 0
+        data, ts = data[keep], ts[keep]
+        with self._lock:
+            for i, (name, dtype) in enumerate(COLUMNS[1:], start=1):
+                with open(self._path(name, dtype), 'ab') as f:
+                    f.write(data[:, i].astype(dtype).tobytes())
+            with open(self._path('timestamp', np.int64), 'ab') as f:
+                f.write(ts.tobytes())
+            self._views = None
+        return len(ts)
+
+
+class MarketDataStore:
+    """
+    Local OHLCV cache for the configured symbols with vectorized sentiment/return joins.
+
+    ``update`` downloads only candles after the last stored one (the first run backfills
+    ``history_days``, or back to ``since``), so repeated runs and backtests read history from disk. Only closed
+    candles are stored. ``exchange`` is any object with ccxt's ``fetch_ohlcv``; by default a
+    public (keyless) ccxt client for ``exchange_id`` is created on first use.
+    """
+    def __init__(self, exchange_id='binance', timeframe='1h', cache_dir='.cache/market', history_days=30,
+                 exchange=None, page_limit=1000, max_workers=4):
+        self.exchange_id = exchange_id
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_ms(timeframe)
+        self.cache_dir = cache_dir
+        self.history_days = history_days
+        self.page_limit = page_limit
+        self.max_workers = max_workers
+        self._exchange = exchange
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, exchange=None):
+        """Builds a store from the [MarketData] section (exchange defaults to [Trading] PRIMARY_EXCHANGE)."""
+        cache_dir = config.get('MarketData', 'CACHE_DIR', fallback='.cache/market')
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(config.base_dir, cache_dir)
+        return cls(exchange_id=config.get('MarketData', 'EXCHANGE',
+                                          fallback=config.get('Trading', 'PRIMARY_EXCHANGE', fallback='binance')),
+                   timeframe=config.get('MarketData', 'TIMEFRAME', fallback='1h'),
+                   cache_dir=cache_dir,
+                   history_days=config.getfloat('MarketData', 'HISTORY_DAYS', fallback=30),
+                   exchange=exchange,
+                   page_limit=config.getint('MarketData', 'PAGE_LIMIT', fallback=1000),
+                   max_workers=config.getint('MarketData', 'MAX_WORKERS', fallback=4))
+
+    @property
+    def exchange(self):
+        if self._exchange is None:
+            import ccxt
+            self._exchange = getattr(ccxt, self.exchange_id)({'enableRateLimit': True})
+        return self._exchange
+
+    def series(self, symbol):
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is None:
+                directory = os.path.join(self.cache_dir, self.exchange_id, symbol.replace('/', '_').replace(':', '_'),
+                                         self.timeframe)
+                series = self._series[symbol] = CandleSeries(directory)
+            return series
+
+    def update_symbol(self, symbol, now=None, since=None):
+        """
+        Fetches and stores the closed candles missing for ``symbol``; returns how many were added.
+        ``since`` (epoch seconds) is the earliest time the cache must cover, e.g. the start of a
+        recording older than ``history_days``. The store only appends, so a cache starting later
+        than that is downloaded again from ``since`` when the exchange has the older candles.
+        """
+        now_ms = int((time.time() if now is None else now) * 1000)
+        start_ms = now_ms - int(self.history_days * 86_400_000)
+        if since is not None:
+            # from the open of the candle containing ``since``
+            start_ms = min(start_ms, int(since * 1000) // self.timeframe_ms * self.timeframe_ms)
+        series = self.series(symbol)
+        first, last = series.first_timestamp(), series.last_timestamp()
+        if since is not None and first is not None and first - start_ms > self.timeframe_ms:
+            rows = self.exchange.fetch_ohlcv(symbol, self.timeframe, since=start_ms, limit=1)
+            metrics.inc('market_data_requests_total')
+            if rows and rows[0][0] < first:
+                logger.info("%s 本地行情缓存晚于所需的起始时间，从头回补", symbol)
+                series.clear()
+                last = None
+        since = last + self.timeframe_ms if last is not None else start_ms
+        added = 0
+        with metrics.span('market_data_update'):
+            while since + self.timeframe_ms <= now_ms:
+                rows = self.exchange.fetch_ohlcv(symbol, self.timeframe, since=since, limit=self.page_limit)
+                metrics.inc('market_data_requests_total')
+                closed = [row for row in rows or () if row[0] >= since and row[0] + self.timeframe_ms <= now_ms]
+                if not closed:
+                    break
+                added += series.append(closed)
+                since = int(closed[-1][0]) + self.timeframe_ms
+                if len(rows) < self.page_limit:
+                    break
+        metrics.inc('market_data_candles_total', added)
+        if added:
+            logger.debug("%s 新增 %d 根K线", symbol, added)
+        return added
+
+    def update(self, symbols, now=None, since=None):
+        """Updates all symbols concurrently. Returns {symbol: candles added, or None on error}."""
+        def run(symbol):
+            try:
+                return self.update_symbol(symbol, now, since)
+            except Exception as e:
+                metrics.inc('market_data_errors_total')
+                logger.warning("更新 %s 行情失败: %s", symbol, e)
+                return None
+
+        symbols = list(symbols)
+        if self.max_workers <= 1 or len(symbols) <= 1:
+            return {symbol: run(symbol) for symbol in symbols}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols))) as pool:
+            return dict(zip(symbols, pool.map(run, symbols)))
+
+    def candles(self, symbol, start=None, end=None):
+        """Columns for ``symbol`` with open time in [start, end) (epoch seconds), as memory-mapped slices."""
+        columns = self.series(symbol).columns()
+        ts = columns['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(ts, int(start * 1000), 'left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, int(end * 1000), 'left'))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def frame(self, symbol, start=None, end=None):
+        """``candles`` as a pandas DataFrame indexed by UTC open time."""
+        import pandas as pd
+        data = {name: np.asarray(column) for name, column in self.candles(symbol, start, end).items()}
+        index = pd.to_datetime(data.pop('timestamp'), unit='ms', utc=True)
+        return pd.DataFrame(data, index=index)
+
+    def forward_returns(self, symbol, times, horizon=1):
+        """
+        Simple return from the open of the first candle starting at or after each time in
+        ``times`` (epoch seconds) to the close ``horizon`` candles later. NaN where the cache
+        does not cover the window, including times before its first candle.
+        """
+        columns = self.series(symbol).columns()
+        ts, opens, closes = columns['timestamp'], columns['open'], columns['close']
+        times_ms = (np.asarray(times, dtype=np.float64) * 1000).astype(np.int64)
+        entry = np.searchsorted(ts, times_ms, 'left')
+        exit_ = entry + horizon - 1
+        valid = (entry < len(ts)) & (exit_ < len(ts))
+        out = np.full(len(times_ms), np.nan)
+        if valid.any():
+            e, x = entry[valid], exit_[valid]
+            # the window must open within one candle of the time and have no gap (exchange downtime);
+            # otherwise it would measure a later move than the one following the observation
+            contiguous = ((ts[e] - times_ms[valid] <= self.timeframe_ms)
+                          & (ts[x] - ts[e] == (horizon - 1) * self.timeframe_ms))
+            out[np.flatnonzero(valid)[contiguous]] = closes[x[contiguous]] / opens[e[contiguous]] - 1.0
+        return out
+
+    def join_sentiment(self, symbol, times, values, horizon=1):
+        """(sentiment values, forward returns) for the observations the cache covers."""
+        values = np.asarray(values, dtype=np.float64)
+        returns = self.forward_returns(symbol, times, horizon)
+        mask = np.isfinite(returns) & np.isfinite(values)
+        return values[mask], returns[mask]
+
+    def correlation(self, symbol, times, values, horizon=1):
+        """Pearson correlation of sentiment against forward returns, with the number of pairs used."""
+        x, y = self.join_sentiment(symbol, times, values, horizon)
+        if len(x) < 2 or np.std(x) == 0 or np.std(y) == 0:
+            return float('nan'), len(x)
+        return float(np.corrcoef(x, y)[0, 1]), len(x)
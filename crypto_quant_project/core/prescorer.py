@@ -0,0 +1,193 @@
+import re
+import numpy as np
+from core.token_budget import estimate_tokens
+
+# Default keyword aliases per symbol; extend or override with [PreScore] ALIASES.
+DEFAULT_ALIASES = {
+    'BTC': ['btc', 'bitcoin', 'xbt', 'sats', '比特币', '大饼'],
+    'ETH': ['eth', 'ethereum', 'ether', 'vitalik', '以太坊', '以太', '二饼'],
+    'SOL': ['sol', 'solana', '索拉纳'],
+    'BNB': ['bnb', 'binance coin'],
+    'XRP': ['xrp', 'ripple', '瑞波'],
+    'DOGE': ['doge', 'dogecoin', '狗狗币'],
+}
+
+# Market-wide terms: relevant to every configured symbol.
+MARKET_TERMS = ['crypto', 'cryptocurrency', 'altcoin', 'altcoins', 'stablecoin', 'defi', 'fomc', 'fed',
+                'powell', 'cpi', 'rate cut', 'rate hike', '加密', '币圈', '美联储', '降息', '加息']
+
+# Items containing these always go to the LLM, however clear the lexical score looks.
+HIGH_IMPACT_TERMS = ['hack', 'hacked', 'exploit', 'sec', 'etf', 'lawsuit', 'bankrupt', 'bankruptcy',
+                     'insolvent', 'delist', 'delisting', 'ban', 'banned', 'halt', 'halts', 'depeg',
+                     'liquidation', 'liquidations', '黑客', '被盗', '监管', '破产', '下架', '暴雷', '清算']
+
+# Crypto-specific lexicon, scores in [-1, 1].
+CRYPTO_LEXICON = {
+    'bullish': 0.8, 'bull': 0.5, 'moon': 0.7, 'mooning': 0.8, 'pump': 0.5, 'pumping': 0.6, 'rally': 0.6,
+    'breakout': 0.6, 'ath': 0.7, 'soar': 0.7, 'soars': 0.7, 'surge': 0.6, 'surges': 0.6, 'gain': 0.4,
+    'gains': 0.4, 'approve': 0.5, 'approved': 0.6, 'approval': 0.5, 'adoption': 0.5, 'inflow': 0.4,
+    'inflows': 0.4, 'accumulate': 0.4, 'accumulating': 0.4, 'buy': 0.3, 'long': 0.3, 'upgrade': 0.4,
+    'partnership': 0.4, 'launch': 0.3, 'record': 0.3, 'green': 0.3, 'recover': 0.4, 'recovery': 0.4,
+    'bearish': -0.8, 'bear': -0.5, 'dump': -0.6, 'dumping': -0.7, 'crash': -0.8, 'crashes': -0.8,
+    'plunge': -0.7, 'plunges': -0.7, 'selloff': -0.6, 'sell': -0.3, 'short': -0.3, 'rekt': -0.8,
+    'scam': -0.9, 'rug': -0.9, 'rugpull': -0.9, 'fud': -0.4, 'outflow': -0.4, 'outflows': -0.4,
+    'fear': -0.5, 'panic': -0.7, 'red': -0.3, 'drop': -0.4, 'drops': -0.4, 'fall': -0.4, 'falls': -0.4,
+    'loss': -0.5, 'losses': -0.5, 'reject': -0.5, 'rejected': -0.6, 'hack': -0.9, 'hacked': -0.9,
+    'exploit': -0.9, 'bankrupt': -0.9, 'lawsuit': -0.6, 'ban': -0.7, 'banned': -0.7,
+    '利好': 0.7, '暴涨': 0.8, '上涨': 0.5, '突破': 0.6, '新高': 0.7, '牛市': 0.7, '抄底': 0.4, '看多': 0.6,
+    '利空': -0.7, '暴跌': -0.8, '下跌': -0.5, '跌破': -0.6, '新低': -0.7, '熊市': -0.7, '爆仓': -0.8,
+    '看空': -0.6, '跑路': -0.9, '被盗': -0.9, '崩盘': -0.9,
+}
+
+NEGATIONS = {'not', 'no', 'never', "isn't", "wasn't", "don't", "doesn't", "won't", 'without', '不', '没有', '未'}
+
+_LATIN_TOKEN_RE = re.compile(r"[a-z0-9$][a-z0-9'$-]*")
+_MENTIONS_RE = re.compile(r'^\[x(\d+)\]')
+
+
+def _load_textblob_lexicon(adverbs=True):
+    """
+    General English polarity words from TextBlob's pattern lexicon (if textblob is installed).
+    ``adverbs=False`` leaves out words pattern only lists as adverbs (intensifiers of the next word).
+    """
+    try:
+        from textblob.en import sentiment as pattern_sentiment
+        pattern_sentiment.load()
+    except Exception:
+        return {}
+    lexicon = {}
+    for word, senses in pattern_sentiment.items():
+        polarity = (senses.get(None) or [0.0])[0]
+        if not adverbs and set(senses) <= {'RB', None}:
+            continue
+        if ' ' not in word and abs(polarity) >= 0.2:
+            lexicon[word] = polarity
+    return lexicon
+
+
+def _phrase_regex(terms):
+    latin = [re.escape(t) for t in terms if t.isascii()]
+    cjk = [re.escape(t) for t in terms if not t.isascii()]
+    parts = []
+    if latin:
+        parts.append(r'(?<![a-z0-9])\$?(?:' + '|'.join(sorted(latin, key=len, reverse=True)) + r')(?![a-z0-9])')
+    if cjk:
+        parts.append('(?:' + '|'.join(sorted(cjk, key=len, reverse=True)) + ')')
+    return re.compile('|'.join(parts)) if parts else None
+
+
+class PreScorer:
+    """
+    Local relevance gate and lexical sentiment scorer in front of the LLM.
+
+    Every text is routed to one of:
+      'drop'  - mentions no configured symbol/alias and no market-wide term,
+      'local' - clear lexical sentiment (|score| >= local_threshold with at least min_hits
+                lexicon words) and nothing high-impact; the local score is used as is,
+      'llm'   - ambiguous, high-impact (hack, ETF, SEC...) or from a VIP account.
+    Scoring for a whole batch is done with numpy over a shared token vocabulary.
+    ``lexicon_adverbs=False`` drops pure adverbs from the general English lexicon.
+    """
+    def __init__(self, symbols, aliases=None, local_threshold=0.5, min_hits=2, vip_to_llm=True,
+                 lexicon_adverbs=True):
+        self.symbols = list(symbols)
+        self.local_threshold = local_threshold
+        self.min_hits = min_hits
+        self.vip_to_llm = vip_to_llm
+        merged_aliases = {s: list(DEFAULT_ALIASES.get(s, [])) + [s.lower()] for s in self.symbols}
+        for symbol, extra in (aliases or {}).items():
+            merged_aliases.setdefault(symbol, [symbol.lower()]).extend(a.lower() for a in extra)
+        self._symbol_res = {s: _phrase_regex(terms) for s, terms in merged_aliases.items()}
+        self._market_re = _phrase_regex(MARKET_TERMS)
+        self._impact_re = _phrase_regex(HIGH_IMPACT_TERMS)
+
+        lexicon = _load_textblob_lexicon(lexicon_adverbs)
+        lexicon.update(CRYPTO_LEXICON)
+        words = list(lexicon) + [w for w in NEGATIONS if w not in lexicon]
+        self._vocab = {word: i for i, word in enumerate(words)}
+        self._oov = len(words)  # shared id for out-of-vocabulary tokens
+        self._scores = np.array([lexicon.get(w, 0.0) for w in words] + [0.0])
+        self._is_word = np.array([w in lexicon for w in words] + [False])
+        self._negation_ids = np.array([self._vocab[w] for w in NEGATIONS])
+        self._cjk_re = _phrase_regex([w for w in words if not w.isascii()])
+
+        self.metrics = {'seen': 0, 'dropped': 0, 'local': 0, 'llm': 0, 'llm_tokens_avoided': 0}
+
+    def _token_ids(self, text):
+        lowered = text.lower()
+        tokens = _LATIN_TOKEN_RE.findall(lowered)
+        if self._cjk_re is not None:
+            tokens += [m.group(0) for m in self._cjk_re.finditer(lowered) if not m.group(0).isascii()]
+        return [self._vocab.get(t, self._oov) for t in tokens]
+
+    def lexical_scores(self, texts):
+        """
+        Mean lexicon polarity and number of lexicon hits for every text (vectorized).
+        A negation directly before a sentiment word flips its polarity.
+        :return: (scores, hits) as numpy arrays.
+        """
+        token_ids = [self._token_ids(t) for t in texts]
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.int64, count=len(texts))
+        ids = np.fromiter((i for row in token_ids for i in row), dtype=np.int64, count=int(lengths.sum()))
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        values = self._scores[ids]
+        hit = self._is_word[ids]
+        if len(ids) > 1:
+            negated = np.zeros(len(ids), dtype=bool)
+            negated[1:] = np.isin(ids[:-1], self._negation_ids) & (doc[1:] == doc[:-1])
+            values = np.where(negated, -values, values)
+        sums = np.bincount(doc, weights=values, minlength=len(texts))
+        hits = np.bincount(doc, weights=hit, minlength=len(texts))
+        scores = np.divide(sums, hits, out=np.zeros(len(texts)), where=hits > 0)
+        return np.clip(scores, -1.0, 1.0), hits.astype(np.int64)
+
+    def symbols_in(self, text):
+        """Symbols a text refers to; market-wide texts refer to all symbols."""
+        lowered = text.lower()
+        matched = [s for s, regex in self._symbol_res.items() if regex is not None and regex.search(lowered)]
+        if not matched and self._market_re.search(lowered):
+            return list(self.symbols)
+        return matched
+
+    def route(self, texts):
+        """
+        Routes a batch of texts.
+        :return: List of dicts with 'route', 'score', 'confidence', 'symbols', one per text.
+        """
+        scores, hits = self.lexical_scores(texts)
+        routed = []
+        for text, score, n_hits in zip(texts, scores.tolist(), hits.tolist()):
+            symbols = self.symbols_in(text)
+            lowered = text.lower()
+            if not symbols:
+                route = 'drop'
+            elif (self._impact_re.search(lowered) or (self.vip_to_llm and '[vip]' in lowered)
+                  or abs(score) < self.local_threshold or n_hits < self.min_hits):
+                route = 'llm'
+            else:
+                route = 'local'
+            confidence = min(1.0, abs(score) * min(n_hits, 5) / 5) if route == 'local' else 0.0
+            routed.append({'route': route, 'score': score, 'confidence': confidence, 'symbols': symbols})
+        self._record(texts, routed)
+        return routed
+
+    def _record(self, texts, routed):
+        self.metrics['seen'] += len(texts)
+        for text, result in zip(texts, routed):
+            if result['route'] == 'drop':
+                self.metrics['dropped'] += 1
+            else:
+                self.metrics[result['route']] += 1
+            if result['route'] != 'llm':
+                self.metrics['llm_tokens_avoided'] += estimate_tokens(text)
+
+    @staticmethod
+    def mentions(text):
+        """Mention count from a near-duplicate [xN] prefix (1 if absent)."""
+        match = _MENTIONS_RE.match(text)
+        return int(match.group(1)) if match else 1
+
+    def stats(self):
+        avoided = self.metrics['dropped'] + self.metrics['local']
+        seen = self.metrics['seen']
+        return dict(self.metrics, llm_items_avoided=avoided, avoided_ratio=avoided / seen if seen else 0.0)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter for requests-per-minute and tokens-per-minute budgets.
+
+    Both budgets are token buckets refilled continuously; ``acquire`` blocks until
+    one request with the given token cost fits into both. A cost larger than the
+    whole per-minute budget waits for a full bucket instead of blocking forever.
+    """
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _wait_time(self, tokens):
+        """Seconds until the request fits; 0 if it fits now."""
+        wait = 0.0
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+        if self.tpm:
+            needed = min(tokens, self.tpm)
+            if self._tokens < needed:
+                wait = max(wait, (needed - self._tokens) * 60.0 / self.tpm)
+        return wait
+
+    def acquire(self, tokens=0):
+        """Blocks until one request costing ``tokens`` may be sent. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= min(tokens, self.tpm)
+                    return waited
+            time.sleep(wait)
+            waited += wait
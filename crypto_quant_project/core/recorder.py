@@ -0,0 +1,73 @@
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+
+
+class Recorder:
+    """
+    Append-only recording of pipeline inputs for offline replay.
+
+    Records are JSON lines in a gzip file, one record per line with ``t`` (unix time) and
+    ``kind``:
+      'feed'  - raw feed snapshot: url, status, headers, body (base64 of the raw bytes),
+      'items' - normalized items parsed from one feed url,
+      'llm'   - one LLM answer: mode ('text' or 'batch'), model, prompt_version, text,
+                response and latency,
+      'cycle' - written after each fetch, with the vip users / RSSHub url that were fetched.
+    Every record is sync-flushed, so a crashed process leaves a readable file; reopening
+    the same path appends a new gzip member.
+    """
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'ab')
+
+    def record(self, kind, **fields):
+        line = json.dumps(dict(t=fields.pop('t', None) or time.time(), kind=kind, **fields),
+                          ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line.encode('utf-8') + b'\n')
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+            self.records += 1
+
+    def feed(self, url, status, headers, body):
+        self.record('feed', url=url, status=status, headers=dict(headers),
+                    body=base64.b64encode(body or b'').decode('ascii'))
+
+    def items(self, url, items):
+        self.record('items', url=url, items=items)
+
+    def llm(self, mode, model, prompt_version, text, response, latency):
+        self.record('llm', mode=mode, model=model, prompt_version=prompt_version, text=text,
+                    response=response, latency=latency)
+
+    def cycle(self, vip_users=(), rsshub_base_url=None, rsshub_url=None, max_items=None):
+        self.record('cycle', vip_users=list(vip_users), rsshub_base_url=rsshub_base_url,
+                    rsshub_url=rsshub_url, max_items=max_items)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_records(path):
+    """Yields the records of a recording in order; a truncated tail (crash while writing) is ignored."""
+    with gzip.open(path, 'rb') as f:
+        try:
+            for line in f:
+                if line.endswith(b'\n'):
+                    yield json.loads(line)
+        except (EOFError, zlib.error):
+            return
+
+
+def feed_body(record):
+    """Raw bytes of a 'feed' record."""
+    return base64.b64decode(record['body'])
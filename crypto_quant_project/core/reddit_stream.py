@@ -0,0 +1,172 @@
+import collections
+import json
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from core.resource_fetcher import ResourceFetcher
+from utils.logger import get_logger, metrics
+
+logger = get_logger('reddit_stream')
+
+
+class RedditStream:
+    """
+    Push-based Reddit source: one background thread follows praw's submission stream over
+    the combined multi-subreddit (``r/a+b+c``) and puts normalized posts on a bounded queue.
+
+    The queue applies backpressure (the worker blocks while it is full). ``drain`` hands out
+    the queued posts; once the caller has stored them as processed it calls ``commit`` with
+    their keys (``key(post)``, the Reddit ID by default), which advances a checkpoint (newest
+    ``created_utc`` plus the IDs seen at that second) persisted to ``checkpoint_path``, so a
+    restart skips posts that were already processed instead of replaying the stream's initial
+    backlog, and replays those that were drained but never committed. Drained posts that were
+    not processed after all are handed back with ``release`` and come out of the next
+    ``drain`` first. Stream errors restart the stream with exponential backoff; posts still
+    queued or awaiting commit are not queued a second time when the reconnected stream
+    replays them.
+    """
+    def __init__(self, reddit_client, subreddits, queue_size=500, checkpoint_path=None,
+                 retry_base_delay=2.0, retry_max_delay=60.0, key=None):
+        self.reddit_client = reddit_client
+        self.subreddits = [s.strip() for s in subreddits if s.strip()]
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.checkpoint_path = checkpoint_path
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.key = key or (lambda post: post['id'])
+        self.checkpoint = self._load_checkpoint()
+        self._pending = {}  # key -> post, queued or drained but not yet committed
+        self._drained = set()  # keys handed out by drain, awaiting commit or release
+        self._released = collections.deque()  # released posts, drained again before the queue
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return {'created_utc': float(data['created_utc']), 'ids': set(data.get('ids', []))}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("Reddit流断点文件无效，从头开始: %s", e)
+        return {'created_utc': 0.0, 'ids': set()}
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with self._lock:
+            data = {'created_utc': self.checkpoint['created_utc'], 'ids': sorted(self.checkpoint['ids'])}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _is_new(self, created_utc, post_id):
+        with self._lock:
+            checkpoint = self.checkpoint
+            return created_utc > checkpoint['created_utc'] or (
+                created_utc == checkpoint['created_utc'] and post_id not in checkpoint['ids'])
+
+    def _put(self, post):
+        key = self.key(post)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = post
+        while not self._stop.is_set():
+            try:
+                self.queue.put(post, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        with self._lock:
+            self._pending.pop(key, None)
+        return False
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                subreddit = self.reddit_client.subreddit('+'.join(self.subreddits))
+                # pause_after=-1 yields None whenever a poll returns nothing new, so the stop flag is checked regularly
+                for submission in subreddit.stream.submissions(pause_after=-1):
+                    if self._stop.is_set():
+                        return
+                    if submission is None:
+                        continue
+                    failures = 0
+                    created = float(getattr(submission, 'created_utc', 0) or 0)
+                    if not self._is_new(created, submission.id):
+                        continue
+                    post = ResourceFetcher._normalize_reddit_post(submission, str(submission.subreddit))
+                    post.update(id=submission.id, created_utc=created,
+                                published=datetime.fromtimestamp(created, timezone.utc).isoformat())
+                    if self._put(post):
+                        metrics.inc('items_fetched_total')
+            except Exception as e:
+                failures += 1
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (failures - 1))
+                logger.error("Reddit流中断: %s，%.0fs 后重连", e, delay)
+                metrics.inc('fetch_errors_total', kind='reddit_stream')
+                self._stop.wait(delay)
+
+    def drain(self, max_items=None):
+        """Returns released posts, then the queued ones (oldest first); the checkpoint only moves on ``commit``."""
+        posts = []
+        with self._lock:
+            while self._released and (max_items is None or len(posts) < max_items):
+                posts.append(self._released.popleft())
+        while max_items is None or len(posts) < max_items:
+            try:
+                posts.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        keys = [self.key(post) for post in posts]
+        with self._lock:
+            self._drained.update(keys)
+        return posts
+
+    def commit(self, keys):
+        """
+        Moves the checkpoint past the drained posts among ``keys`` (other keys are ignored)
+        and persists it. Call after the posts are stored as processed.
+        """
+        with self._lock:
+            posts = [self._pending.pop(k) for k in keys if k in self._pending]
+            self._drained.difference_update(keys)
+            for post in sorted(posts, key=lambda p: p['created_utc']):
+                if post['created_utc'] > self.checkpoint['created_utc']:
+                    self.checkpoint = {'created_utc': post['created_utc'], 'ids': {post['id']}}
+                elif post['created_utc'] == self.checkpoint['created_utc']:
+                    self.checkpoint['ids'].add(post['id'])
+        if not posts:
+            return
+        try:
+            self._save_checkpoint()
+        except OSError as e:
+            logger.warning("写入Reddit流断点失败: %s", e)
+
+    def release(self, keys):
+        """
+        Hands back drained posts among ``keys`` that were not processed (other keys are
+        ignored); the next ``drain`` returns them again.
+        """
+        with self._lock:
+            keys = [k for k in keys if k in self._drained]
+            self._drained.difference_update(keys)
+            self._released.extend(sorted((self._pending[k] for k in keys), key=lambda p: p['created_utc']))
+
+    def start(self):
+        if self._thread is None:
+            logger.info("Reddit流启动: r/%s", '+'.join(self.subreddits))
+            self._thread = threading.Thread(target=self._run, name='reddit-stream', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the worker; it exits at the stream's next (empty) poll."""
+        self._stop.set()
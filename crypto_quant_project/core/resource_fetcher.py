@@ -1,13 +1,24 @@
-import requests
-import configparser
-import praw
-import feedparser
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from rsshub_twitter_fetcher import RssHubTwitterFetcher
+from core.config import load_config
+from core.feed_cache import FeedCache
+from core.rsshub_pool import NoHealthyInstance, RssHubPool
+from utils.logger import get_logger, metrics
+
+logger = get_logger('fetcher')
+
+RSSHUB_BASE_URL = "http://localhost:1200"
 
 class ResourceFetcher:
-    def __init__(self, config_file='config.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
+    """
+    Fetches tweets, news and Reddit posts. Backends are imported lazily: praw only when a
+    Reddit client is configured, requests on the first HTTP request.
+    """
+    def __init__(self, config_file='config.ini', config=None):
+        self.config = config if config is not None else load_config(config_file)
         
         # NewsAPI configuration
         if 'API' in self.config and 'NEWS_API_KEY' in self.config['API']:
@@ -19,75 +30,218 @@ class ResourceFetcher:
         # Reddit client
         if 'Reddit' in self.config and self.config['Reddit'].get('REDDIT_CLIENT_ID'):
             try:
+                import praw
                 self.reddit_client = praw.Reddit(
                     client_id=self.config['Reddit']['REDDIT_CLIENT_ID'],
                     client_secret=self.config['Reddit']['REDDIT_CLIENT_SECRET'],
                     user_agent=self.config['Reddit']['REDDIT_USER_AGENT']
                 )
             except Exception as e:
-                print(f"Warning: Could not initialize Reddit client: {e}")
+                logger.warning("Could not initialize Reddit client: %s", e)
                 self.reddit_client = None
         else:
             self.reddit_client = None
 
-    def fetch_news(self, keywords, language='en', sort_by='publishedAt', page_size=20):
-        """Fetches news articles from NewsAPI."""
+        # Concurrent RSSHub fetching, sharded over a pool of instances (PER_HOST_LIMIT applies per instance)
+        self.rsshub_pool = RssHubPool.from_config(self.config, RSSHUB_BASE_URL)
+        self.rsshub_health_interval = self.config.getfloat('Fetch', 'RSSHUB_HEALTH_INTERVAL', fallback=30)
+        # Streaming feed parse that stops at max_items or at tweets in ``seen`` (feedparser fallback)
+        self.fast_parse = self.config.getboolean('Fetch', 'FAST_PARSE', fallback=True)
+        self.early_stop = self.config.getboolean('Fetch', 'EARLY_STOP', fallback=True)
+        self.fetch_max_workers = self.config.getint('Fetch', 'MAX_WORKERS', fallback=8)
+        self.fetch_per_host_limit = self.config.getint('Fetch', 'PER_HOST_LIMIT', fallback=4)
+        self.fetch_timeout = self.config.getfloat('Fetch', 'TIMEOUT', fallback=10)
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # Conditional GET feed cache (ETag / Last-Modified)
+        self.feed_cache = None
+        if self.config.getboolean('Cache', 'FEED_CACHE', fallback=True):
+            cache_dir = self.config.get('Cache', 'FEED_CACHE_DIR', fallback=os.path.join('.cache', 'feeds'))
+            if not os.path.isabs(cache_dir):
+                cache_dir = os.path.join(self.config.base_dir, cache_dir)
+            self.feed_cache = FeedCache(cache_dir)
+
+        # Optional core.recorder.Recorder capturing raw feeds and parsed items for replay
+        self.recorder = None
+        # Optional persistent set of processed tweet URLs (SeenStore); feeds stop parsing when they reach them
+        self.seen = None
+
+    @property
+    def rsshub_base_url(self):
+        """Base URL of the first RSSHub instance in the pool."""
+        return self.rsshub_pool.primary.base_url
+
+    @property
+    def session(self):
+        """Pooled requests.Session shared by all fetches, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(self.fetch_max_workers, self.fetch_per_host_limit))
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def fetch_news(self, keywords, language='en', sort_by='publishedAt', page_size=20, raise_errors=False):
+        """Fetches news articles from NewsAPI (pooled session, ``TIMEOUT`` second limit)."""
         if not self.news_api_key or self.news_api_key == 'YOUR_NEWS_API_KEY':
-            print("Warning: NEWS_API_KEY not found or is a placeholder. Skipping news fetch.")
+            logger.warning("NEWS_API_KEY not found or is a placeholder. Skipping news fetch.")
             return []
 
+        import requests
         params = {'q': keywords, 'apiKey': self.news_api_key, 'language': language, 'sortBy': sort_by, 'pageSize': page_size}
         try:
-            response = requests.get(self.news_base_url, params=params)
+            response = self.session.get(self.news_base_url, params=params, timeout=self.fetch_timeout)
             response.raise_for_status()
             return response.json().get('articles', [])
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching news: {e}")
+            logger.error("Error fetching news: %s", e)
+            metrics.inc('fetch_errors_total', kind='news')
+            if raise_errors:
+                raise
             return []
 
+    def _feed_fetcher(self, url):
+        return RssHubTwitterFetcher(url, timeout=self.fetch_timeout, session=self.session, cache=self.feed_cache,
+                                    recorder=self.recorder, fast_parse=self.fast_parse,
+                                    seen=self.seen if self.early_stop else None)
+
+    def start_health_checks(self):
+        """Probes the RSSHub instances every RSSHUB_HEALTH_INTERVAL seconds (only with more than one instance)."""
+        if len(self.rsshub_pool.instances) > 1:
+            self.rsshub_pool.start_health_checks(self.session, self.rsshub_health_interval, timeout=self.fetch_timeout)
+
+    def close(self):
+        self.rsshub_pool.stop_health_checks()
+
+    def fetch_rsshub_route(self, route, key=None, max_items=None, raise_errors=False):
+        """
+        Fetches an RSSHub route (e.g. ``twitter/user/<name>``) from the pool instance that
+        ``key`` (default: the route) is sharded to, failing over to the next instance on errors.
+        """
+        def fetch(url):
+            return self._feed_fetcher(url).fetch(max_items=max_items, raise_errors=True)
+
+        try:
+            return self.rsshub_pool.fetch(route, fetch, key=key, slot=self._host_semaphore)
+        except Exception as e:
+            if raise_errors:
+                raise
+            if isinstance(e, NoHealthyInstance):
+                logger.error("RSSHub实例全部不可用，跳过 %s", route)
+                metrics.inc('fetch_errors_total', kind='request')
+            return []
+
+    @staticmethod
+    def _normalize_user_tweets(username, tweets):
+        return [{
+            'source': f'RSSHub (@{username})',
+            'text': f"{t['title']} {t['summary']}",
+            'url': t['url'],
+            'published': t.get('published', '')
+        } for t in tweets]
+
     def fetch_nitter_rss(self, usernames):
         """Fetches tweets for a list of usernames using a Nitter RSS feed (deprecated, kept for compatibility)."""
         all_tweets = []
         for username in usernames:
             if not username.strip():
                 continue
-            print(f"[WARN]当前username: {username}")
+            logger.debug("当前username: %s", username)
             # 可选：兼容老接口，直接用RSSHub
-            rsshub_url = f"http://localhost:1200/twitter/user/{username}"
-            fetcher = RssHubTwitterFetcher(rsshub_url)
-            tweets = fetcher.fetch()
-            for t in tweets:
-                all_tweets.append({
-                    'source': f'RSSHub (@{username})',
-                    'text': f"{t['title']} {t['summary']}",
-                    'url': t['url'],
-                    'published': t.get('published', '')
-                })
+            tweets = self.fetch_rsshub_route(f"twitter/user/{username}", key=username)
+            all_tweets.extend(self._normalize_user_tweets(username, tweets))
         return all_tweets
 
-    def fetch_reddit_posts(self, subreddits, limit=5):
-        """Fetches recent posts from a list of subreddits."""
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.fetch_per_host_limit)
+            return self._host_semaphores[host]
+
+    def _fetch_user_limited(self, username, raise_errors=False):
+        tweets = self.fetch_rsshub_route(f"twitter/user/{username}", key=username, raise_errors=raise_errors)
+        return self._normalize_user_tweets(username, tweets)
+
+    def fetch_users_concurrently(self, usernames, raise_errors=False, max_workers=None):
+        """
+        Fetches the RSSHub timelines of all usernames at once.
+
+        Requests run on a bounded thread pool (``max_workers``, default ``MAX_WORKERS``; 1 fetches
+        one user after another), at most ``PER_HOST_LIMIT`` in flight per host, each with a
+        ``TIMEOUT`` second limit. A failed user yields an empty list; with
+        ``raise_errors`` the last error is raised when every user failed.
+        :return: dict of username -> tweets, in the same order as ``usernames``.
+        """
+        usernames = [u.strip() for u in usernames if u.strip()]
+        if not usernames:
+            return {}
+        workers = min(max_workers or self.fetch_max_workers, len(usernames))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(u, pool.submit(self._fetch_user_limited, u, raise_errors)) for u in usernames]
+            results, errors = {}, []
+            for username, future in futures:
+                try:
+                    results[username] = future.result()
+                except Exception as e:
+                    logger.error("Error fetching RSSHub timeline for @%s: %s", username, e)
+                    if not raise_errors:
+                        metrics.inc('fetch_errors_total', kind='request')
+                    errors.append(e)
+                    results[username] = []
+        if raise_errors and len(errors) == len(usernames):
+            raise errors[-1]
+        return results
+
+    def fetch_nitter_rss_concurrent(self, usernames):
+        """Concurrent variant of fetch_nitter_rss; returns tweets in the same order as the serial path."""
+        all_tweets = []
+        for tweets in self.fetch_users_concurrently(usernames).values():
+            all_tweets.extend(tweets)
+        return all_tweets
+
+    @staticmethod
+    def _normalize_reddit_post(post, sub_name):
+        return {
+            'source': f'Reddit (r/{sub_name})',
+            'text': f"{post.title} - {post.selftext}"[:250], # Truncate long posts
+            'url': post.url
+        }
+
+    def fetch_reddit_posts(self, subreddits, limit=5, raise_errors=False):
+        """Fetches recent posts from a list of subreddits (with ``raise_errors``, raises when all of them fail)."""
         if not self.reddit_client:
-            print("Warning: Reddit client not configured. Skipping Reddit fetch.")
+            logger.warning("Reddit client not configured. Skipping Reddit fetch.")
             return []
             
-        all_posts = []
+        all_posts, errors = [], []
         for sub_name in subreddits:
             try:
-                print(f"Fetching posts from r/{sub_name}...")
+                logger.info("Fetching posts from r/%s...", sub_name)
                 subreddit = self.reddit_client.subreddit(sub_name)
                 for post in subreddit.new(limit=limit):
-                    all_posts.append({
-                        'source': f'Reddit (r/{sub_name})',
-                        'text': f"{post.title} - {post.selftext}"[:250], # Truncate long posts
-                        'url': post.url
-                    })
+                    all_posts.append(self._normalize_reddit_post(post, sub_name))
             except Exception as e:
-                print(f"Error fetching from subreddit r/{sub_name}: {e}")
+                logger.error("Error fetching from subreddit r/%s: %s", sub_name, e)
+                metrics.inc('fetch_errors_total', kind='reddit')
+                errors.append(e)
+        if raise_errors and subreddits and len(errors) == len(subreddits):
+            raise errors[-1]
         return all_posts
 
-    def fetch_rsshub_twitter(self, rsshub_url, max_items=None):
-        """通过RSSHub地址抓取推文内容"""
-        fetcher = RssHubTwitterFetcher(rsshub_url)
-        return fetcher.fetch(max_items=max_items)
+    def fetch_rsshub_twitter(self, rsshub_url, max_items=None, raise_errors=False):
+        """通过RSSHub地址抓取推文内容（地址属于实例池时按路由分片并自动故障转移）"""
+        for instance in self.rsshub_pool.instances:
+            if rsshub_url.startswith(instance.base_url + '/'):
+                return self.fetch_rsshub_route(rsshub_url[len(instance.base_url) + 1:], max_items=max_items,
+                                               raise_errors=raise_errors)
+        return self._feed_fetcher(rsshub_url).fetch(max_items=max_items, raise_errors=raise_errors)
 
@@ -0,0 +1,241 @@
+import contextlib
+import hashlib
+import math
+import threading
+import time
+from urllib.parse import urlparse
+from core.ingestion import CircuitBreaker
+from utils.logger import get_logger, metrics
+
+logger = get_logger('rsshub_pool')
+
+metrics.describe('rsshub_requests_total', 'RSSHub requests per instance and outcome (ok/error).')
+metrics.describe('rsshub_items_total', 'Items returned per RSSHub instance.')
+metrics.describe('rsshub_failovers_total', 'Requests retried on the next RSSHub instance.')
+
+# Latency-aware weights are quantized so that normal jitter does not move users between
+# instances (which would throw away their ETag cache entries): an instance keeps its full
+# weight until its average latency is twice the fastest instance's.
+LATENCY_WEIGHT_STEPS = ((2.0, 1.0), (4.0, 0.5), (math.inf, 0.25))
+
+
+class NoHealthyInstance(RuntimeError):
+    """Every RSSHub instance in the pool is marked down."""
+
+
+def _unit_hash(text):
+    """Deterministic hash of ``text`` mapped into the open interval (0, 1)."""
+    digest = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+    return (digest + 0.5) / 2 ** 64
+
+
+class RssHubInstance:
+    """
+    One RSSHub base URL with its health (a CircuitBreaker), an exponentially weighted
+    average latency and request / item counters.
+    """
+    def __init__(self, base_url, failure_threshold=2, reset_seconds=60, latency_alpha=0.3):
+        self.base_url = base_url.rstrip('/')
+        self.name = urlparse(self.base_url).netloc or self.base_url
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+        self.latency_alpha = latency_alpha
+        self.latency = None
+        self.requests = 0
+        self.errors = 0
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def url(self, route):
+        return f"{self.base_url}/{route.lstrip('/')}"
+
+    @property
+    def healthy(self):
+        return self.breaker.state != 'open'
+
+    def record_success(self, seconds, items=0, probe=False):
+        """A successful request (or health ``probe``, which is not counted as traffic) taking ``seconds``."""
+        with self._lock:
+            self.latency = seconds if self.latency is None else \
+                self.latency_alpha * seconds + (1 - self.latency_alpha) * self.latency
+            if not probe:
+                self.requests += 1
+                self.items += items
+        self.breaker.record_success()
+        if probe:
+            return
+        metrics.inc('rsshub_requests_total', instance=self.name, outcome='ok')
+        metrics.inc('rsshub_items_total', items, instance=self.name)
+
+    def record_failure(self, probe=False):
+        if not probe:
+            with self._lock:
+                self.requests += 1
+                self.errors += 1
+            metrics.inc('rsshub_requests_total', instance=self.name, outcome='error')
+        was_healthy = self.breaker.state == 'closed'
+        self.breaker.record_failure()
+        if was_healthy and self.breaker.state == 'open':
+            logger.warning("RSSHub实例 %s 连续失败，暂停使用 %.0fs", self.name, self.breaker.reset_seconds)
+
+    def __repr__(self):
+        return f"RssHubInstance({self.base_url!r})"
+
+
+class RssHubPool:
+    """
+    A pool of RSSHub instances that feeds are sharded across.
+
+    Each key (a username, or a route such as ``twitter/home_latest``) is mapped to an ordered
+    list of instances by weighted rendezvous hashing: the same key always goes to the same
+    instance, so its conditional-GET cache entries stay valid, and adding or removing an
+    instance only moves the keys that belonged to it. Instances much slower than the fastest
+    one get a lower weight and shed part of their keys; unhealthy instances (consecutive
+    failures, see ``CircuitBreaker``) are skipped and their keys fail over to the next
+    instance in the key's order until a trial request or a health check succeeds again.
+    """
+    def __init__(self, base_urls, failure_threshold=2, reset_seconds=60, latency_alpha=0.3,
+                 health_path='/healthz'):
+        urls = list(dict.fromkeys(u.strip().rstrip('/') for u in base_urls if u.strip()))
+        if not urls:
+            raise ValueError("RSSHub pool needs at least one base URL")
+        self.instances = [RssHubInstance(u, failure_threshold, reset_seconds, latency_alpha) for u in urls]
+        self.health_path = health_path
+        self._health_stop = None
+        self._health_thread = None
+
+    @classmethod
+    def from_config(cls, config, default_base_url):
+        """
+        [Fetch] RSSHUB_BASE_URLS (comma separated; falls back to RSSHUB_BASE_URL),
+        RSSHUB_FAILURE_THRESHOLD, RSSHUB_RESET_SECONDS and RSSHUB_HEALTH_PATH.
+        """
+        urls = config.get('Fetch', 'RSSHUB_BASE_URLS', fallback='').split(',')
+        if not any(u.strip() for u in urls):
+            urls = [config.get('Fetch', 'RSSHUB_BASE_URL', fallback=default_base_url)]
+        return cls(urls,
+                   failure_threshold=config.getint('Fetch', 'RSSHUB_FAILURE_THRESHOLD', fallback=2),
+                   reset_seconds=config.getfloat('Fetch', 'RSSHUB_RESET_SECONDS', fallback=60),
+                   health_path=config.get('Fetch', 'RSSHUB_HEALTH_PATH', fallback='/healthz'))
+
+    @property
+    def primary(self):
+        return self.instances[0]
+
+    def weights(self):
+        """Current weight per instance: 1, 0.5 or 0.25 depending on latency relative to the fastest."""
+        latencies = [i.latency for i in self.instances if i.latency is not None and i.healthy]
+        best = min(latencies) if latencies else None
+        weights = {}
+        for instance in self.instances:
+            weight = 1.0
+            if best and instance.latency is not None:
+                ratio = instance.latency / best
+                weight = next(w for limit, w in LATENCY_WEIGHT_STEPS if ratio < limit)
+            weights[instance] = weight
+        return weights
+
+    def order(self, key, weights=None):
+        """All instances in preference order for ``key`` (healthy or not)."""
+        weights = weights or self.weights()
+        if len(self.instances) == 1:
+            return list(self.instances)
+        key = key.lower()
+        return sorted(self.instances, reverse=True,
+                      key=lambda i: -weights[i] / math.log(_unit_hash(f"{i.base_url}|{key}")))
+
+    def candidates(self, key):
+        """
+        Yields the instances to try for ``key``, best first, skipping those marked down
+        (a down instance past its reset period is let through once as a trial).
+        """
+        for instance in self.order(key):
+            if instance.breaker.allow():
+                yield instance
+
+    def assignment(self, keys):
+        """Primary instance per key, e.g. to show how the VIP list is spread over the pool."""
+        weights = self.weights()
+        return {key: self.order(key, weights)[0] for key in keys}
+
+    def fetch(self, route, fetch, key=None, slot=None):
+        """
+        Runs ``fetch(url)`` on the first instance for ``key`` (default: the route) that
+        succeeds, where ``fetch`` returns a list of items or raises. ``slot(url)`` is an
+        optional context manager (e.g. a per-host semaphore) entered before the request is
+        timed. Failures mark the instance and move on to the next one; the last error is
+        raised when every instance failed, ``NoHealthyInstance`` when none could be tried.
+        """
+        last_error = None
+        for attempt, instance in enumerate(self.candidates(key or route)):
+            if attempt:
+                metrics.inc('rsshub_failovers_total')
+                logger.info("切换到RSSHub实例 %s: %s", instance.name, route)
+            url = instance.url(route)
+            with slot(url) if slot is not None else contextlib.nullcontext():
+                start = time.perf_counter()
+                try:
+                    items = fetch(url)
+                except Exception as e:
+                    instance.record_failure()
+                    last_error = e
+                    continue
+                seconds = time.perf_counter() - start
+            instance.record_success(seconds, len(items))
+            return items
+        if last_error is not None:
+            raise last_error
+        raise NoHealthyInstance(f"no healthy RSSHub instance for {route}")
+
+    def check_health(self, http, timeout=5):
+        """
+        Probes every instance at ``health_path`` with ``http`` (a requests.Session or the
+        requests module); answers count as successes with their latency, errors as failures.
+        Returns {base_url: healthy}.
+        """
+        for instance in self.instances:
+            start = time.perf_counter()
+            try:
+                response = http.get(instance.url(self.health_path), timeout=timeout)
+                response.raise_for_status()
+            except Exception as e:
+                logger.debug("RSSHub实例 %s 健康检查失败: %s", instance.name, e)
+                instance.record_failure(probe=True)
+                continue
+            instance.record_success(time.perf_counter() - start, probe=True)
+        return {i.base_url: i.healthy for i in self.instances}
+
+    def start_health_checks(self, http, interval, timeout=5):
+        """Runs ``check_health`` every ``interval`` seconds in a daemon thread until ``stop_health_checks``."""
+        if self._health_thread is not None or interval <= 0:
+            return
+        self._health_stop = threading.Event()
+
+        def run():
+            while not self._health_stop.wait(interval):
+                self.check_health(http, timeout)
+
+        self._health_thread = threading.Thread(target=run, name='rsshub-health', daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        if self._health_thread is not None:
+            self._health_stop.set()
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats(self):
+        """Per-instance state, average latency (ms), request / error / item totals and weight."""
+        weights = self.weights()
+        return [{'instance': i.base_url, 'state': i.breaker.state, 'weight': weights[i],
+                 'latency_ms': None if i.latency is None else round(i.latency * 1000, 1),
+                 'requests': i.requests, 'errors': i.errors, 'items': i.items}
+                for i in self.instances]
+
+    def log_stats(self):
+        if len(self.instances) < 2:
+            return
+        for s in self.stats():
+            logger.info("RSSHub实例 %s [%s] 权重 %.2g，平均延迟 %sms，请求 %d（失败 %d），条目 %d",
+                        s['instance'], s['state'], s['weight'],
+                        '-' if s['latency_ms'] is None else f"{s['latency_ms']:.0f}",
+                        s['requests'], s['errors'], s['items'])
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger('seen_store')
+
+
+def content_digest(text):
+    """Stable content digest for items without a URL (unlike hash(), identical across processes)."""
+    normalized = " ".join((text or "").split())
+    return "sha1:" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class SeenStore:
+    """
+    Bounded, persistent set of already-processed item IDs backed by SQLite.
+
+    Membership checks hit an in-memory set (bounded by ``max_items``); additions are
+    appended to the database incrementally instead of rewriting a file. Entries older
+    than ``ttl_days`` or beyond ``max_items`` (oldest first) are evicted by ``prune``.
+    """
+    def __init__(self, db_path, ttl_days=30, max_items=100000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS seen_at_idx ON seen (seen_at)")
+        self._conn.commit()
+        self.prune()
+        self._ids = {row[0] for row in self._conn.execute("SELECT id FROM seen")}
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, item_id):
+        self.update([item_id])
+
+    def update(self, item_ids, seen_at=None):
+        """Appends new IDs; already known IDs are left untouched."""
+        seen_at = time.time() if seen_at is None else seen_at
+        new_ids = [i for i in item_ids if i not in self._ids]
+        if not new_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (id, seen_at) VALUES (?, ?)",
+                [(i, seen_at) for i in new_ids],
+            )
+            self._conn.commit()
+            self._ids.update(new_ids)
+
+    def prune(self, now=None):
+        """Evicts expired entries and trims the store to ``max_items``. Returns the number removed."""
+        now = time.time() if now is None else now
+        removed = []
+        with self._lock:
+            if self.ttl_seconds:
+                removed += [r[0] for r in self._conn.execute(
+                    "SELECT id FROM seen WHERE seen_at < ?", (now - self.ttl_seconds,))]
+                self._conn.execute("DELETE FROM seen WHERE seen_at < ?", (now - self.ttl_seconds,))
+            if self.max_items:
+                count = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+                excess = count - self.max_items
+                if excess > 0:
+                    oldest = [r[0] for r in self._conn.execute(
+                        "SELECT id FROM seen ORDER BY seen_at ASC LIMIT ?", (excess,))]
+                    self._conn.executemany("DELETE FROM seen WHERE id = ?", [(i,) for i in oldest])
+                    removed += oldest
+            self._conn.commit()
+            if hasattr(self, '_ids'):
+                self._ids.difference_update(removed)
+        return len(removed)
+
+    def migrate_from_json(self, json_path):
+        """
+        One-time import of a legacy tweet_log.json (a JSON list of IDs).
+        The file is renamed to ``*.migrated`` afterwards so the import never runs twice.
+        :return: number of imported IDs
+        """
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            legacy_ids = json.load(f)
+        # 旧版用hash()生成的内容ID每次重启都会变化，已无意义，直接丢弃
+        legacy_ids = [i for i in legacy_ids if not str(i).lstrip('-').isdigit()]
+        before = len(self)
+        self.update(legacy_ids)
+        os.replace(json_path, json_path + '.migrated')
+        imported = len(self) - before
+        logger.info("已从 %s 迁移 %d 条已处理推文ID。", json_path, imported)
+        self.prune()
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
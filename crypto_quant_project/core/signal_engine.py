@@ -0,0 +1,159 @@
+import math
+import os
+import numpy as np
+
+
+class SymbolSeries:
+    """
+    Fixed-capacity ring buffer of (timestamp, score, weight) for one symbol, with running
+    exponentially decayed sums so the current score is O(1) to read and O(batch) to update.
+
+    The sums are kept relative to a reference time ``t_ref``:
+        S = sum(w_i * s_i * exp(-lam * (t_ref - t_i))),  W = sum(w_i * exp(-lam * (t_ref - t_i)))
+    Advancing ``t_ref`` multiplies both by one decay factor; an item falling out of the
+    buffer has its own term subtracted.
+    """
+    def __init__(self, capacity, decay_rate):
+        self.capacity = capacity
+        self.decay_rate = decay_rate
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.score = np.zeros(capacity, dtype=np.float32)
+        self.weight = np.zeros(capacity, dtype=np.float32)
+        self.head = 0    # next write position
+        self.count = 0
+        self.t_ref = None
+        self.s_sum = 0.0
+        self.w_sum = 0.0
+
+    def _advance(self, t):
+        if self.t_ref is None:
+            self.t_ref = t
+        elif t > self.t_ref:
+            factor = math.exp(-self.decay_rate * (t - self.t_ref))
+            self.s_sum *= factor
+            self.w_sum *= factor
+            self.t_ref = t
+
+    def append(self, timestamps, scores, weights):
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(timestamps):
+            return
+        scores = np.asarray(scores, dtype=np.float32)
+        weights = np.asarray(weights, dtype=np.float32)
+        self._advance(float(timestamps.max()))
+        for start in range(0, len(timestamps), self.capacity):
+            ts = timestamps[start:start + self.capacity]
+            sc = scores[start:start + self.capacity]
+            wt = weights[start:start + self.capacity]
+            positions = (self.head + np.arange(len(ts))) % self.capacity
+            # Remove the contribution of the entries about to be overwritten
+            overwrite = positions[self.capacity - self.count:]
+            if len(overwrite):
+                decay = np.exp(-self.decay_rate * (self.t_ref - self.ts[overwrite]))
+                self.s_sum -= float(np.sum(self.weight[overwrite] * self.score[overwrite] * decay))
+                self.w_sum -= float(np.sum(self.weight[overwrite] * decay))
+            decay = np.exp(-self.decay_rate * (self.t_ref - ts))
+            self.s_sum += float(np.sum(wt * sc * decay))
+            self.w_sum += float(np.sum(wt * decay))
+            self.ts[positions], self.score[positions], self.weight[positions] = ts, sc, wt
+            self.head = int((self.head + len(ts)) % self.capacity)
+            self.count = min(self.capacity, self.count + len(ts))
+
+    def value(self, now=None):
+        """Returns (decayed weighted mean score, decayed total weight at ``now``)."""
+        if not self.count or self.w_sum <= 0:
+            return 0.0, 0.0
+        weight = self.w_sum
+        if now is not None and now > self.t_ref:
+            weight *= math.exp(-self.decay_rate * (now - self.t_ref))
+        return self.s_sum / self.w_sum, weight
+
+    def ordered(self):
+        """Buffer contents, oldest first."""
+        idx = (self.head - self.count + np.arange(self.count)) % self.capacity
+        return self.ts[idx], self.score[idx], self.weight[idx]
+
+    def recompute(self):
+        """Rebuilds the running sums from the buffer (used after loading)."""
+        ts, score, weight = self.ordered()
+        self.t_ref = float(ts.max()) if len(ts) else None
+        if self.t_ref is None:
+            self.s_sum = self.w_sum = 0.0
+            return
+        decay = np.exp(-self.decay_rate * (self.t_ref - ts))
+        self.s_sum = float(np.sum(weight * score * decay))
+        self.w_sum = float(np.sum(weight * decay))
+
+
+class SignalEngine:
+    """
+    Per-symbol sentiment signal from a rolling, exponentially time-decayed and
+    confidence-weighted series of scored items.
+
+    ``thresholds`` maps a symbol to (buy_threshold, sell_threshold); symbols without an
+    entry use the defaults. A symbol whose decayed evidence weight is below ``min_weight``
+    stays on HOLD.
+    """
+    def __init__(self, symbols, half_life_seconds=3600, capacity=4096, thresholds=None,
+                 buy_threshold=0.2, sell_threshold=-0.2, min_weight=0.5):
+        self.half_life_seconds = half_life_seconds
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.capacity = capacity
+        self.thresholds = dict(thresholds or {})
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.min_weight = min_weight
+        self.series = {s: SymbolSeries(capacity, self.decay_rate) for s in symbols}
+
+    def update(self, symbol, timestamps, scores, weights):
+        """Adds a batch of scored items for one symbol."""
+        if symbol not in self.series:
+            self.series[symbol] = SymbolSeries(self.capacity, self.decay_rate)
+        self.series[symbol].append(timestamps, scores, weights)
+
+    def score(self, symbol, now=None):
+        """(decayed score, decayed weight) for a symbol."""
+        series = self.series.get(symbol)
+        return series.value(now) if series else (0.0, 0.0)
+
+    def signal(self, symbol, now=None):
+        score, weight = self.score(symbol, now)
+        if weight < self.min_weight:
+            return 'HOLD'
+        buy, sell = self.thresholds.get(symbol, (self.buy_threshold, self.sell_threshold))
+        if score > buy:
+            return 'BUY'
+        if score < sell:
+            return 'SELL'
+        return 'HOLD'
+
+    def signals(self, now=None):
+        return {symbol: self.signal(symbol, now) for symbol in self.series}
+
+    def save(self, path):
+        """Persists all buffers in one compressed .npz file (written atomically)."""
+        arrays = {}
+        for symbol, series in self.series.items():
+            ts, score, weight = series.ordered()
+            arrays[f'{symbol}.ts'], arrays[f'{symbol}.score'], arrays[f'{symbol}.weight'] = ts, score, weight
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Restores buffers saved by ``save``; a missing file is ignored. Returns True if loaded."""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            for key in data.files:
+                if not key.endswith('.ts'):
+                    continue
+                symbol = key[:-len('.ts')]
+                series = self.series.setdefault(symbol, SymbolSeries(self.capacity, self.decay_rate))
+                ts, score, weight = data[key], data[f'{symbol}.score'], data[f'{symbol}.weight']
+                keep = slice(max(0, len(ts) - self.capacity), None)
+                n = len(ts[keep])
+                series.ts[:n], series.score[:n], series.weight[:n] = ts[keep], score[keep], weight[keep]
+                series.head, series.count = n % self.capacity, n
+                series.recompute()
+        return True
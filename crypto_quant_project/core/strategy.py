@@ -0,0 +1,86 @@
+from core.exchange import ExchangeManager
+from utils.logger import get_logger
+
+logger = get_logger('strategy')
+
+
+class TradingStrategy:
+    """
+    Places one market order per signal through ExchangeManager, synchronously.
+    The long-running pipeline uses core.execution.OrderExecutor instead.
+    """
+    def __init__(self, exchange_manager, trade_size):
+        """
+        Initializes the TradingStrategy.
+
+        :param exchange_manager: An instance of ExchangeManager.
+        :param trade_size: The default amount to trade for each order.
+        """
+        self.exchange_manager = exchange_manager
+        self.trade_size = trade_size
+
+    def execute(self, signal, exchange_name, symbol):
+        """
+        Executes a trading strategy based on a given signal.
+
+        :param signal: The trading signal ('BUY', 'SELL', 'HOLD').
+        :param exchange_name: The name of the exchange to trade on (e.g., 'binance').
+        :param symbol: The trading symbol (e.g., 'BTC/USDT').
+        """
+        if signal not in ('BUY', 'SELL', 'HOLD'):
+            logger.warning("Unknown signal '%s' received. No action will be taken.", signal)
+            return None
+
+        logger.info("Executing strategy for %s on %s with signal: %s", symbol, exchange_name, signal)
+
+        if signal == 'HOLD':
+            logger.info("Signal is HOLD. No trade will be executed.")
+            return None
+
+        side = 'buy' if signal == 'BUY' else 'sell'
+        try:
+            logger.info("Attempting to place a market %s order for %s %s...", side, self.trade_size, symbol.split('/')[0])
+            order = self.exchange_manager.create_order(
+                exchange_name,
+                symbol,
+                'market',
+                side,
+                self.trade_size,
+            )
+            if order:
+                logger.info("Successfully placed order: id=%s symbol=%s side=%s amount=%s",
+                            order.get('id'), order.get('symbol'), order.get('side'), order.get('amount'))
+                return order
+            logger.error("Failed to place order. Check logs from ExchangeManager for details.")
+        except Exception as e:
+            logger.error("An unexpected error occurred during order execution: %s", e)
+        return None
+
+
+if __name__ == '__main__':
+    print("Running TradingStrategy module example...")
+    try:
+        manager = ExchangeManager(config_file='../config.ini')
+        if not manager.exchanges:
+            raise ValueError("No exchanges loaded. Did you set up your API keys in config.ini?")
+
+        strategy = TradingStrategy(exchange_manager=manager, trade_size=0.01)
+
+        print("\n--- SIMULATION ---")
+        print("WARNING: The following calls will attempt to execute REAL trades if API keys are valid.")
+
+        target_exchange = 'binance'
+        target_symbol = 'BTC/USDT'
+
+        if manager.get_exchange(target_exchange):
+            print(f"\n1. Simulating a 'BUY' signal for {target_symbol} on {target_exchange}.")
+            # strategy.execute('BUY', target_exchange, target_symbol)
+            print("   (Execution is commented out by default to prevent accidental trades)")
+
+            print(f"\n2. Simulating a 'HOLD' signal for {target_symbol} on {target_exchange}.")
+            strategy.execute('HOLD', target_exchange, target_symbol)
+        else:
+            print(f"\nCould not run simulation: Exchange '{target_exchange}' is not configured.")
+    except (ValueError, FileNotFoundError) as e:
+        print(f"\nCould not run example: {e}")
+        print("Please ensure 'config.ini' exists in the project root and is configured.")
@@ -0,0 +1,50 @@
+import re
+
+_CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯]')
+
+
+def estimate_tokens(text):
+    """
+    Cheap token count estimate for budgeting, without a tokenizer dependency.
+    CJK characters count as roughly one token each, everything else as ~4 characters per token.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts a text so that its estimate fits into ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def pack_texts(texts, max_tokens, separator_tokens=1):
+    """
+    Greedily packs texts, in order, into chunks whose estimated size stays within ``max_tokens``.
+    A single text larger than the budget is truncated and gets a chunk of its own.
+    :return: List of lists of texts.
+    """
+    chunks, current, used = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text) + separator_tokens
+        if tokens > max_tokens:
+            text = truncate_to_tokens(text, max_tokens - separator_tokens)
+            tokens = max_tokens
+        if current and used + tokens > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
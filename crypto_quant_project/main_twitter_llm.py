@@ -1,104 +1,247 @@
 import time
-import configparser
+import argparse
+import logging
 import os
-import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from core.config import load_config
 from core.resource_fetcher import ResourceFetcher
 from core.llm_analyzer import LLMAnalyzer
+from core.seen_store import SeenStore, content_digest
+from core.token_budget import estimate_tokens, pack_texts
+from core.dedupe import NearDuplicateIndex
+from core.prescorer import PreScorer
+from core.signal_engine import SignalEngine
+from core.recorder import Recorder
+from core.reddit_stream import RedditStream
+from core.ingestion import (CircuitBreaker, Ingestion, Source, items_from_feed, items_from_news,
+                            items_from_reddit, items_from_user_tweets)
+from utils.logger import get_logger, metrics, setup_logging_from_config, start_metrics_exporter, ITEMS_LOGGER
 
-def load_tweet_log(log_path):
-    if os.path.exists(log_path):
-        with open(log_path, 'r', encoding='utf-8') as f:
-            return set(json.load(f))
-    return set()
+logger = get_logger('main')
+items_logger = logging.getLogger(ITEMS_LOGGER)
 
-def save_tweet_log(log_path, tweet_ids):
-    with open(log_path, 'w', encoding='utf-8') as f:
-        json.dump(list(tweet_ids), f, ensure_ascii=False, indent=2)
+# analyze_text 自身情绪分析模板的大致token数
+SENTIMENT_PROMPT_OVERHEAD_TOKENS = 300
+
+def open_seen_store(config, base_dir):
+    """打开已处理推文库，并一次性迁移旧版 tweet_log.json。"""
+    db_path = config.get('Storage', 'SEEN_DB', fallback='seen_items.db')
+    if not os.path.isabs(db_path):
+        db_path = os.path.join(base_dir, db_path)
+    seen_store = SeenStore(db_path,
+                           ttl_days=config.getint('Storage', 'SEEN_TTL_DAYS', fallback=30),
+                           max_items=config.getint('Storage', 'SEEN_MAX_ITEMS', fallback=100000))
+    seen_store.migrate_from_json(os.path.join(base_dir, 'tweet_log.json'))
+    return seen_store
 
 def get_tweet_id(item):
-    # 优先用url，否则用内容hash
+    # 优先用url，否则用稳定的内容摘要
     if 'url' in item and item['url']:
         return item['url']
-    return str(hash(item.get('text', '')))
+    return content_digest(item.get('text', ''))
+
+def _log_item(pub_time, tweet_text, is_new):
+    # 逐条推文输出仅在 [Logging] VERBOSE_ITEMS=true 时启用
+    if items_logger.isEnabledFor(logging.INFO):
+        items_logger.info("[%s] (%s) %s...", pub_time, "新" if is_new else "已处理", tweet_text[:200])
+
+def aggregate_items(items, tweet_log=None, new_tweet_ids=None, dedupe_index=None, dedupe_texts=None, now=None):
+    """
+    过滤已处理条目、近重复合并，返回送入分析阶段的文本列表。
+    :param items: core.ingestion.Item 列表（任意数据源）
+    :param dedupe_texts: 传入列表时追加本轮新建簇的代表原文，分析失败时可用 dedupe_index.forget 回滚
+    :param now: 近重复窗口使用的时间戳（回放时传入录制时间），None为当前时间
+    """
+    pairs = []  # (送LLM的文本, 用于近重复检测的原文)
+    for item in items:
+        is_new = tweet_log is None or item.id not in tweet_log
+        _log_item(item.published, item.prompt_text, is_new)
+        if not is_new:
+            continue
+        if new_tweet_ids is not None:
+            new_tweet_ids.add(item.id)
+        # 去空
+        if item.text and item.text.strip():
+            pairs.append((item.prompt_text.strip(), item.text))
+    all_texts = [t for t, _ in pairs]
+    metrics.inc('items_new_total', len(all_texts))
+    if dedupe_index is not None and pairs:
+        # 近重复合并：每簇只保留一条代表推文，[xN]标注本轮提及次数；与前几轮重复的直接丢弃
+        with metrics.span('dedupe', logger):
+            clusters = dedupe_index.collapse([raw for _, raw in pairs], now=now)
+        if dedupe_texts is not None:
+            dedupe_texts.extend(pairs[i][1] for i, _ in clusters)
+        all_texts = [all_texts[i] if n == 1 else f"[x{n}] {all_texts[i]}" for i, n in clusters]
+        metrics.inc('items_collapsed_total', len(pairs) - len(all_texts))
+        logger.info("近重复合并: %d 条 -> %d 条", len(pairs), len(all_texts),
+                    extra={'before': len(pairs), 'after': len(all_texts)})
+    logger.info("本轮聚合新内容 %d 条", len(all_texts), extra={'new_items': len(all_texts)})
+    return all_texts
 
-def aggregate_twitter_content(resource_fetcher, vip_users, rsshub_url=None, max_items=20, tweet_log=None, new_tweet_ids=None):
-    all_texts = []
-    new_tweets_found = False
+def aggregate_twitter_content(resource_fetcher, vip_users, rsshub_url=None, max_items=20, tweet_log=None, new_tweet_ids=None, concurrent=False, dedupe_index=None, now=None):
+    items = []
     # 聚合VIP用户内容（每人只取5条）
     if vip_users:
-        print("\n=== VIP用户推文 ===")
+        with metrics.span('fetch', logger):
+            # 并发模式：一次性并发抓取所有VIP用户，再按原顺序处理
+            prefetched = resource_fetcher.fetch_users_concurrently(vip_users) if concurrent else None
         for user in vip_users:
-            print(f"\n>> 抓取VIP用户 @{user} 最新5条推文...")
-            tweets = resource_fetcher.fetch_nitter_rss([user])
-            user_new = False
-            for item in tweets[:5]:
-                tweet_id = get_tweet_id(item)
-                tweet_text = f"[VIP][{user}] {item['text']}"
-                pub_time = item.get('published', '')
-                if tweet_log is not None and tweet_id in tweet_log:
-                    print(f"[{pub_time}] (已处理) {tweet_text[:200]}...")
-                else:
-                    print(f"[{pub_time}] (新) {tweet_text[:200]}...")
-                    all_texts.append(tweet_text)
-                    if new_tweet_ids is not None:
-                        new_tweet_ids.add(tweet_id)
-                    user_new = True
-            if not user_new:
-                print(f"[INFO] 用户@{user}无新推文。")
-    
-    if rsshub_url:
-        print("\n=== RSSHub推文 ===")
-        rsshub_tweets = resource_fetcher.fetch_rsshub_twitter(rsshub_url, max_items=max_items)
-        rsshub_new = False
-        for t in rsshub_tweets:
-            tweet_id = t.get('url') or str(hash(t.get('title', '') + t.get('summary', '')))
-            tweet_text = f"{t['title']} {t['summary']}"
-            pub_time = t.get('published', '')
-            if tweet_log is not None and tweet_id in tweet_log:
-                print(f"[{pub_time}] (已处理) {tweet_text[:200]}...")
+            if prefetched is not None:
+                tweets = prefetched.get(user, [])
             else:
-                print(f"[{pub_time}] (新) {tweet_text[:200]}...")
-                all_texts.append(tweet_text)
-                if new_tweet_ids is not None:
-                    new_tweet_ids.add(tweet_id)
-                rsshub_new = True
-        if not rsshub_new:
-            print(f"[INFO] RSSHub无新推文。")
-    # 去重和去空
-    all_texts = [t.strip() for t in all_texts if t and t.strip()]
-    return all_texts
+                with metrics.span('fetch', logger):
+                    tweets = resource_fetcher.fetch_nitter_rss([user])
+            items.extend(items_from_user_tweets(user, tweets[:5]))
+    if rsshub_url:
+        with metrics.span('fetch', logger):
+            items.extend(items_from_feed(resource_fetcher.fetch_rsshub_twitter(rsshub_url, max_items=max_items)))
+    return aggregate_items(items, tweet_log, new_tweet_ids, dedupe_index, now=now)
 
-def generate_signal_from_llm(llm_analyzer, texts, symbols):
+def open_reddit_stream(config, resource_fetcher, subreddits, base_dir=None):
+    """按 [Ingestion] REDDIT_STREAM_* 配置启动后台Reddit推送流；未配置Reddit客户端时返回None。"""
+    if resource_fetcher.reddit_client is None:
+        logger.warning("未配置Reddit客户端，跳过 reddit_stream 数据源")
+        return None
+    checkpoint = config.get('Ingestion', 'REDDIT_STREAM_CHECKPOINT', fallback=os.path.join('.cache', 'reddit_stream.json'))
+    if checkpoint and base_dir and not os.path.isabs(checkpoint):
+        checkpoint = os.path.join(base_dir, checkpoint)
+    # 以Item ID作为提交键，与已处理记录一致
+    return RedditStream(resource_fetcher.reddit_client, subreddits,
+                        queue_size=config.getint('Ingestion', 'REDDIT_STREAM_QUEUE_SIZE', fallback=500),
+                        checkpoint_path=checkpoint or None,
+                        key=lambda post: items_from_reddit([post])[0].id).start()
+
+def open_ingestion(config, resource_fetcher, vip_users, rsshub_url, max_items=20, base_dir=None):
     """
-    组装推文内容为prompt，调用LLM分析，输出每个币种的买入/卖出/观望建议
+    按 [Ingestion] 配置创建多数据源并发抓取层。
+    SOURCES 可选 twitter_vip, twitter_home, news, reddit, reddit_stream；每个源有各自的截止时间与熔断器。
+    [Fetch] CONCURRENT=false 时各数据源依次抓取，VIP用户也逐个抓取。
+    reddit_stream 在后台持续接收新帖，每轮只取出已到达的帖子，不再按轮轮询；
+    其断点在调用方写入已处理记录后通过 Ingestion.commit 推进（已处理过而被过滤的帖子同样提交）；
+    取出后未处理的帖子（如超过截止时间被丢弃）通过 Ingestion.release 交还，下一轮重新取出。
     """
-    if not texts:
-        print("无新推文，无需分析。")
-        return {s: 'HOLD' for s in symbols}
-    
-    # 为所有币种统一分析
+    names = [n.strip() for n in config.get('Ingestion', 'SOURCES', fallback='twitter_vip, twitter_home').split(',') if n.strip()]
+    keywords = config.get('Ingestion', 'NEWS_KEYWORDS', fallback='bitcoin OR ethereum OR crypto')
+    subreddits = [s.strip() for s in config.get('Ingestion', 'REDDIT_SUBREDDITS', fallback='CryptoCurrency, Bitcoin').split(',') if s.strip()]
+    reddit_limit = config.getint('Ingestion', 'REDDIT_LIMIT', fallback=5)
+    concurrent = config.getboolean('Fetch', 'CONCURRENT', fallback=True)
+
+    def fetch_vip():
+        tweets = resource_fetcher.fetch_users_concurrently(vip_users, raise_errors=True,
+                                                           max_workers=None if concurrent else 1)
+        return [item for user in vip_users for item in items_from_user_tweets(user, tweets.get(user, [])[:5])]
+
+    fetchers = {
+        'twitter_vip': fetch_vip,
+        'twitter_home': lambda: items_from_feed(resource_fetcher.fetch_rsshub_twitter(rsshub_url, max_items=max_items, raise_errors=True)),
+        'news': lambda: items_from_news(resource_fetcher.fetch_news(keywords, raise_errors=True)),
+        'reddit': lambda: items_from_reddit(resource_fetcher.fetch_reddit_posts(subreddits, limit=reddit_limit, raise_errors=True)),
+        'reddit_stream': None,
+    }
+    sources = []
+    for name in names:
+        if name not in fetchers:
+            logger.warning("未知数据源 %s，已忽略", name)
+            continue
+        if name == 'twitter_vip' and not vip_users:
+            continue
+        close = commit = release = None
+        if name == 'reddit_stream':
+            stream = open_reddit_stream(config, resource_fetcher, subreddits, base_dir)
+            if stream is None:
+                continue
+            fetchers[name] = lambda stream=stream: items_from_reddit(stream.drain())
+            close, commit, release = stream.stop, stream.commit, stream.release
+        breaker = CircuitBreaker(failure_threshold=config.getint('Ingestion', 'BREAKER_FAILURES', fallback=3),
+                                 reset_seconds=config.getfloat('Ingestion', 'BREAKER_RESET_SECONDS', fallback=300))
+        deadline = config.getfloat('Ingestion', f'{name.upper()}_DEADLINE',
+                                   fallback=config.getfloat('Ingestion', 'DEADLINE', fallback=20))
+        sources.append(Source(name, fetchers[name], deadline=deadline, breaker=breaker, close=close, commit=commit,
+                              release=release))
+    return Ingestion(sources, concurrent=concurrent)
+
+def build_signal_prompt(texts, symbols):
     symbols_str = ", ".join(symbols)
-    prompt = f"""请根据以下所有推特内容，分别判断对这些币种的操作建议：{symbols_str}
+    return f"""请根据以下所有推特内容，分别判断对这些币种的操作建议：{symbols_str}
 要求：
 1. 分析每个币种相关的市场情绪
 2. 给出每个币种的操作建议（买入/卖出/观望）
 3. 简要说明理由
+4. 前缀[xN]表示有N条相似推文（转发或多账号发布）被合并，可作为热度参考
 
 推文内容：
 """ + "\n".join(texts)
+
+def merge_analyses(analyses, weights):
+    """
+    按置信度加权合并各分块的LLM结果。
+    每块权重 = 置信度 × 该块推文条数；返回合并后的 {'sentiment_score', 'confidence'}，全部无效时返回None。
+    """
+    valid = [(a, w) for a, w in zip(analyses, weights) if a and 'sentiment_score' in a]
+    if not valid:
+        return None
+    total_weight = sum(w for _, w in valid)
+    confidence = sum(float(a.get('confidence', 0)) * w for a, w in valid) / total_weight
+    score_weight = sum(float(a.get('confidence', 0)) * w for a, w in valid)
+    if score_weight > 0:
+        score = sum(float(a['sentiment_score']) * float(a.get('confidence', 0)) * w for a, w in valid) / score_weight
+    else:
+        score = sum(float(a['sentiment_score']) * w for a, w in valid) / total_weight
+    return {'sentiment_score': score, 'confidence': confidence}
+
+def generate_signal_from_llm(llm_analyzer, texts, symbols, chunk_tokens=6000, parallelism=4, prescorer=None):
+    """
+    组装推文内容为prompt，调用LLM分析，输出每个币种的买入/卖出/观望建议
+
+    推文按token预算（chunk_tokens）切分为多个分块，并发（parallelism）分析后按置信度加权合并。
+    若提供 prescorer，则先在本地过滤无关推文、直接判定情绪明确的推文，只把模糊或高影响的推文交给LLM。
+    """
+    if not texts:
+        logger.info("无新推文，无需分析。")
+        return {s: 'HOLD' for s in symbols}
+
+    analyses, weights = [], []
+    if prescorer is not None:
+        with metrics.span('prescore', logger):
+            routed = prescorer.route(texts)
+        for route in ('drop', 'local', 'llm'):
+            metrics.inc('items_routed_total', sum(1 for r in routed if r['route'] == route), route=route)
+        local = [(r, prescorer.mentions(t)) for t, r in zip(texts, routed) if r['route'] == 'local']
+        if local:
+            analyses.append(merge_analyses(
+                [{'sentiment_score': r['score'], 'confidence': r['confidence']} for r, _ in local],
+                [mentions for _, mentions in local]))
+            weights.append(sum(mentions for _, mentions in local))
+        texts = [t for t, r in zip(texts, routed) if r['route'] == 'llm']
+        dropped = sum(1 for r in routed if r['route'] == 'drop')
+        logger.info("本地预筛: 丢弃无关 %d 条，本地判定 %d 条，送LLM %d 条", dropped, len(local), len(texts),
+                    extra={'dropped': dropped, 'local': len(local), 'llm': len(texts)})
+
+    if texts:
+        # 为所有币种统一分析；按预算切块，预留prompt模板本身的token
+        overhead = estimate_tokens(build_signal_prompt([], symbols)) + SENTIMENT_PROMPT_OVERHEAD_TOKENS
+        chunks = pack_texts(texts, max(chunk_tokens - overhead, 200))
+        prompts = [build_signal_prompt(chunk, symbols) for chunk in chunks]
+        logger.info("LLM分析: 共 %d 条推文，切分为 %d 块", len(texts), len(chunks))
+        logger.debug("LLM Prompt Preview:\n%s...", prompts[0][:500])
+        with metrics.span('llm', logger):
+            if len(prompts) == 1:
+                analyses.append(llm_analyzer.analyze_text(prompts[0]))
+            else:
+                with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(prompts)))) as pool:
+                    analyses.extend(pool.map(llm_analyzer.analyze_text, prompts))
+        weights.extend(len(chunk) for chunk in chunks)
+    analysis = merge_analyses(analyses, weights)
     
-    print(f"\n[LLM Prompt Preview]\n{prompt[:500]}...\n")
-    analysis = llm_analyzer.analyze_text(prompt)
-    
-    if not analysis or 'sentiment_score' not in analysis:
-        print("LLM未返回有效分析，建议全部观望。")
+    if not analysis:
+        logger.warning("LLM未返回有效分析，建议全部观望。")
         return {s: 'HOLD' for s in symbols}
     
     # 使用统一的情绪分数
     score = analysis['sentiment_score']
     confidence = analysis.get('confidence', 0)
-    print(f"整体市场情绪分: {score:.2f}，置信度: {confidence:.2f}")
+    logger.info("整体市场情绪分: %.2f，置信度: %.2f", score, confidence, extra={'score': score, 'confidence': confidence})
     
     # 根据情绪分数生成信号
     signals = {}
@@ -112,47 +255,259 @@ def generate_signal_from_llm(llm_analyzer, texts, symbols):
     
     return signals
 
-def main_once(tweet_log_path, tweet_log):
-    config_path = os.path.join(os.path.dirname(__file__), 'config.ini')
-    config = configparser.ConfigParser()
-    config.read(config_path)
+def open_dedupe_index(config):
+    """按配置创建跨轮次的近重复索引，[Dedupe] ENABLED=false 时返回None。"""
+    if not config.getboolean('Dedupe', 'ENABLED', fallback=True):
+        return None
+    return NearDuplicateIndex(max_distance=config.getint('Dedupe', 'MAX_DISTANCE', fallback=3),
+                              window_seconds=config.getfloat('Dedupe', 'WINDOW_HOURS', fallback=6) * 3600)
+
+def generate_symbol_signals(llm_analyzer, texts, symbols, signal_engine, prescorer, now=None):
+    """
+    按币种逐条打分并增量更新信号引擎，输出每个币种各自的买入/卖出/观望建议。
+
+    prescorer 负责识别每条推文涉及的币种并本地判定情绪明确的推文，其余推文通过
+    analyze_batch 逐条交给LLM打分；每条结果以 置信度×提及次数 为权重计入相关币种的时间序列。
+    """
+    now = time.time() if now is None else now
+    if texts:
+        with metrics.span('prescore', logger):
+            routed = prescorer.route(texts)
+        for route in ('drop', 'local', 'llm'):
+            metrics.inc('items_routed_total', sum(1 for r in routed if r['route'] == route), route=route)
+        llm_items = [{'id': i, 'text': t} for i, (t, r) in enumerate(zip(texts, routed)) if r['route'] == 'llm']
+        with metrics.span('llm', logger):
+            llm_results = llm_analyzer.analyze_batch(llm_items) if llm_items else {}
+        updates = {}  # symbol -> ([score], [weight])
+        for i, (text, r) in enumerate(zip(texts, routed)):
+            if r['route'] == 'drop':
+                continue
+            result = llm_results.get(i) if r['route'] == 'llm' else {'sentiment_score': r['score'], 'confidence': r['confidence']}
+            if not result:
+                continue
+            weight = float(result.get('confidence', 0)) * prescorer.mentions(text)
+            for symbol in r['symbols']:
+                scores, weights = updates.setdefault(symbol, ([], []))
+                scores.append(float(result['sentiment_score']))
+                weights.append(weight)
+        with metrics.span('signal', logger):
+            for symbol, (scores, weights) in updates.items():
+                signal_engine.update(symbol, [now] * len(scores), scores, weights)
+        logger.info("信号引擎本轮新增打分: %s", ", ".join(f"{s} {len(v[0])}条" for s, v in updates.items()) or "无")
+    else:
+        logger.info("无新推文，沿用历史情绪序列。")
+
+    signals = {}
+    for symbol in symbols:
+        score, weight = signal_engine.score(symbol, now)
+        signals[symbol] = signal_engine.signal(symbol, now)
+        logger.info("%s 衰减情绪分: %.2f，有效权重: %.2f", symbol, score, weight,
+                    extra={'symbol': symbol, 'score': score, 'weight': weight})
+    return signals
+
+def build_signal_engine(config, symbols):
+    """按 [Signals] 配置创建空的按币种信号引擎（不加载持久化状态）。
+    THRESHOLDS 格式：BTC:0.2/-0.2, ETH:0.3/-0.25（买入阈值/卖出阈值）"""
+    thresholds = {}
+    for entry in config.get('Signals', 'THRESHOLDS', fallback='').split(','):
+        if ':' in entry and '/' in entry:
+            symbol, values = entry.split(':', 1)
+            buy, sell = values.split('/', 1)
+            thresholds[symbol.strip().upper()] = (float(buy), float(sell))
+    return SignalEngine(symbols,
+                        half_life_seconds=config.getfloat('Signals', 'HALF_LIFE_MINUTES', fallback=60) * 60,
+                        capacity=config.getint('Signals', 'CAPACITY', fallback=4096),
+                        thresholds=thresholds,
+                        buy_threshold=config.getfloat('Signals', 'BUY_THRESHOLD', fallback=0.2),
+                        sell_threshold=config.getfloat('Signals', 'SELL_THRESHOLD', fallback=-0.2),
+                        min_weight=config.getfloat('Signals', 'MIN_WEIGHT', fallback=0.5))
+
+def open_signal_engine(config, symbols, base_dir):
+    """按配置创建按币种的信号引擎并加载持久化状态，[Signals] ENGINE=false 时返回 (None, None)。"""
+    if not config.getboolean('Signals', 'ENGINE', fallback=True):
+        return None, None
+    engine = build_signal_engine(config, symbols)
+    state_path = config.get('Signals', 'STATE_FILE', fallback='signal_state.npz')
+    if not os.path.isabs(state_path):
+        state_path = os.path.join(base_dir, state_path)
+    if engine.load(state_path):
+        logger.info("信号引擎已加载历史情绪序列: %s", state_path)
+    return engine, state_path
+
+def open_prescorer(config, symbols):
+    """按配置创建本地预筛器，[PreScore] ENABLED=false 时返回None。
+    ALIASES 格式：BTC:bitcoin|比特币, ETH:ether|以太坊"""
+    if not config.getboolean('PreScore', 'ENABLED', fallback=True):
+        return None
+    aliases = {}
+    for entry in config.get('PreScore', 'ALIASES', fallback='').split(','):
+        if ':' in entry:
+            symbol, names = entry.split(':', 1)
+            aliases[symbol.strip().upper()] = [n.strip() for n in names.split('|') if n.strip()]
+    return PreScorer(symbols, aliases=aliases,
+                     local_threshold=config.getfloat('PreScore', 'LOCAL_THRESHOLD', fallback=0.5),
+                     min_hits=config.getint('PreScore', 'MIN_HITS', fallback=2),
+                     vip_to_llm=config.getboolean('PreScore', 'VIP_TO_LLM', fallback=True))
+
+def open_recorder(config, base_dir):
+    """[Backtest] RECORD=true 时创建本次运行的录制文件（供 replay_backtest.py 回放），否则返回None。"""
+    if not config.getboolean('Backtest', 'RECORD', fallback=False):
+        return None
+    record_dir = config.get('Backtest', 'RECORD_DIR', fallback='recordings')
+    if not os.path.isabs(record_dir):
+        record_dir = os.path.join(base_dir, record_dir)
+    path = os.path.join(record_dir, datetime.now().strftime('%Y%m%d-%H%M%S') + '.jsonl.gz')
+    logger.info("录制原始feed、推文与LLM结果到 %s", path)
+    return Recorder(path)
+
+def open_executor(config):
+    """
+    [Execution] ENABLED=true 时创建下单执行器（默认模拟盘），交易所客户端与市场信息在启动时预热一次；否则返回None。
+    执行器只在某币种信号变为 BUY/SELL 时下单，提交在后台线程进行，不阻塞分析。
+    """
+    if not config.getboolean('Execution', 'ENABLED', fallback=False):
+        return None
+    from core.execution import OrderExecutor
+    executor = OrderExecutor.from_config(config)
+    executor.warm_up()
+    logger.info("下单执行器已启用：%s，%s模式", executor.default_exchange,
+                config.get('Execution', 'MODE', fallback='paper'))
+    return executor
+
+def parse_symbols(config):
+    return [s.split('/')[0].strip().upper() for s in config.get('Trading', 'SYMBOLS').split(',') if s.strip()]
+
+def parse_symbol_pairs(config):
+    """币种 -> 交易对（如 'BTC' -> 'BTC/USDT'），币种与 parse_symbols 一致。"""
+    pairs = [s.strip() for s in config.get('Trading', 'SYMBOLS').split(',') if s.strip()]
+    return dict(zip(parse_symbols(config), pairs))
+
+def parse_vip_users(config):
     vip_users = config.get('Users', 'VIP_USERS', fallback='').split(',')
-    vip_users = [u.strip() for u in vip_users if u.strip()]
-    rsshub_url = "http://localhost:1200/twitter/home_latest"
-    symbols = [s.split('/')[0].upper() for s in config.get('Trading', 'SYMBOLS').split(',')]
+    return [u.strip() for u in vip_users if u.strip()]
 
-    print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始新一轮分析...")
-    print(f"关注币种: {', '.join(symbols)}")
-    print(f"VIP用户: {', '.join(vip_users)}")
+def analyze_texts(config, llm_analyzer, texts, symbols, prescorer=None, signal_engine=None, signal_state_path=None,
+                  now=None):
+    """分析阶段：LLM/本地打分 -> 信号，打印各项统计与最终建议，返回信号字典。
+    now 为信号引擎的时钟（回放时传入录制时间），None为当前时间。"""
+    if signal_engine is not None:
+        # 按币种的增量信号引擎需要本地预筛器来识别推文涉及的币种
+        signals = generate_symbol_signals(llm_analyzer, texts, symbols, signal_engine,
+                                          prescorer or PreScorer(symbols, local_threshold=float('inf')), now=now)
+        if signal_state_path:
+            signal_engine.save(signal_state_path)
+    else:
+        signals = generate_signal_from_llm(llm_analyzer, texts, symbols,
+                                           chunk_tokens=config.getint('LLM', 'PROMPT_TOKEN_BUDGET', fallback=6000),
+                                           parallelism=config.getint('LLM', 'CHUNK_PARALLELISM', fallback=4),
+                                           prescorer=prescorer)
+    if prescorer is not None:
+        stats = prescorer.stats()
+        logger.info("本地预筛累计少送LLM %d 条（%.0f%%），约节省 %d tokens",
+                    stats['llm_items_avoided'], stats['avoided_ratio'] * 100, stats['llm_tokens_avoided'])
+    if llm_analyzer.cache is not None:
+        stats = llm_analyzer.cache.stats()
+        logger.info("LLM缓存命中率 %.0f%% (%d/%d)，累计节省延迟 %.1fs", stats['hit_ratio'] * 100,
+                    stats['hits'], stats['hits'] + stats['misses'], stats['saved_latency'])
+    logger.info("最终建议: %s", "  ".join(f"【{symbol}】{signal}" for symbol, signal in signals.items()),
+                extra={'signals': signals})
+    return signals
 
-    resource_fetcher = ResourceFetcher(config_file=config_path)
-    llm_analyzer = LLMAnalyzer(config_file=config_path)
+def main_once(tweet_log, dedupe_index=None, signal_engine=None, signal_state_path=None, recorder=None,
+              resource_fetcher=None, ingestion=None, executor=None):
+    """
+    执行一轮抓取与分析。
+    main_loop 传入常驻的 resource_fetcher / ingestion（复用HTTP连接池与熔断状态）；未传入时按配置临时创建。
+    传入 executor 时按本轮信号下单。
+    """
+    config_path = os.path.join(os.path.dirname(__file__), 'config.ini')
+    config = load_config(config_path)  # 文件未修改时直接复用已解析的配置
+    vip_users = parse_vip_users(config)
+    symbols = parse_symbols(config)
+
+    logger.info("开始新一轮分析，关注币种: %s，VIP用户: %s", ', '.join(symbols), ', '.join(vip_users))
+
+    resource_fetcher = resource_fetcher or ResourceFetcher(config_file=config_path, config=config)
+    rsshub_url = f"{resource_fetcher.rsshub_base_url}/twitter/home_latest"
+    owns_ingestion = ingestion is None
+    if owns_ingestion:
+        ingestion = open_ingestion(config, resource_fetcher, vip_users, rsshub_url,
+                                   base_dir=os.path.dirname(os.path.abspath(config_path)))
+    llm_analyzer = LLMAnalyzer(config_file=config_path, config=config)
+    prescorer = open_prescorer(config, symbols)
+    resource_fetcher.recorder = llm_analyzer.recorder = recorder
+    resource_fetcher.seen = tweet_log  # 流式解析遇到已处理的推文即停止
 
     new_tweet_ids = set()
-    texts = aggregate_twitter_content(resource_fetcher, vip_users, rsshub_url=rsshub_url, max_items=20, tweet_log=tweet_log, new_tweet_ids=new_tweet_ids)
-    print(f"\n共聚合 {len(texts)} 条新推文内容，开始LLM分析...")
-    signals = generate_signal_from_llm(llm_analyzer, texts, symbols)
-    print("\n=== 最终建议 ===")
-    for symbol, signal in signals.items():
-        print(f"【{symbol}】: {signal}")
-    # 持久化新推文ID
+    try:
+        with metrics.span('fetch', logger):
+            items = ingestion.collect()
+    finally:
+        if owns_ingestion:
+            ingestion.close()
+    texts = aggregate_items(items, tweet_log=tweet_log, new_tweet_ids=new_tweet_ids, dedupe_index=dedupe_index)
+    if recorder is not None:
+        recorder.cycle(vip_users if 'twitter_vip' in ingestion.sources else (), resource_fetcher.rsshub_base_url,
+                       rsshub_url if 'twitter_home' in ingestion.sources else None, max_items=20)
+    if resource_fetcher.feed_cache:
+        stats = resource_fetcher.feed_cache.stats()
+        logger.info("Feed缓存命中 %d / 未命中 %d，节省下载 %.1fKB，节省解析 %.0fms", stats['hits'], stats['misses'],
+                    stats['bytes_saved'] / 1024, stats['parse_seconds_saved'] * 1000)
+    resource_fetcher.rsshub_pool.log_stats()
+    signals = analyze_texts(config, llm_analyzer, texts, symbols, prescorer, signal_engine, signal_state_path)
+    if executor is not None:
+        executor.execute_signals(signals)
+    # 持久化新推文ID（增量写入），并淘汰过期记录
     if new_tweet_ids:
         tweet_log.update(new_tweet_ids)
-        save_tweet_log(tweet_log_path, tweet_log)
+    # 本轮抓到的条目此时都已在已处理记录中（包括之前处理过而被过滤的），一并提交
+    ingestion.commit({item.id for item in items})
+    tweet_log.prune()
 
 def main_loop():
     interval = 60  # 1分钟
-    tweet_log_path = os.path.join(os.path.dirname(__file__), 'tweet_log.json')
-    tweet_log = load_tweet_log(tweet_log_path)
-    print(f"定时任务启动，每{interval//60}分钟自动执行一次推特聚合与LLM分析。按Ctrl+C退出。")
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    config = load_config(os.path.join(base_dir, 'config.ini'))
+    setup_logging_from_config(config, base_dir)
+    exporter = start_metrics_exporter(config, base_dir)
+    tweet_log = open_seen_store(config, base_dir)
+    dedupe_index = open_dedupe_index(config)
+    symbols = parse_symbols(config)
+    signal_engine, signal_state_path = open_signal_engine(config, symbols, base_dir)
+    recorder = open_recorder(config, base_dir)
+    # 抓取客户端与数据源只创建一次：HTTP连接池、Feed缓存与熔断状态跨轮复用
+    resource_fetcher = ResourceFetcher(config=config)
+    ingestion = open_ingestion(config, resource_fetcher, parse_vip_users(config),
+                               f"{resource_fetcher.rsshub_base_url}/twitter/home_latest", base_dir=base_dir)
+    executor = open_executor(config)
+    resource_fetcher.start_health_checks()  # 多个RSSHub实例时定期探活
+    logger.info("定时任务启动，每%d分钟自动执行一次推特聚合与LLM分析。按Ctrl+C退出。", interval // 60)
     try:
         while True:
-            print("\n" + "="*50)
-            main_once(tweet_log_path, tweet_log)
-            print(f"\n等待{interval//60}分钟后开始下一轮...")
+            with metrics.span('cycle', logger):
+                main_once(tweet_log, dedupe_index, signal_engine, signal_state_path, recorder,
+                          resource_fetcher, ingestion, executor)
+            logger.info("等待%d分钟后开始下一轮...", interval // 60)
             time.sleep(interval)
     except KeyboardInterrupt:
-        print("\n已手动终止定时任务。")
+        logger.info("已手动终止定时任务。")
+    finally:
+        ingestion.close()
+        resource_fetcher.close()
+        if executor is not None:
+            executor.close()
+        tweet_log.close()
+        if recorder is not None:
+            recorder.close()
+        if exporter is not None:
+            exporter.stop()
 
 if __name__ == '__main__':
-    main_loop() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="推特聚合 + LLM 情绪分析")
+    parser.add_argument("--daemon", action="store_true", help="以常驻流水线模式运行（见 pipeline_daemon.py）")
+    args = parser.parse_args()
+    if args.daemon:
+        from pipeline_daemon import run_daemon
+        run_daemon()
+    else:
+        main_loop() 
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+常驻流水线守护进程，取代 main_loop 每轮重建客户端、串行“抓取 -> 分析 -> 睡眠”的模式。
+
+- ResourceFetcher / LLMAnalyzer / 预筛器 / 信号引擎 / 已处理推文库只在启动时创建一次；
+- 每个数据源（VIP用户、Home时间线、可选的新闻与Reddit，见 [Ingestion]）有各自的抓取线程和轮询间隔，按固定节拍调度，不随处理耗时漂移；
+- 抓取结果放入微批器（core.batcher.MicroBatcher），由独立的分析线程消费，下一轮抓取与本轮LLM分析重叠进行；
+  VIP用户的推文走快速通道，到达后立即触发分析，普通内容攒够一批或等待超过 MAX_WAIT 秒再分析；
+  待分析条目满时抓取线程阻塞，形成背压；
+- 收到 SIGTERM / SIGINT 后停止抓取，处理完队列中剩余的批次，保存信号状态并关闭存储。
+
+运行：python main_twitter_llm.py --daemon  或  python pipeline_daemon.py
+"""
+import os
+import signal
+import threading
+import time
+from core.batcher import HIGH, NORMAL, MicroBatcher
+from core.config import load_config
+from core.resource_fetcher import ResourceFetcher
+from core.llm_analyzer import LLMAnalyzer
+from main_twitter_llm import (aggregate_items, analyze_texts, open_dedupe_index, open_executor, open_ingestion,
+                              open_prescorer, open_recorder, open_seen_store, open_signal_engine, parse_symbols,
+                              parse_vip_users)
+from utils.logger import get_logger, metrics, setup_logging_from_config, start_metrics_exporter
+
+logger = get_logger('daemon')
+
+# 作者字段是推特用户名的数据源（其他来源的作者是媒体名或版块名）
+TWITTER_SOURCES = ('twitter', 'twitter_home')
+
+
+class SeenView:
+    """已处理推文库 + 已入队但尚未分析完的ID，避免同一推文在分析完成前被再次入队。"""
+    def __init__(self, seen_store):
+        self.seen_store = seen_store
+        self.pending = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, item_id):
+        with self._lock:
+            if item_id in self.pending:
+                return True
+        return item_id in self.seen_store
+
+    def claim(self, item_ids):
+        with self._lock:
+            self.pending.update(item_ids)
+
+    def release(self, item_ids):
+        """放弃处理：移出待处理集合，下次抓取时重新入队。"""
+        with self._lock:
+            self.pending.difference_update(item_ids)
+
+    def commit(self, item_ids):
+        """分析完成：写入持久化库并移出待处理集合。"""
+        self.seen_store.update(item_ids)
+        self.release(item_ids)
+
+
+def run_every(interval, job, stop_event):
+    """
+    按固定节拍执行 job，直到 stop_event 被设置。
+    下次执行时间 = 上次计划时间 + interval，不受 job 耗时影响；若 job 超时则跳过错过的节拍。
+    """
+    next_run = time.monotonic()
+    while not stop_event.is_set():
+        try:
+            job()
+        except Exception as e:
+            logger.exception("定时任务异常: %s", e)
+        next_run += interval
+        now = time.monotonic()
+        if now > next_run:
+            missed = int((now - next_run) // interval) + 1
+            logger.warning("任务耗时超过间隔，跳过 %d 个节拍", missed)
+            metrics.inc('schedule_missed_ticks_total', missed)
+            next_run += missed * interval
+        stop_event.wait(next_run - now)
+
+
+class PipelineDaemon:
+    def __init__(self, config_file, llm_analyzer=None):
+        self.config_file = config_file
+        self.base_dir = os.path.dirname(os.path.abspath(config_file))
+        self.config = load_config(config_file)
+        config = self.config
+
+        self.symbols = parse_symbols(config)
+        self.vip_users = parse_vip_users(config)
+        self.resource_fetcher = ResourceFetcher(config=config)
+        self.llm_analyzer = llm_analyzer or LLMAnalyzer(config=config)
+        self.prescorer = open_prescorer(config, self.symbols)
+        self.dedupe_index = open_dedupe_index(config)
+        self.signal_engine, self.signal_state_path = open_signal_engine(config, self.symbols, self.base_dir)
+        self.seen_store = open_seen_store(config, self.base_dir)
+        self.seen = SeenView(self.seen_store)
+        self.recorder = open_recorder(config, self.base_dir)
+        self.exporter = None
+        self.resource_fetcher.recorder = self.llm_analyzer.recorder = self.recorder
+        # 只用已提交的推文库提前停止解析：已入队未分析完的推文失败后需要重新抓到
+        self.resource_fetcher.seen = self.seen_store
+
+        self.max_items = config.getint('Daemon', 'MAX_ITEMS', fallback=20)
+        self.home_url = f"{self.resource_fetcher.rsshub_base_url}/twitter/home_latest"
+        self.ingestion = open_ingestion(config, self.resource_fetcher, self.vip_users, self.home_url,
+                                        max_items=self.max_items, base_dir=self.base_dir)
+        self.executor = open_executor(config)
+        intervals = {
+            'twitter_vip': config.getfloat('Daemon', 'VIP_INTERVAL', fallback=60),
+            'twitter_home': config.getfloat('Daemon', 'HOME_INTERVAL', fallback=30),
+            'news': config.getfloat('Daemon', 'NEWS_INTERVAL', fallback=300),
+            'reddit': config.getfloat('Daemon', 'REDDIT_INTERVAL', fallback=120),
+            'reddit_stream': config.getfloat('Daemon', 'REDDIT_STREAM_INTERVAL', fallback=5),
+        }
+        self.sources = {name: intervals[name] for name in self.ingestion.sources}
+        self.vip_handles = {u.lstrip('@').lower() for u in self.vip_users}
+        self.batcher = MicroBatcher(flush_items=config.getint('Daemon', 'FLUSH_ITEMS', fallback=50),
+                                    max_items=config.getint('Daemon', 'MAX_BATCH_ITEMS', fallback=200),
+                                    max_wait=config.getfloat('Daemon', 'MAX_WAIT', fallback=5),
+                                    high_priority_wait=config.getfloat('Daemon', 'VIP_MAX_WAIT', fallback=0),
+                                    capacity=config.getint('Daemon', 'QUEUE_SIZE', fallback=8))
+        self.stop_event = threading.Event()
+        self._clustered = {}  # 已入队未分析完的ID -> 入队时新建的近重复簇的代表原文
+        self._clustered_lock = threading.Lock()
+        self._threads = []
+        self.cycles = 0
+        self.last_signals = {}
+
+    def _fetch(self, source):
+        items = self.ingestion.collect([source])
+        if self.recorder is not None:
+            if source == 'twitter_vip':
+                self.recorder.cycle(self.vip_users, self.resource_fetcher.rsshub_base_url)
+            elif source == 'twitter_home':
+                self.recorder.cycle(rsshub_url=self.home_url, max_items=self.max_items)
+        # VIP用户的内容（包括出现在Home时间线中的）走快速通道；按作者名匹配只用于推特来源
+        lanes = {HIGH: [], NORMAL: []}
+        for item in items:
+            vip = item.vip or (item.source in TWITTER_SOURCES and item.author.lower() in self.vip_handles)
+            lanes[HIGH if vip else NORMAL].append(item)
+        for priority, lane_items in lanes.items():
+            if lane_items:
+                self._enqueue(source, lane_items, priority)
+
+    def _enqueue(self, source, items, priority):
+        new_ids, clustered = set(), []
+        texts = aggregate_items(items, tweet_log=self.seen, new_tweet_ids=new_ids, dedupe_index=self.dedupe_index,
+                                dedupe_texts=clustered)
+        # 已写入已处理库而被过滤的条目直接提交；仍在分析中的由其所在批次提交或释放
+        stored = [item.id for item in items if item.id not in new_ids and item.id in self.seen_store]
+        if stored:
+            self.ingestion.commit(stored)
+        if not new_ids:
+            return
+        self.seen.claim(new_ids)
+        with self._clustered_lock:
+            for item_id in new_ids:
+                self._clustered[item_id] = clustered
+        # 待分析条目满时阻塞（背压），但仍能及时响应停止信号
+        while not self.stop_event.is_set():
+            if self.batcher.put(texts, new_ids, priority=priority, source=source, timeout=0.5):
+                return
+        # 停止前未能入队：释放ID，下次启动重新抓取
+        self._release(new_ids)
+
+    def _take_clustered(self, ids):
+        """取出这些ID入队时新建的近重复簇的代表原文。"""
+        texts = {}
+        with self._clustered_lock:
+            for item_id in ids:
+                for text in self._clustered.pop(item_id, ()):
+                    texts[text] = None
+        return list(texts)
+
+    def _release(self, ids):
+        """放弃处理：释放ID并回滚它们新建的近重复簇，重新抓到时不会被当作重复丢弃；推送型数据源会重新交付这些条目。"""
+        clustered = self._take_clustered(ids)
+        if self.dedupe_index is not None and clustered:
+            self.dedupe_index.forget(clustered)
+        self.seen.release(ids)
+        self.ingestion.release(ids)
+
+    def _reload(self, config):
+        """
+        配置文件变更后重建分析阶段的组件：本地预筛器、信号引擎（先保存状态再按新参数载入）与VIP集合。
+        关注币种、数据源、轮询间隔、微批参数与抓取的VIP用户列表在启动时确定，修改后需重启。
+        """
+        self.config = config
+        self.prescorer = open_prescorer(config, self.symbols)
+        if self.signal_engine is not None and self.signal_state_path:
+            self.signal_engine.save(self.signal_state_path)
+        self.signal_engine, self.signal_state_path = open_signal_engine(config, self.symbols, self.base_dir)
+        self.vip_handles = {u.lstrip('@').lower() for u in parse_vip_users(config)}
+        logger.info("配置已热加载：预筛器、信号引擎与VIP集合已按新配置重建")
+
+    def _analysis_loop(self):
+        while True:
+            batch = self.batcher.get_batch(timeout=0.5)
+            if batch is None:
+                if self.batcher.closed:
+                    return
+                continue
+            texts, ids = batch.texts, batch.ids
+            logger.info("分析批次：%d 条（来源: %s，触发: %s，最长等待 %.1fs，剩余 %d 条）", len(texts),
+                        ', '.join(batch.sources), batch.reason, batch.waited, self.batcher.pending_items,
+                        extra={'items': len(texts), 'sources': batch.sources, 'reason': batch.reason,
+                               'waited': batch.waited})
+            try:
+                # 分析参数（阈值、分块等）按文件修改时间热加载
+                config = load_config(self.config_file)
+                if config is not self.config:
+                    self._reload(config)
+                with metrics.span('analysis', logger):
+                    self.last_signals = analyze_texts(config, self.llm_analyzer, texts, self.symbols,
+                                                      self.prescorer, self.signal_engine, self.signal_state_path)
+                if self.executor is not None:
+                    self.executor.execute_signals(self.last_signals)  # 后台提交，不等待成交
+            except Exception as e:
+                # 分析失败的推文不标记为已处理，下次抓取时重试
+                logger.exception("分析失败: %s", e)
+                metrics.inc('analysis_errors_total')
+                self._release(ids)
+                continue
+            self._take_clustered(ids)
+            self.seen.commit(ids)
+            self.ingestion.commit(ids)
+            self.seen_store.prune()
+            self.cycles += 1
+
+    def start(self):
+        logger.info("流水线守护进程启动：关注币种 %s，%s", ', '.join(self.symbols),
+                    "，".join(f"{name}每{interval:g}秒" for name, interval in self.sources.items()))
+        self.resource_fetcher.start_health_checks()
+        analysis = threading.Thread(target=self._analysis_loop, name='analysis', daemon=True)
+        analysis.start()
+        self._threads.append(analysis)
+        for name, interval in self.sources.items():
+            thread = threading.Thread(target=run_every, args=(interval, lambda n=name: self._fetch(n), self.stop_event),
+                                      name=f'source-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+    def shutdown(self, timeout=None):
+        """停止抓取，等待分析线程处理完剩余批次，然后保存状态并关闭存储。"""
+        self.stop_event.set()
+        for thread in self._threads[1:]:
+            thread.join(timeout)
+        self.batcher.close()  # 抓取已停止：剩余条目立即送去分析
+        if self._threads:
+            self._threads[0].join(timeout)
+        if self.signal_engine is not None and self.signal_state_path:
+            self.signal_engine.save(self.signal_state_path)
+        self.ingestion.close()
+        self.resource_fetcher.close()
+        self.resource_fetcher.rsshub_pool.log_stats()
+        if self.executor is not None:
+            self.executor.close()  # 等待已提交的订单返回
+        self.seen_store.prune()
+        self.seen_store.close()
+        if self.llm_analyzer.cache is not None:
+            self.llm_analyzer.cache.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.exporter is not None:
+            self.exporter.stop()
+        logger.info("流水线已停止，状态已保存。")
+
+    def run(self):
+        """前台运行直到收到 SIGTERM / SIGINT。"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.exporter = start_metrics_exporter(self.config, self.base_dir)
+        self.start()
+        while not self.stop_event.wait(1):
+            pass
+        logger.info("收到停止信号，正在处理剩余批次...")
+        self.shutdown()
+
+
+def run_daemon(config_file=None):
+    config_file = config_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
+    config = load_config(config_file)
+    setup_logging_from_config(config, os.path.dirname(os.path.abspath(config_file)))
+    PipelineDaemon(config_file).run()
+
+
+if __name__ == '__main__':
+    run_daemon()
@@ -0,0 +1,254 @@
+"""
+离线回放回测：把 core.recorder.Recorder 录制的推文与LLM结果重新送入
+aggregate_twitter_content -> analyze_texts（与线上相同的预筛、近重复合并与信号引擎配置），
+输出信号随时间的变化以及各阶段吞吐量，无需访问RSSHub与DeepSeek。
+
+录制：config.ini 中设置 [Backtest] RECORD = true 后正常运行主程序或守护进程。
+回放：python replay_backtest.py recordings/20250623-080000.jsonl.gz --speed 0 --output report.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from urllib.parse import urlparse
+import numpy as np
+from core.config import Config, load_config
+from core.llm_cache import normalize_text
+from core.market_data import MarketDataStore
+from core.prescorer import PreScorer
+from core.recorder import feed_body, read_records
+from core.resource_fetcher import ResourceFetcher
+from rsshub_twitter_fetcher import RssHubTwitterFetcher
+from utils.logger import silenced
+from main_twitter_llm import (aggregate_twitter_content, analyze_texts, build_signal_engine, open_dedupe_index,
+                              open_prescorer, parse_symbol_pairs, parse_symbols)
+
+
+class ReplayFetcher:
+    """
+    按录制顺序提供推文，接口与 ResourceFetcher 中 aggregate_twitter_content 用到的部分一致。
+    每个路由返回最近一次录制的条目（按url路径匹配，与录制时由实例池中哪个RSSHub实例提供无关）；reparse=True 时从原始RSS重新解析（用于衡量解析耗时）。
+    """
+    feed_cache = None
+
+    def __init__(self, reparse=False):
+        self.reparse = reparse
+        self.rsshub_base_url = ''
+        self._items = {}
+        self._raw = {}
+        self.parse_seconds = 0.0
+        self.parsed_items = 0
+
+    @staticmethod
+    def _route(url):
+        return urlparse(url).path.strip('/')
+
+    def observe(self, record):
+        if record['kind'] == 'items':
+            self._items[self._route(record['url'])] = record['items']
+        elif record['kind'] == 'feed':
+            self._raw[self._route(record['url'])] = record
+
+    def _take(self, url):
+        raw = self._raw.pop(self._route(url), None)
+        items = self._items.pop(self._route(url), [])
+        if self.reparse and raw is not None:
+            start = time.perf_counter()
+            parsed = RssHubTwitterFetcher(raw['url'])._parse_fast(feed_body(raw))
+            parsed = parsed[0] if parsed is not None else \
+                RssHubTwitterFetcher._parse(feed_body(raw), raw.get('headers') or {})
+            self.parse_seconds += time.perf_counter() - start
+            if parsed is not None:
+                self.parsed_items += len(parsed)
+                items = parsed
+        return items
+
+    def fetch_users_concurrently(self, usernames):
+        return {u: ResourceFetcher._normalize_user_tweets(u, self._take(f"{self.rsshub_base_url}/twitter/user/{u}"))
+                for u in usernames if u.strip()}
+
+    def fetch_nitter_rss(self, usernames):
+        return [t for tweets in self.fetch_users_concurrently(usernames).values() for t in tweets]
+
+    def fetch_rsshub_twitter(self, rsshub_url, max_items=None):
+        items = self._take(rsshub_url)
+        return items if max_items is None else items[:max_items]
+
+
+class ReplayAnalyzer:
+    """
+    用录制的LLM结果代替真实调用，接口与 LLMAnalyzer 一致（analyze_text / analyze_batch）。
+    未录制到的文本按 stub 处理：'lexical' 用本地词典打分，'neutral' 返回0分，'none' 视为调用失败。
+    """
+    cache = None
+
+    def __init__(self, responses, stub='lexical', symbols=()):
+        self.responses = responses  # (mode, normalized text) -> response
+        self.stub = stub
+        self.hits = 0
+        self.stubbed = 0
+        self._prescorer = PreScorer(symbols) if stub == 'lexical' else None
+
+    def _answer(self, mode, text):
+        response = self.responses.get((mode, normalize_text(text)))
+        if response is not None:
+            self.hits += 1
+            return response
+        self.stubbed += 1
+        if self.stub == 'lexical':
+            scores, hits = self._prescorer.lexical_scores([text])
+            return {'sentiment_score': float(scores[0]), 'confidence': min(1.0, int(hits[0]) / 5)}
+        if self.stub == 'neutral':
+            return {'sentiment_score': 0.0, 'confidence': 0.0}
+        return None
+
+    def analyze_text(self, text):
+        return self._answer('text', text)
+
+    def analyze_batch(self, items):
+        return {item['id']: self._answer('batch', item['text']) for item in items}
+
+
+def load_llm_responses(path):
+    return {(r['mode'], normalize_text(r['text'])): r['response']
+            for r in read_records(path) if r['kind'] == 'llm'}
+
+
+def replay(path, symbols, config=None, speed=0.0, stub='lexical', engine=None, prescorer=None, reparse=False,
+           dedupe_index=None, quiet=True):
+    """
+    回放一个录制文件，分析阶段与线上一样走 analyze_texts。
+
+    :param config: 录制时的配置（[LLM] PROMPT_TOKEN_BUDGET 等），保证prompt与录制时一致以命中录制结果；None为默认值
+    :param speed: 相对录制时的加速倍数，0表示不等待、尽快回放
+    :param engine: SignalEngine，提供时使用按币种信号引擎（以录制时间为时钟），否则使用整体情绪信号
+    :param prescorer: 与线上相同的本地预筛器（open_prescorer），None表示不预筛
+    :param dedupe_index: 与线上相同的近重复索引（open_dedupe_index），以录制时间为时钟
+    :return: {'signals': [{'t', 'signals'}...], 'stages': {阶段: {'items', 'seconds', 'items_per_second'}}, ...}
+    """
+    fetcher = ReplayFetcher(reparse=reparse)
+    config = config if config is not None else Config()
+    analyzer = ReplayAnalyzer(load_llm_responses(path), stub=stub, symbols=symbols)
+    seen = set()
+    timeline = []
+    stages = {'aggregate': [0, 0.0], 'analysis': [0, 0.0]}
+    first_t = None
+    wall_start = time.perf_counter()
+    with silenced() if quiet else contextlib.nullcontext():
+        for record in read_records(path):
+            fetcher.observe(record)
+            if record['kind'] != 'cycle':
+                continue
+            if first_t is None:
+                first_t = record['t']
+            if speed > 0:
+                delay = (record['t'] - first_t) / speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            fetcher.rsshub_base_url = record.get('rsshub_base_url') or fetcher.rsshub_base_url
+
+            start = time.perf_counter()
+            new_ids = set()
+            texts = aggregate_twitter_content(fetcher, record.get('vip_users') or [], rsshub_url=record.get('rsshub_url'),
+                                              max_items=record.get('max_items') or 20, tweet_log=seen,
+                                              new_tweet_ids=new_ids, dedupe_index=dedupe_index, now=record['t'])
+            seen.update(new_ids)
+            stages['aggregate'][0] += len(new_ids)
+            stages['aggregate'][1] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            signals = analyze_texts(config, analyzer, texts, symbols, prescorer, engine, now=record['t'])
+            scores = None
+            if engine is not None:
+                scores = {symbol: engine.score(symbol, now=record['t'])[0] for symbol in symbols}
+            stages['analysis'][0] += len(texts)
+            stages['analysis'][1] += time.perf_counter() - start
+            point = {'t': record['t'], 'items': len(texts), 'signals': signals}
+            if scores is not None:
+                point['scores'] = scores
+            timeline.append(point)
+    if reparse:
+        stages['parse'] = [fetcher.parsed_items, fetcher.parse_seconds]
+    return {
+        'cycles': len(timeline),
+        'signals': timeline,
+        'stages': {name: {'items': n, 'seconds': s, 'items_per_second': n / s if s > 0 else 0.0}
+                   for name, (n, s) in stages.items()},
+        'llm_recorded_hits': analyzer.hits,
+        'llm_stubbed': analyzer.stubbed,
+        'wall_seconds': time.perf_counter() - wall_start,
+    }
+
+
+def sentiment_return_correlation(report, store, symbol_pairs, horizon=1):
+    """
+    按币种计算回放得到的情绪分（需 --engine）与之后 horizon 根K线收益率的相关系数。
+    symbol_pairs 为 币种 -> 交易对（见 parse_symbol_pairs）：情绪分按币种读取，行情按交易对查询。
+    行情来自本地缓存（core.market_data.MarketDataStore），已缓存的历史不会重新下载。
+    """
+    points = [p for p in report['signals'] if 'scores' in p]
+    times = np.array([p['t'] for p in points], dtype=np.float64)
+    result = {}
+    for symbol, pair in symbol_pairs.items():
+        values = np.array([p['scores'].get(symbol, np.nan) for p in points], dtype=np.float64)
+        corr, pairs = store.correlation(pair, times, values, horizon)
+        result[symbol] = {'correlation': None if np.isnan(corr) else corr, 'pairs': pairs}
+    return result
+
+
+def market_correlation(report, store, symbol_pairs, horizon=1):
+    """增量更新各交易对的行情缓存（需覆盖整段录制，录制早于 HISTORY_DAYS 时向前回补），再计算相关性。"""
+    store.update(list(symbol_pairs.values()), since=min((p['t'] for p in report['signals']), default=None))
+    return sentiment_return_correlation(report, store, symbol_pairs, horizon)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录制的推文与LLM结果，离线评估信号与吞吐量")
+    parser.add_argument("recording", help="Recorder 录制的 .jsonl.gz 文件")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+    parser.add_argument("--speed", type=float, default=0.0, help="相对录制时的加速倍数，0为尽快回放")
+    parser.add_argument("--stub", choices=['lexical', 'neutral', 'none'], default='lexical',
+                        help="未录制到LLM结果时的替代打分")
+    parser.add_argument("--engine", action=argparse.BooleanOptionalAction, default=None,
+                        help="使用按币种信号引擎（默认按 [Signals] ENGINE）")
+    parser.add_argument("--reparse", action="store_true", help="从原始RSS重新解析（计入parse阶段吞吐）")
+    parser.add_argument("--market", action="store_true",
+                        help="增量更新本地行情缓存并计算情绪分与之后收益率的相关性（需 --engine）")
+    parser.add_argument("--horizon", type=int, default=1, help="收益率窗口（K线根数）")
+    parser.add_argument("--output", help="把报告写入JSON文件")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    symbols = parse_symbols(config)
+    use_engine = config.getboolean('Signals', 'ENGINE', fallback=True) if args.engine is None else args.engine
+    # 与线上相同的预筛器、近重复索引与信号引擎参数，但不加载线上的持久化状态
+    engine = build_signal_engine(config, symbols) if use_engine else None
+    report = replay(args.recording, symbols, config=config, speed=args.speed, stub=args.stub, engine=engine,
+                    prescorer=open_prescorer(config, symbols), reparse=args.reparse,
+                    dedupe_index=open_dedupe_index(config))
+
+    print(f"回放 {report['cycles']} 轮，耗时 {report['wall_seconds']:.2f}s；"
+          f"LLM结果命中录制 {report['llm_recorded_hits']} 条，替代打分 {report['llm_stubbed']} 条")
+    print("\n=== 信号时间线 ===")
+    for point in report['signals']:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(point['t']))
+        print(f"[{stamp}] {point['items']:>4} 条  " + "  ".join(f"{s}:{v}" for s, v in point['signals'].items()))
+    print("\n=== 各阶段吞吐 ===")
+    for name, stage in report['stages'].items():
+        print(f"{name:<10} {stage['items']:>7} 条  {stage['seconds']*1000:>9.1f} ms  {stage['items_per_second']:>10.0f} 条/s")
+    if args.market and engine is not None:
+        store = MarketDataStore.from_config(config)
+        report['correlation'] = market_correlation(report, store, parse_symbol_pairs(config), args.horizon)
+        print(f"\n=== 情绪分与之后 {args.horizon} 根K线收益率的相关性（{store.timeframe}）===")
+        for symbol, item in report['correlation'].items():
+            corr = '—' if item['correlation'] is None else f"{item['correlation']:+.3f}"
+            print(f"{symbol:<12} {corr:>7}  样本 {item['pairs']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n报告已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
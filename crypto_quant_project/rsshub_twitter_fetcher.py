@@ -1,28 +1,141 @@
 import random
 import sys
-import feedparser
+import time
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from utils.logger import get_logger, metrics
+
+logger = get_logger('rsshub')
+
+DEFAULT_TIMEOUT = 10  # 单次请求超时（秒）
+PARSE_CHUNK_BYTES = 64 * 1024  # 流式解析每次送入的字节数
+SEEN_STOP_RUN = 2  # 连续遇到几条已处理的推文后停止解析（容忍置顶推文）
+
+FEED_ROOTS = ('rss', 'feed', 'RDF')
+
+
+def _local(tag):
+    return tag.rpartition('}')[2]
+
+
+def _sanitize_html(html):
+    """
+    与feedparser路径相同的HTML清洗（去掉script等危险标签与属性，规范化标签写法）。
+    用的是feedparser的内部函数，版本变动导致无法导入时抛出 ParseError，整个feed交给feedparser解析。
+    """
+    try:
+        from feedparser.sanitizer import _sanitize_html as sanitize  # 延迟导入，只在摘要需要清洗时加载
+    except ImportError as e:
+        raise ParseError(f"feedparser sanitizer unavailable: {e}")
+    return sanitize(html, 'utf-8', 'text/html')
+
+
+def _entry(element):
+    """把一个 RSS <item> 或 Atom <entry> 元素规范化为 title/summary/url/published。"""
+    fields, types = {}, {}
+    link = guid = published = ''
+    for child in element:
+        name = _local(child.tag)
+        if name == 'link':
+            # Atom 的链接在 href 属性中，RSS 的在文本中
+            href = child.get('href')
+            if href is None:
+                link = link or (child.text or '').strip()
+            elif not link or child.get('rel', 'alternate') == 'alternate':
+                link = href.strip()
+        elif name == 'guid':
+            if child.get('isPermaLink', 'true') != 'false':
+                guid = (child.text or '').strip()
+        elif name in ('pubDate', 'published', 'issued'):
+            # 与feedparser一致：updated / dc:date 只算更新时间，不作为发布时间；多个时取最后一个
+            published = child.text or ''
+        elif name in ('title', 'description', 'summary', 'content'):
+            if name not in fields:
+                fields[name] = ''.join(child.itertext())
+                # RSS的description按HTML处理；Atom按type属性，默认为纯文本
+                types[name] = 'html' if name == 'description' else child.get('type', 'text').lower()
+    summary_field = next((name for name in ('description', 'summary', 'content') if name in fields), None)
+    summary = fields[summary_field].strip() if summary_field else ''
+    summary_type = types.get(summary_field, 'text')
+    if 'xhtml' in summary_type:
+        raise ParseError("xhtml summary")  # 内联XHTML交给feedparser
+    if summary_type in ('html', 'text/html'):
+        summary = _sanitize_html(summary)
+    return {
+        "title": fields.get('title', '').strip(),
+        "summary": summary,
+        "url": link or guid,
+        "published": published.strip(),
+    }
+
+
+def iter_feed_items(content, chunk_size=PARSE_CHUNK_BYTES):
+    """
+    流式解析RSS 2.0 / RSS 1.0 / Atom，逐条产出与 feedparser 路径相同字段的推文。
+    内容按块送入解析器，调用方停止迭代后剩余部分不再解析。
+    HTML摘要与feedparser一样经过清洗。
+    XML格式错误、根元素不是feed或摘要为内联XHTML时抛出 ParseError。
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    root = None
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = _local(element.tag)
+                    if root not in FEED_ROOTS:
+                        raise ParseError(f"not a feed: <{root}>")
+                continue
+            if _local(element.tag) in ('item', 'entry'):
+                yield _entry(element)
+                element.clear()
+    parser.close()
 
 class RssHubTwitterFetcher:
     """
     用于解析RSSHub的Twitter Home/用户/搜索等RSS内容。
     """
-    def __init__(self, rss_url):
-        self.rss_url = rss_url
-
-    def fetch(self, max_items=None):
+    def __init__(self, rss_url, timeout=DEFAULT_TIMEOUT, session=None, cache=None, recorder=None,
+                 fast_parse=True, seen=None):
         """
-        解析RSS内容，返回推文列表。
-        :param max_items: 限制返回条数，None为全部
-        :return: List[dict]
+        :param rss_url: RSSHub地址
+        :param timeout: 单次HTTP请求超时（秒）
+        :param session: 可复用的requests.Session，None则使用模块级requests
+        :param cache: core.feed_cache.FeedCache，启用ETag/Last-Modified条件请求
+        :param recorder: core.recorder.Recorder，记录原始RSS与解析结果以便离线回放
+        :param fast_parse: 使用流式解析（可提前停止），格式错误时回退到feedparser
+        :param seen: 已处理推文链接的集合（支持 in），流式解析遇到连续已处理的推文时停止
         """
-        print(f"[INFO] 解析RSSHub: {self.rss_url}")
-        feed = feedparser.parse(self.rss_url)
+        self.rss_url = rss_url
+        self.timeout = timeout
+        self.session = session
+        self.cache = cache
+        self.recorder = recorder
+        self.fast_parse = fast_parse
+        self.seen = seen
+
+    def _download(self):
+        """下载RSS原始内容，返回 response；内容未变化时 status_code 为 304。"""
+        if self.session is not None:
+            http = self.session
+        else:
+            import requests
+            http = requests
+        headers = self.cache.conditional_headers(self.rss_url) if self.cache else {}
+        response = http.get(self.rss_url, timeout=self.timeout, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _parse(content, headers):
+        import feedparser  # 延迟导入，未启用RSS数据源时不加载
+        feed = feedparser.parse(content, response_headers={k.lower(): v for k, v in headers.items()})
         if feed.bozo:
-            print(f"[ERROR] RSS解析失败: {feed.bozo_exception}")
-            return []
+            logger.error("RSS解析失败: %s", feed.bozo_exception)
+            return None
         tweets = []
-        entries = feed.entries if max_items is None else feed.entries[:max_items]
-        for entry in entries:
+        for entry in feed.entries:
             tweets.append({
                 "title": entry.title,
                 "summary": getattr(entry, "summary", ""),
@@ -31,6 +144,77 @@ class RssHubTwitterFetcher:
             })
         return tweets
 
+    def _parse_fast(self, content, max_items=None):
+        """
+        流式解析，取到 max_items 条或遇到 SEEN_STOP_RUN 条连续已处理的推文（feed按时间倒序）时停止，
+        已处理的推文本身不返回。返回 (推文列表, 是否解析了完整feed)；
+        XML格式错误时返回None，由调用方回退到feedparser。
+        """
+        tweets, seen_run = [], 0
+        try:
+            for tweet in iter_feed_items(content):
+                if self.seen is not None and tweet['url'] and tweet['url'] in self.seen:
+                    seen_run += 1
+                    if seen_run >= SEEN_STOP_RUN:
+                        metrics.inc('feed_early_stops_total', reason='seen')
+                        return tweets, False
+                    continue
+                seen_run = 0
+                tweets.append(tweet)
+                if max_items is not None and len(tweets) >= max_items:
+                    metrics.inc('feed_early_stops_total', reason='max_items')
+                    return tweets, False
+        except ParseError as e:
+            logger.debug("流式解析失败，回退到feedparser: %s", e, extra={'url': self.rss_url})
+            metrics.inc('feed_parse_fallbacks_total')
+            return None
+        return tweets, True
+
+    def fetch(self, max_items=None, raise_errors=False):
+        """
+        解析RSS内容，返回推文列表。
+        :param max_items: 限制返回条数，None为全部
+        :param raise_errors: 请求或解析失败时抛出异常（默认记录日志并返回空列表）
+        :return: List[dict]
+        """
+        import requests
+        logger.debug("解析RSSHub: %s", self.rss_url)
+        try:
+            response = self._download()
+        except requests.exceptions.RequestException as e:
+            logger.error("RSS请求失败: %s", e, extra={'url': self.rss_url})
+            metrics.inc('fetch_errors_total', kind='request')
+            if raise_errors:
+                raise
+            return []
+        if response.status_code == 304 and self.cache:
+            # 内容未变化，直接使用缓存，跳过解析
+            tweets = self.cache.record_hit(self.rss_url)
+        else:
+            if self.recorder is not None:
+                self.recorder.feed(self.rss_url, response.status_code, response.headers, response.content)
+            start = time.perf_counter()
+            parsed = self._parse_fast(response.content, max_items) if self.fast_parse else None
+            tweets, complete = parsed if parsed is not None else (self._parse(response.content, response.headers), True)
+            if tweets is None:
+                metrics.inc('fetch_errors_total', kind='parse')
+                if raise_errors:
+                    raise ValueError(f"RSS解析失败: {self.rss_url}")
+                return []
+            if self.cache:
+                # 提前停止时只解析了一部分：仍更新ETag/Last-Modified，但标记为部分结果，304时不返回旧推文
+                self.cache.put(self.rss_url,
+                               etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'),
+                               tweets=tweets,
+                               content_length=len(response.content),
+                               parse_seconds=time.perf_counter() - start,
+                               partial=not complete)
+        if self.recorder is not None:
+            self.recorder.items(self.rss_url, tweets)
+        metrics.inc('items_fetched_total', len(tweets))
+        return tweets if max_items is None else tweets[:max_items]
+
 if __name__ == "__main__":
     # 示例：解析本地RSSHub
     RSSHUB_URL = "http://localhost:1200/twitter/home_latest"
@@ -41,4 +225,4 @@ if __name__ == "__main__":
         for t in tweets:
             print(f"[{t['published']}] {t['title']}\n  {t['url']}\n  {t['summary']}\n")
     else:
-        print("No tweets found or failed to fetch.") 
\ No newline at end of file
+        print("No tweets found or failed to fetch.")
@@ -0,0 +1,63 @@
+import unittest
+import csv
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.analysis import Analysis, NpyColumnWriter, iter_csv_chunks, load_scores, score_corpus
+
+TEXTS = ['BTC breakout, bullish rally', 'ETH crash, panic selloff', 'gm', 'not bullish on sol', '比特币暴涨 新高']
+
+
+class TestBulkScoring(unittest.TestCase):
+
+    def write_csv(self, path, rows):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['created_at', 'user', 'text'])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def test_process_pool_matches_in_process_scores_in_input_order(self):
+        rows = [{'created_at': '2025-06-23T08:00:00Z' if i % 7 else '', 'user': 'u', 'text': TEXTS[i % len(TEXTS)]}
+                for i in range(103)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tweets.csv')
+            self.write_csv(path, rows)
+            meta = score_corpus(iter_csv_chunks(path, chunksize=10), os.path.join(tmp, 'pool'), workers=2)
+            self.assertEqual(meta['rows'], 103)
+            scores = load_scores(os.path.join(tmp, 'pool'))
+            self.assertIsInstance(scores['polarity'], np.memmap)
+
+            expected = Analysis().analyze_sentiment_of_articles([{'text': r['text']} for r in rows])
+            np.testing.assert_allclose(scores['polarity'], expected['polarity'], atol=1e-6)
+            np.testing.assert_array_equal(scores['hits'], expected['hits'])
+            self.assertEqual(np.isnan(scores['time']).sum(), 15)  # rows 0, 7, 14, ... have no date
+            self.assertEqual(scores['time'][1], 1750665600.0)
+
+    def test_column_writer_fixes_up_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'col.npy')
+            writer = NpyColumnWriter(path, np.int32)
+            for start in range(0, 100000, 30000):
+                writer.append(np.arange(start, min(start + 30000, 100000)))
+            writer.close()
+            np.testing.assert_array_equal(np.load(path), np.arange(100000))
+
+
+class TestAnalysisSignal(unittest.TestCase):
+
+    def test_signal_from_mean_polarity(self):
+        analysis = Analysis()
+        df = analysis.analyze_sentiment_of_articles([{'title': 'Bitcoin surges', 'description': 'bullish breakout'},
+                                                     {'title': 'quiet day'}])
+        self.assertEqual(list(df['hits']), [3, 0])
+        self.assertEqual(analysis.generate_trading_signal(df, threshold=0.2), 'BUY')
+        self.assertEqual(analysis.generate_trading_signal(df.iloc[1:], threshold=0.2), 'HOLD')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.batcher import HIGH, NORMAL, MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_vip_arrival_flushes_immediately_with_routine_items(self):
+        batcher = MicroBatcher(flush_items=100, max_wait=10)
+        batcher.put(['routine'], {'r1'}, NORMAL, source='twitter_home')
+        self.assertIsNone(batcher.get_batch(timeout=0.05))  # routine traffic waits for more
+
+        threading.Timer(0.05, batcher.put, args=(['[VIP][alice] pump'], {'v1'}, HIGH, 'twitter_vip')).start()
+        start = time.monotonic()
+        batch = batcher.get_batch(timeout=2)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(batch.reason, 'priority')
+        self.assertEqual(batch.priority, HIGH)
+        self.assertEqual(batch.texts, ['[VIP][alice] pump', 'routine'])  # fast lane first
+        self.assertEqual(batch.ids, {'v1', 'r1'})
+        self.assertEqual(batch.sources, ['twitter_vip', 'twitter_home'])
+
+    def test_routine_items_flush_on_size_or_max_wait(self):
+        batcher = MicroBatcher(flush_items=3, max_items=4, max_wait=0.1)
+        batcher.put(['a', 'b'], {'a', 'b'})
+        start = time.monotonic()
+        batch = batcher.get_batch(timeout=2)
+        self.assertEqual((batch.reason, batch.texts), ('wait', ['a', 'b']))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+        batcher.put(['c', 'd'], {'c', 'd'})
+        batcher.put(['e', 'f', 'g'], {'e', 'f', 'g'})
+        batch = batcher.get_batch(timeout=0)
+        # the second entry would exceed max_items, so it stays for the next batch
+        self.assertEqual((batch.reason, batch.texts), ('size', ['c', 'd']))
+        self.assertEqual(batcher.pending_items, 3)
+
+    def test_backpressure_and_close(self):
+        batcher = MicroBatcher(max_wait=10, capacity=1)
+        self.assertTrue(batcher.put(['a'], {'a'}))
+        self.assertFalse(batcher.put(['b'], {'b'}, timeout=0.05))
+        batcher.close()
+        self.assertEqual(batcher.get_batch(timeout=1).reason, 'close')  # pending items are not lost
+        self.assertIsNone(batcher.get_batch(timeout=1))
+        self.assertFalse(batcher.put(['c'], {'c'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+from core.config import ConfigError, load_config
+
+
+def write(path, text, mtime=None):
+    with open(path, 'w') as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'config.ini')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_until_file_changes(self):
+        write(self.path, "[Fetch]\nTIMEOUT = 5     # seconds\n[Users]\nVIP_USERS = alice, bob,\n", mtime=1000)
+        config = load_config(self.path)
+        self.assertEqual(config.getfloat('Fetch', 'TIMEOUT'), 5.0)  # trailing comment stripped
+        self.assertEqual(config.getlist('Users', 'VIP_USERS'), ['alice', 'bob'])
+        self.assertEqual(config.base_dir, self.tmp.name)
+        self.assertIs(load_config(self.path), config)
+
+        write(self.path, "[Fetch]\nTIMEOUT = 7\n; comment line\n[News]\nNEWS_KEYWORDS = btc ; eth  # note\n", mtime=2000)
+        reloaded = load_config(self.path)
+        self.assertIsNot(reloaded, config)
+        self.assertEqual(reloaded.getfloat('Fetch', 'TIMEOUT'), 7.0)
+        self.assertEqual(reloaded.get('News', 'NEWS_KEYWORDS'), 'btc ; eth')  # only " #" starts a comment
+
+    def test_validation(self):
+        write(self.path, "[Fetch]\nTIMEOUT = soon\nMAX_WORKERS = 0\n", mtime=1000)
+        with self.assertRaises(ConfigError) as ctx:
+            load_config(self.path)
+        self.assertIn("TIMEOUT", str(ctx.exception))
+        self.assertIn("MAX_WORKERS", str(ctx.exception))
+
+        # a broken edit of a running config keeps the last good version
+        write(self.path, "[Fetch]\nTIMEOUT = 3\n", mtime=2000)
+        good = load_config(self.path)
+        write(self.path, "[Fetch]\nTIMEOUT = -1\n", mtime=3000)
+        self.assertIs(load_config(self.path), good)
+
+    def test_backends_are_not_imported_at_startup(self):
+        code = ("import sys; import main_twitter_llm, pipeline_daemon; "
+                "print(','.join(m for m in ('openai', 'praw', 'feedparser', 'requests') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True,
+                                check=True).stdout
+        self.assertEqual(output.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
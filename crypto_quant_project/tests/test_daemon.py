@@ -0,0 +1,134 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.batcher import HIGH, NORMAL
+from core.ingestion import Item
+from pipeline_daemon import PipelineDaemon, run_every
+
+
+class SlowBatchAnalyzer:
+    cache = None
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.items = 0
+
+    def analyze_batch(self, items):
+        time.sleep(self.delay)
+        self.items += len(items)
+        return {item['id']: {'sentiment_score': 0.8, 'confidence': 1.0} for item in items}
+
+
+class TestPipelineDaemon(unittest.TestCase):
+
+    def test_run_every_keeps_fixed_schedule(self):
+        stop = threading.Event()
+        calls = []
+
+        def job():
+            calls.append(time.monotonic())
+            time.sleep(0.03)
+
+        thread = threading.Thread(target=run_every, args=(0.1, job, stop))
+        thread.start()
+        time.sleep(0.55)
+        stop.set()
+        thread.join()
+        # the job's own runtime must not push later runs back: a drifting schedule would fit
+        # only 4 runs (every 0.13s) into 0.55s, and consecutive runs would be >= 0.13s apart
+        self.assertIn(len(calls), (5, 6, 7))
+        gaps = [b - a for a, b in zip(calls, calls[1:])]
+        self.assertAlmostEqual(sum(gaps) / len(gaps), 0.1, delta=0.02)
+
+    def test_pipeline_processes_every_item_once_and_saves_state(self):
+        with tempfile.TemporaryDirectory() as tmp, FakeRssHub(items_per_feed=10) as hub:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write(f"[Trading]\nSYMBOLS = BTC/USDT\n"
+                        f"[Users]\nVIP_USERS = alice, bob\n"
+                        f"[Fetch]\nRSSHUB_BASE_URL = {hub.base_url}\n"
+                        f"[Cache]\nFEED_CACHE = false\nLLM_CACHE = false\n"
+                        f"[Dedupe]\nENABLED = false\n"
+                        f"[Daemon]\nVIP_INTERVAL = 0.1\nHOME_INTERVAL = 0.05\nQUEUE_SIZE = 2\nMAX_WAIT = 0.2\n")
+            analyzer = SlowBatchAnalyzer(delay=0.1)
+            daemon = PipelineDaemon(config_path, llm_analyzer=analyzer)
+            daemon.start()
+            deadline = time.time() + 5
+            while len(daemon.seen_store) < 20 and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(len(daemon.seen_store), 20)  # 5 per VIP user + 10 from home
+            daemon.shutdown(timeout=5)
+
+            self.assertEqual(analyzer.items, 20)
+            self.assertEqual(daemon.last_signals, {'BTC': 'BUY'})
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'signal_state.npz')))
+            self.assertFalse(any(t.is_alive() for t in daemon._threads))
+
+    def test_failed_batch_is_not_suppressed_by_dedupe(self):
+        """After a failed analysis the items' dedupe clusters are rolled back, so a refetch analyzes them."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write("[Trading]\nSYMBOLS = BTC/USDT\n[Cache]\nFEED_CACHE = false\nLLM_CACHE = false\n"
+                        "[Dedupe]\nENABLED = true\n[Ingestion]\nSOURCES = twitter_home\n[Daemon]\nMAX_WAIT = 0\n")
+            daemon = PipelineDaemon(config_path, llm_analyzer=SlowBatchAnalyzer(delay=0))
+            items = [Item('twitter_home', text, url=f"https://x.com/a/status/{i}") for i, text in
+                     enumerate(["ETF approval lands, BTC breaks out", "Exchange hack drains hot wallet"])]
+            daemon._enqueue('twitter_home', items, NORMAL)
+            batch = daemon.batcher.get_batch(timeout=0)
+            self.assertEqual(len(batch.texts), 2)
+            daemon._release(batch.ids)  # what _analysis_loop does when analysis raises
+
+            daemon._enqueue('twitter_home', items, NORMAL)
+            self.assertEqual(len(daemon.batcher.get_batch(timeout=0).texts), 2)
+            daemon.seen_store.close()
+
+    def test_config_edit_rebuilds_analysis_components(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            base = ("[Trading]\nSYMBOLS = BTC/USDT\n[Cache]\nFEED_CACHE = false\nLLM_CACHE = false\n"
+                    "[Ingestion]\nSOURCES = twitter_home\n[Daemon]\nMAX_WAIT = 0\n")
+            with open(config_path, 'w') as f:
+                f.write(base + "[Users]\nVIP_USERS = alice\n")
+            os.utime(config_path, (1000, 1000))
+            daemon = PipelineDaemon(config_path, llm_analyzer=SlowBatchAnalyzer(delay=0))
+            engine = daemon.signal_engine
+            with open(config_path, 'w') as f:
+                f.write(base + "[Users]\nVIP_USERS = alice, @Carol\n[Signals]\nBUY_THRESHOLD = 0.9\n")
+            os.utime(config_path, (2000, 2000))
+
+            daemon._enqueue('twitter_home', [Item('twitter_home', "BTC breaks out", url="https://x.com/a/status/1")], NORMAL)
+            daemon.batcher.close()
+            daemon._analysis_loop()
+            self.assertIsNot(daemon.signal_engine, engine)
+            self.assertEqual(daemon.signal_engine.buy_threshold, 0.9)
+            self.assertEqual(daemon.last_signals, {'BTC': 'HOLD'})  # 0.8 no longer clears the buy threshold
+            self.assertEqual(daemon.vip_handles, {'alice', 'carol'})
+            daemon.seen_store.close()
+
+    def test_vip_lane_matches_authors_of_tweets_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write("[Trading]\nSYMBOLS = BTC/USDT\n[Users]\nVIP_USERS = CoinDesk\n[Cache]\nFEED_CACHE = false\n"
+                        "[Ingestion]\nSOURCES = twitter_home\n")
+            daemon = PipelineDaemon(config_path, llm_analyzer=SlowBatchAnalyzer(delay=0))
+            daemon.ingestion.collect = lambda names: [
+                Item('news', "BTC ETF inflows", url="https://coindesk.com/a", author='CoinDesk'),
+                Item('twitter_home', "BTC at highs", url="https://x.com/coindesk/status/1", author='coindesk')]
+            lanes = {}
+            daemon._enqueue = lambda source, items, priority: lanes.update({priority: [i.source for i in items]})
+            daemon._fetch('twitter_home')
+            self.assertEqual(lanes, {HIGH: ['twitter_home'], NORMAL: ['news']})
+            daemon.seen_store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.dedupe import NearDuplicateIndex, simhash_fingerprints
+
+HEADLINE = "Breaking: SEC approves spot Bitcoin ETF applications from BlackRock and Fidelity"
+
+
+class TestNearDuplicates(unittest.TestCase):
+
+    def test_fingerprints_are_deterministic(self):
+        fps = simhash_fingerprints([HEADLINE, HEADLINE, "hi", ""])
+        self.assertEqual(len(fps), 4)
+        self.assertEqual(fps[0], fps[1])
+        self.assertEqual(simhash_fingerprints([HEADLINE])[0], fps[0])
+
+    def test_collapse_counts_mentions(self):
+        index = NearDuplicateIndex()
+        texts = [HEADLINE,
+                 "ETH gas fees drop to record lows after the upgrade",
+                 f"RT @alice: {HEADLINE} https://t.co/abc",
+                 HEADLINE.upper() + "!!"]
+        self.assertEqual(index.collapse(texts, now=0), [(0, 3), (1, 1)])
+        self.assertEqual(index.collapsed, 2)
+
+    def test_rolling_window_across_batches(self):
+        index = NearDuplicateIndex(window_seconds=60)
+        index.collapse([HEADLINE], now=0)
+        self.assertEqual(index.collapse([HEADLINE, "Solana outage again"], now=30), [(1, 1)])
+        self.assertEqual(index.suppressed, 1)
+        self.assertEqual(index.mentions(HEADLINE), 2)
+        # After the window the headline counts as new again
+        self.assertEqual(index.collapse([HEADLINE], now=200), [(0, 1)])
+
+    def test_forget_rolls_back_clusters(self):
+        index = NearDuplicateIndex()
+        index.collapse([HEADLINE, "ETH gas fees drop to record lows"], now=0)
+        self.assertEqual(index.forget([HEADLINE]), 1)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.collapse([f"RT @bob: {HEADLINE}"], now=1), [(0, 1)])
+
+    def test_thousands_of_items_quickly(self):
+        rng = random.Random(7)
+        words = "btc eth sol etf sec pump dump moon bear bull whale hack fed rate cut price".split()
+        texts = [" ".join(rng.choice(words) for _ in range(25)) for _ in range(2000)]
+        start = time.perf_counter()
+        NearDuplicateIndex().collapse(texts)
+        self.assertLess(time.perf_counter() - start, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_exchange import FakeExchange
+from core.execution import Order, OrderExecutor, OrderRejected, PaperExchange, prepare_order
+
+PAIRS = {'BTC': 'BTC/USDT', 'ETH': 'ETH/USDT', 'SOL': 'SOL/USDT'}
+
+
+def wait(futures):
+    return [order for future in futures for order in future.result(timeout=5)]
+
+
+class TestPrepareOrder(unittest.TestCase):
+
+    def test_rounds_down_and_checks_limits(self):
+        exchange = FakeExchange()
+        exchange.load_markets()
+        order = prepare_order(exchange, Order('fake', 'BTC/USDT', 'buy', 0.0123456789))
+        self.assertEqual(order.amount, 0.01234)
+        with self.assertRaises(OrderRejected):  # rounds to zero
+            prepare_order(exchange, Order('fake', 'BTC/USDT', 'buy', 0.000001))
+        with self.assertRaises(OrderRejected):  # 0.001 ETH * 3000 = 3 USDT < 5 USDT minimum
+            prepare_order(exchange, Order('fake', 'ETH/USDT', 'buy', 0.001), reference_price=3000)
+        with self.assertRaises(OrderRejected):
+            prepare_order(exchange, Order('fake', 'DOGE/USDT', 'buy', 10))
+
+
+class TestOrderExecutor(unittest.TestCase):
+
+    def test_warm_batched_orders_on_signal_changes(self):
+        exchange = FakeExchange(latency=0.05, markets_latency=0.2)
+        executor = OrderExecutor({'fake': exchange}, PAIRS, trade_size=0.01, trade_sizes={'SOL': 1})
+        try:
+            executor.warm_up()
+            start = time.monotonic()
+            futures = executor.execute_signals({'BTC': 'BUY', 'ETH': 'SELL', 'SOL': 'BUY', 'XRP': 'BUY'})
+            self.assertLess(time.monotonic() - start, 0.03)  # submission does not wait for the exchange
+            orders = wait(futures)
+            self.assertEqual([(o.symbol, o.side, o.error) for o in orders],
+                             [('BTC/USDT', 'buy', None), ('ETH/USDT', 'sell', None), ('SOL/USDT', 'buy', None)])
+            self.assertEqual(exchange.requests, {'load_markets': 1, 'create_orders': 1})
+            self.assertTrue(all(0.05 <= o.latency < 0.2 for o in orders))
+            # unchanged signals place nothing; a flip does
+            self.assertEqual(executor.execute_signals({'BTC': 'BUY', 'ETH': 'SELL'}), [])
+            self.assertEqual([o.side for o in wait(executor.execute_signals({'BTC': 'SELL'}))], ['sell'])
+        finally:
+            executor.close()
+
+    def test_orders_go_out_concurrently_without_batch_support(self):
+        exchange = FakeExchange(latency=0.1, supports_batch=False)
+        executor = OrderExecutor({'fake': exchange}, PAIRS, trade_size=0.01)
+        try:
+            start = time.monotonic()
+            wait(executor.execute_signals({'BTC': 'BUY', 'ETH': 'BUY'}))
+            self.assertLess(time.monotonic() - start, 0.19)
+            self.assertEqual(exchange.requests, {'load_markets': 1, 'create_order': 2})
+        finally:
+            executor.close()
+
+    def test_paper_trading_against_stub(self):
+        paper = PaperExchange(FakeExchange(), balance={'USDT': 1000.0}, fee_rate=0.001)
+        executor = OrderExecutor({'paper': paper}, PAIRS, trade_size=0.01)
+        try:
+            orders = wait(executor.execute_signals({'BTC': 'BUY', 'ETH': 'BUY'}))
+            # 0.01 BTC @ 60000 = 600 USDT fits; ETH 0.01 @ 3000 = 30 USDT fits too
+            self.assertEqual([o.error for o in orders], [None, None])
+            self.assertAlmostEqual(paper.balance['USDT'], 1000 - 630 * 1.001)
+            self.assertEqual(paper.balance['BTC'], 0.01)
+            rejected = wait(executor.execute_signals({'BTC': 'SELL', 'ETH': 'HOLD', 'SOL': 'SELL'}))
+            self.assertIsNone(rejected[0].error)
+            self.assertIn('paper balance', rejected[1].error)  # no SOL to sell
+            self.assertEqual(paper.fetch_balance()['free']['BTC'], 0.0)
+        finally:
+            executor.close()
+
+    def test_rejected_order_is_retried_on_the_same_signal(self):
+        paper = PaperExchange(FakeExchange(), balance={'USDT': 1000.0}, fee_rate=0.001)
+        executor = OrderExecutor({'paper': paper}, PAIRS, trade_size=0.01, trade_sizes={'ETH': 0.00001})
+        try:
+            self.assertIn('paper balance', wait(executor.execute_signals({'SOL': 'SELL'}))[0].error)
+            paper.balance['SOL'] = 1.0
+            self.assertIsNone(wait(executor.execute_signals({'SOL': 'SELL'}))[0].error)
+            self.assertEqual(executor.execute_signals({'SOL': 'SELL'}), [])  # accepted: not repeated
+
+            # rounds to zero: rejected before submission, still retried next cycle
+            self.assertEqual(executor.execute_signals({'ETH': 'BUY'}), [])
+            self.assertEqual(len(executor.orders_for_signals({'ETH': 'BUY'})), 1)
+        finally:
+            executor.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.feed_cache import FeedCache
+from rsshub_twitter_fetcher import RssHubTwitterFetcher
+
+
+class TestFeedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.hub = FakeRssHub(items_per_feed=5).start()
+        self.url = f"{self.hub.base_url}/twitter/user/alice"
+
+    def tearDown(self):
+        self.hub.stop()
+        self.tmp.cleanup()
+
+    def test_not_modified_skips_parse(self):
+        """The second poll sends If-None-Match, gets a 304 and returns the cached tweets."""
+        cache = FeedCache(self.tmp.name)
+        first = RssHubTwitterFetcher(self.url, cache=cache).fetch()
+        second = RssHubTwitterFetcher(self.url, cache=cache).fetch(max_items=2)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(second, first[:2])
+        self.assertEqual(self.hub.not_modified, 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertGreater(stats['bytes_saved'], 0)
+
+    def test_validators_persist_across_instances(self):
+        """A new FeedCache on the same directory still sends conditional requests."""
+        RssHubTwitterFetcher(self.url, cache=FeedCache(self.tmp.name)).fetch()
+        reopened = FeedCache(self.tmp.name)
+        tweets = RssHubTwitterFetcher(self.url, cache=reopened).fetch()
+        self.assertEqual(len(tweets), 5)
+        self.assertEqual(reopened.hits, 1)
+        self.assertEqual(self.hub.not_modified, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub, build_rss
+from core.feed_cache import FeedCache
+from rsshub_twitter_fetcher import RssHubTwitterFetcher, iter_feed_items
+from utils.logger import metrics
+
+ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title> Atom &amp; tweet </title><link rel="alternate" href="https://x.com/a/status/9"/>
+<summary>gm BTC</summary><published>2025-06-23T08:00:00Z</published></entry>
+</feed>'''
+
+RSS_GUID = b'''<?xml version="1.0"?><rss version="2.0"><channel><title>x</title>
+<item><title><![CDATA[ CDATA title ]]></title><description>plain text</description>
+<guid>https://x.com/a/status/1</guid><pubDate>Mon, 23 Jun 2025 08:00:00 GMT</pubDate></item>
+<item><title>t2</title><description>more text</description><link> https://x.com/a/status/2 </link>
+<guid isPermaLink="false">zz</guid></item>
+</channel></rss>'''
+
+# RSSHub puts the tweet's HTML in <description>, CDATA or escaped; feedparser sanitizes it
+RSS_HTML = b'''<?xml version="1.0"?><rss version="2.0"><channel><title>x</title>
+<item><title>AT&amp;T up</title><description><![CDATA[gm<br>BTC <script>alert(1)</script><img src="https://p/a.jpg" onerror="x()"> &amp; more]]></description>
+<link>https://x.com/a/status/1</link></item>
+<item><title>t2</title><description>AT&amp;T &lt;p style="color:red"&gt;hi&lt;/p&gt;&lt;iframe src=x&gt;&lt;/iframe&gt;</description>
+<link>https://x.com/a/status/2</link></item>
+</channel></rss>'''
+
+ATOM_HTML = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title>html</title><link href="https://x.com/a/status/9"/><summary type="html">gm &lt;br&gt;&lt;script&gt;1&lt;/script&gt;</summary></entry>
+<entry><title>text</title><link href="https://x.com/a/status/8"/><summary>a &amp; b &lt;br&gt;</summary></entry>
+</feed>'''
+
+# feedparser takes published from pubDate / published / issued only; updated and dc:date are update times
+ATOM_DATES = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title>updated only</title><link href="https://x.com/a/status/9"/><updated>2025-06-23T08:00:00Z</updated></entry>
+<entry><title>both</title><link href="https://x.com/a/status/8"/><updated>2025-06-24T08:00:00Z</updated>
+<published>2025-06-23T07:00:00Z</published></entry>
+</feed>'''
+
+RDF_DATES = b'''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+ xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/"><channel><title>x</title></channel>
+<item rdf:about="https://x.com/a/status/1"><title>dc</title><link>https://x.com/a/status/1</link>
+<dc:date>2025-06-23T08:00:00Z</dc:date></item>
+<item rdf:about="https://x.com/a/status/2"><title>dcterms</title><link>https://x.com/a/status/2</link>
+<dcterms:issued>2025-06-23T09:00:00Z</dcterms:issued></item>
+</rdf:RDF>'''
+
+
+def url(i, name='home'):
+    return f"https://twitter.com/{name}/status/{i}"
+
+
+class TestFeedParse(unittest.TestCase):
+
+    def test_matches_feedparser(self):
+        for content in (build_rss('home', 30), ATOM, RSS_GUID, RSS_HTML, ATOM_HTML, ATOM_DATES, RDF_DATES):
+            expected = RssHubTwitterFetcher._parse(content, {})
+            self.assertEqual(list(iter_feed_items(content, chunk_size=100)), expected)
+
+    def test_stops_at_seen_items_and_max_items(self):
+        feed = RssHubTwitterFetcher('http://hub/twitter/home_latest', seen={url(5), url(6), url(7)})
+        tweets, complete = feed._parse_fast(build_rss('home', 50))
+        self.assertEqual(([t['url'] for t in tweets], complete), ([url(i) for i in range(5)], False))
+        self.assertEqual(len(feed._parse_fast(build_rss('home', 50), max_items=3)[0]), 3)
+        # A single seen tweet on top (pinned) does not stop the parse
+        feed.seen = {url(0)}
+        tweets, complete = feed._parse_fast(build_rss('home', 50))
+        self.assertEqual((len(tweets), complete), (49, True))
+
+    def test_malformed_feed_falls_back_to_feedparser(self):
+        content = build_rss('home', 3).replace(b'tweet 1', b'tweet&nbsp;1')
+        feed = RssHubTwitterFetcher('http://hub/twitter/home_latest')
+        before = metrics.counter('feed_parse_fallbacks_total')
+        self.assertIsNone(feed._parse_fast(content))
+        self.assertEqual(metrics.counter('feed_parse_fallbacks_total'), before + 1)
+        # Stopping before the malformed part never parses it
+        self.assertEqual(len(feed._parse_fast(build_rss('home', 3) + b'<garbage', max_items=2)[0]), 2)
+
+    def test_missing_sanitizer_falls_back_to_feedparser(self):
+        feed = RssHubTwitterFetcher('http://hub/twitter/home_latest')
+        with mock.patch.dict(sys.modules, {'feedparser.sanitizer': None}):
+            self.assertIsNone(feed._parse_fast(RSS_HTML))
+            self.assertEqual(len(feed._parse_fast(ATOM)[0]), 1)  # plain-text summaries need no sanitizer
+
+    def test_fetch_skips_seen_tweets(self):
+        with FakeRssHub(items_per_feed=40) as hub:
+            feed = RssHubTwitterFetcher(f"{hub.base_url}/twitter/home_latest", seen={url(10), url(11)})
+            tweets = feed.fetch(max_items=20)
+            feed.fast_parse = False
+            full = feed.fetch(max_items=20)
+        self.assertEqual([t['url'] for t in tweets], [url(i) for i in range(10)])
+        self.assertEqual(len(full), 20)
+
+    def test_partial_parse_keeps_conditional_requests(self):
+        """After an early stop the validators are still cached: an unchanged feed gets a 304 and nothing new."""
+        with FakeRssHub(items_per_feed=20) as hub, tempfile.TemporaryDirectory() as tmp:
+            cache = FeedCache(tmp)
+            home = RssHubTwitterFetcher(f"{hub.base_url}/twitter/home_latest", cache=cache, seen=set())
+            self.assertEqual(len(home.fetch(max_items=20)), 20)  # stops on max_items
+            self.assertEqual(home.fetch(max_items=20), [])
+            self.assertEqual(hub.not_modified, 1)
+
+            alice = RssHubTwitterFetcher(f"{hub.base_url}/twitter/user/alice", cache=cache,
+                                         seen={url(3, 'alice'), url(4, 'alice')})
+            self.assertEqual(len(alice.fetch()), 3)  # stops on the seen run
+            self.assertEqual(alice.fetch(), [])
+            self.assertEqual(hub.not_modified, 2)
+            self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (2, 2))
+
+            # a complete parse is still served from the cache on 304
+            full = RssHubTwitterFetcher(f"{hub.base_url}/twitter/user/bob", cache=cache)
+            self.assertEqual(len(full.fetch()), 20)
+            self.assertEqual(len(full.fetch()), 20)
+            self.assertEqual(hub.not_modified, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.ingestion import (CircuitBreaker, Ingestion, Item, Source, items_from_feed, items_from_user_tweets,
+                            twitter_handle)
+from core.seen_store import content_digest
+from main_twitter_llm import aggregate_items
+
+
+def items(source, n):
+    return [Item(source, f"{source} post {i}", url=f"https://example.com/{source}/{i}") for i in range(n)]
+
+
+class TestItems(unittest.TestCase):
+
+    def test_ids_match_previous_tweet_ids(self):
+        vip = items_from_user_tweets('alice', [{'text': 'hello', 'url': ''}])[0]
+        self.assertEqual(vip.id, content_digest('hello'))
+        self.assertEqual(vip.prompt_text, '[VIP][alice] hello')
+        home = items_from_feed([{'title': 'a', 'summary': 'b', 'url': ''},
+                                {'title': 'c', 'summary': 'd', 'url': 'https://x.com/1'}])
+        self.assertEqual([i.id for i in home], [content_digest('ab'), 'https://x.com/1'])
+        self.assertEqual(home[0].prompt_text, 'a b')
+
+    def test_twitter_handle(self):
+        self.assertEqual(twitter_handle('https://x.com/Alice/status/123'), 'Alice')
+        self.assertEqual(twitter_handle('https://twitter.com/alice'), '')
+        self.assertEqual(twitter_handle('https://example.com/alice/status/1'), '')
+
+    def test_aggregate_items_skips_seen_and_empty(self):
+        batch = items('news', 3) + [Item('news', '  ', url='https://example.com/empty')]
+        new_ids = set()
+        texts = aggregate_items(batch, tweet_log={batch[0].id}, new_tweet_ids=new_ids)
+        self.assertEqual(texts, ['news post 1', 'news post 2'])
+        self.assertEqual(len(new_ids), 3)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_open_half_open_closed(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.1)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+        time.sleep(0.12)
+        self.assertTrue(breaker.allow())    # one trial call ...
+        self.assertFalse(breaker.allow())   # ... and only one
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow())
+
+
+class TestIngestion(unittest.TestCase):
+
+    def test_sources_run_concurrently_in_source_order(self):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def fetch(name):
+            def run():
+                barrier.wait()  # deadlocks unless all three sources run at once
+                return items(name, 2)
+            return run
+
+        ingestion = Ingestion([Source(n, fetch(n)) for n in ('a', 'b', 'c')])
+        try:
+            result = ingestion.collect()
+        finally:
+            ingestion.close()
+        self.assertEqual([i.source for i in result], ['a', 'a', 'b', 'b', 'c', 'c'])
+
+    def test_serial_mode_runs_one_source_at_a_time(self):
+        """[Fetch] CONCURRENT = false: sources run one after another, still in source order."""
+        running, overlap = [], []
+
+        def fetch(name):
+            def run():
+                running.append(name)
+                overlap.append(len(running))
+                time.sleep(0.02)
+                running.remove(name)
+                return items(name, 1)
+            return run
+
+        ingestion = Ingestion([Source(n, fetch(n)) for n in ('a', 'b', 'c')], concurrent=False)
+        try:
+            result = ingestion.collect()
+        finally:
+            ingestion.close()
+        self.assertEqual([i.source for i in result], ['a', 'b', 'c'])
+        self.assertEqual(overlap, [1, 1, 1])
+
+    def test_slow_and_failing_sources_do_not_block_the_round(self):
+        def slow():
+            time.sleep(1)
+            return items('slow', 1)
+
+        def broken():
+            raise ValueError("feed parse failure")
+
+        ingestion = Ingestion([Source('fast', lambda: items('fast', 2)),
+                               Source('slow', slow, deadline=0.1),
+                               Source('broken', broken, breaker=CircuitBreaker(failure_threshold=1, reset_seconds=60))])
+        try:
+            start = time.monotonic()
+            result = ingestion.collect()
+            self.assertLess(time.monotonic() - start, 0.5)
+            self.assertEqual(len(result), 2)
+            self.assertEqual(ingestion.last_status, {'fast': 'ok', 'slow': 'timeout', 'broken': 'error'})
+            # the broken source's breaker is open now, so the next round skips it without calling it
+            self.assertEqual(len(ingestion.collect(['fast', 'broken'])), 2)
+            self.assertEqual(ingestion.last_status['broken'], 'skipped')
+        finally:
+            ingestion.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
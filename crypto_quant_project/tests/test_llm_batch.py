@@ -0,0 +1,118 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_openai import FakeOpenAI, fake_score
+from core.llm_analyzer import LLMAnalyzer
+from core.rate_limiter import RateLimiter
+
+
+def make_error(cls, message="error"):
+    """Builds an openai exception without depending on the HTTP client types."""
+    error = cls.__new__(cls)
+    Exception.__init__(error, message)
+    return error
+
+
+class EchoCompletions:
+    """Scores every text in a batch prompt by a keyword and records request sizes."""
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self.lock:
+            if self.failures:
+                raise self.failures.pop(0)
+        prompt = kwargs['messages'][0]['content']
+        rows = [json.loads(line) for line in prompt.split("Texts:\n", 1)[1].splitlines()]
+        with self.lock:
+            self.batch_sizes.append(len(rows))
+        results = [{"id": r["id"], "sentiment_score": 0.8 if "moon" in r["text"] else -0.8,
+                    "confidence": 0.9, "reasoning": "keyword"} for r in rows]
+        message = SimpleNamespace(content=json.dumps({"results": results}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestAnalyzeBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp.name, 'config.ini')
+        with open(self.config_path, 'w') as f:
+            f.write("[LLM]\nDEEPSEEK_API_KEY = test\nDEEPSEEK_API_BASE = http://127.0.0.1:9\n"
+                    "BATCH_SIZE = 3\nMAX_CONCURRENT_REQUESTS = 2\nRETRY_BASE_DELAY = 0.01\n"
+                    "[Cache]\nLLM_CACHE = false\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_analyzer(self, completions):
+        analyzer = LLMAnalyzer(config_file=self.config_path)
+        analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return analyzer
+
+    def test_results_matched_by_id(self):
+        fake = EchoCompletions()
+        analyzer = self.make_analyzer(fake)
+        items = [{'id': f"https://x.com/{i}", 'text': "BTC to the moon" if i % 2 else "BTC crash"} for i in range(7)]
+        results = analyzer.analyze_batch(items)
+        self.assertEqual(sorted(fake.batch_sizes), [1, 3, 3])
+        self.assertEqual(list(results), [item['id'] for item in items])
+        self.assertGreater(results["https://x.com/1"]['sentiment_score'], 0)
+        self.assertLess(results["https://x.com/2"]['sentiment_score'], 0)
+
+    def test_retries_rate_limit_and_server_errors(self):
+        fake = EchoCompletions(failures=[make_error(openai.RateLimitError), make_error(openai.APIConnectionError)])
+        analyzer = self.make_analyzer(fake)
+        results = analyzer.analyze_batch([{'id': 1, 'text': "moon"}])
+        self.assertEqual(results[1]['sentiment_score'], 0.8)
+
+    def test_non_retryable_error_marks_items_failed(self):
+        fake = EchoCompletions(failures=[ValueError("bad request")])
+        analyzer = self.make_analyzer(fake)
+        self.assertEqual(analyzer.analyze_batch([{'id': 1, 'text': "moon"}]), {1: None})
+
+    def test_over_http_with_injected_errors(self):
+        with FakeOpenAI(error_rate=0.3, seed=3) as server:
+            with open(self.config_path, 'w') as f:
+                f.write(f"[LLM]\nDEEPSEEK_API_KEY = test\nDEEPSEEK_API_BASE = {server.base_url}\n"
+                        "BATCH_SIZE = 3\nMAX_RETRIES = 10\nRETRY_BASE_DELAY = 0.01\n[Cache]\nLLM_CACHE = false\n")
+            analyzer = LLMAnalyzer(config_file=self.config_path)
+            items = [{'id': i, 'text': f"BTC item {i}"} for i in range(7)]
+            results = analyzer.analyze_batch(items)
+        self.assertEqual({i: r['sentiment_score'] for i, r in results.items()},
+                         {item['id']: fake_score(item['text']) for item in items})
+        self.assertGreater(server.errors, 0)
+        self.assertEqual(server.requests, 3 + server.errors)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=600)  # 10 per second, burst of 600
+        limiter._requests = 1
+        start = time.monotonic()
+        limiter.acquire()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_tokens_per_minute(self):
+        limiter = RateLimiter(tokens_per_minute=6000)  # 100 tokens per second
+        limiter._tokens = 0
+        waited = limiter.acquire(20)
+        self.assertGreater(waited, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
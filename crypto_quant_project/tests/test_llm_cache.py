@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.llm_cache import LLMCache, normalize_text
+from core.llm_analyzer import LLMAnalyzer
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions and counts calls."""
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'llm.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalization_merges_retweets(self):
+        self.assertEqual(normalize_text("RT @alice: BTC  ETF approved https://t.co/x"),
+                         normalize_text("BTC ETF approved https://t.co/y"))
+
+    def test_key_includes_model_and_prompt_version(self):
+        cache = LLMCache(self.db_path)
+        cache.put("text", "deepseek-chat", 1, {"sentiment_score": 0.5}, latency=2.0)
+        self.assertEqual(cache.get("text", "deepseek-chat", 1), {"sentiment_score": 0.5})
+        self.assertIsNone(cache.get("text", "deepseek-chat", 2))
+        self.assertIsNone(cache.get("text", "other-model", 1))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertAlmostEqual(stats['saved_latency'], 2.0)
+        cache.close()
+
+    def test_lru_and_ttl_eviction(self):
+        cache = LLMCache(self.db_path, max_entries=2)
+        cache.put("a", "m", 1, {"v": "a"}, 0.1)
+        cache.put("b", "m", 1, {"v": "b"}, 0.1)
+        cache.get("a", "m", 1)  # a becomes most recently used
+        cache.put("c", "m", 1, {"v": "c"}, 0.1)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b", "m", 1))
+        self.assertIsNotNone(cache.get("a", "m", 1))
+        cache.ttl_seconds = -1  # everything is expired
+        self.assertIsNone(cache.get("a", "m", 1))
+        cache.close()
+
+    def test_shared_between_connections(self):
+        """A second cache object (e.g. another process) sees entries written by the first."""
+        LLMCache(self.db_path).put("shared", "m", 1, {"ok": True}, 0.1)
+        self.assertEqual(LLMCache(self.db_path).get("shared", "m", 1), {"ok": True})
+
+    def test_analyzer_uses_cache(self):
+        config_path = os.path.join(self.tmp.name, 'config.ini')
+        with open(config_path, 'w') as f:
+            f.write("[LLM]\nDEEPSEEK_API_KEY = test\nDEEPSEEK_API_BASE = http://127.0.0.1:9\n"
+                    f"[Cache]\nLLM_CACHE_DB = {self.db_path}\n")
+        analyzer = LLMAnalyzer(config_file=config_path)
+        fake = FakeCompletions('{"sentiment_score": 0.4, "confidence": 0.9}')
+        analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+        first = analyzer.analyze_text("Bitcoin ETF approved")
+        second = analyzer.analyze_text("RT @bob: Bitcoin ETF approved")
+        self.assertEqual(first, second)
+        self.assertEqual(fake.calls, 1)
+        self.assertEqual(analyzer.cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
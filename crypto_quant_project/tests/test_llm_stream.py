@@ -0,0 +1,72 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_openai import FakeOpenAI, fake_score
+from core.json_stream import JsonFieldScanner
+from core.llm_analyzer import COMPACT_SENTIMENT_PROMPT, LLMAnalyzer
+
+
+class TestJsonFieldScanner(unittest.TestCase):
+
+    def test_fields_become_available_incrementally(self):
+        doc = json.dumps({"sentiment_score": -0.75, "confidence": 0.9,
+                          "nested": {"a": [1, {"b": "}"}]}, "reasoning": 'said "hi" \\ é', "flag": True})
+        scanner = JsonFieldScanner()
+        seen_score_at = None
+        for i in range(0, len(doc), 3):
+            scanner.feed(doc[i:i + 3])
+            if seen_score_at is None and scanner.has('sentiment_score', 'confidence'):
+                seen_score_at = i
+        self.assertLess(seen_score_at, doc.index('reasoning'))
+        self.assertTrue(scanner.complete)
+        self.assertEqual(scanner.fields, {"sentiment_score": -0.75, "confidence": 0.9,
+                                          "reasoning": 'said "hi" \\ é', "flag": True})
+
+    def test_number_needs_a_terminator(self):
+        scanner = JsonFieldScanner()
+        self.assertEqual(scanner.feed('{"sentiment_score": 0.8'), {})  # could still become 0.85
+        self.assertEqual(scanner.feed(','), {"sentiment_score": 0.8})
+
+
+class TestStreamingAnalyzer(unittest.TestCase):
+
+    def make_analyzer(self, tmp, base_url, extra=""):
+        config_path = os.path.join(tmp, 'config.ini')
+        with open(config_path, 'w') as f:
+            f.write(f"[LLM]\nDEEPSEEK_API_KEY = test\nDEEPSEEK_API_BASE = {base_url}\n{extra}"
+                    f"[Cache]\nLLM_CACHE = false\n")
+        return LLMAnalyzer(config_file=config_path)
+
+    def test_stream_returns_before_the_reasoning_and_cancels_it(self):
+        # ~4 KB of reasoning at 8 chars per 5 ms takes >2 s to stream in full
+        with FakeOpenAI(payload_bytes=4000, stream_chunk_delay=0.005) as llm, tempfile.TemporaryDirectory() as tmp:
+            analyzer = self.make_analyzer(tmp, llm.base_url, "STREAM = true\n")
+            start = time.perf_counter()
+            result = analyzer.analyze_text("Bitcoin ETF approved")
+            elapsed = time.perf_counter() - start
+            self.assertLess(elapsed, 1.0)
+            self.assertEqual(set(result), {'sentiment_score', 'confidence'})
+            deadline = time.time() + 3
+            while llm.cancelled_streams < 1 and time.time() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(llm.cancelled_streams, 1)
+
+            full = analyzer.analyze_text("Bitcoin ETF approved", stream=False)
+            self.assertEqual(full['sentiment_score'], result['sentiment_score'])
+            self.assertIn('reasoning', full)
+
+    def test_compact_prompt(self):
+        with FakeOpenAI() as llm, tempfile.TemporaryDirectory() as tmp:
+            analyzer = self.make_analyzer(tmp, llm.base_url, "COMPACT_PROMPT = true\nSTREAM = true\n")
+            result = analyzer.analyze_text("ETH upgrade")
+            self.assertEqual(result['sentiment_score'], fake_score(COMPACT_SENTIMENT_PROMPT.format(text="ETH upgrade")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import ITEMS_LOGGER, JsonFormatter, Metrics, MetricsExporter, get_logger, setup_logging
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counters_and_prometheus_text(self):
+        registry = Metrics(prefix='t_')
+        registry.describe('items_total', 'Items.')
+        registry.inc('items_total', 3, source='vip')
+        registry.inc('items_total', 2, source='vip')
+        registry.inc('items_total', source='home "latest"')
+        with registry.span('fetch'):
+            pass
+        text = registry.render_prometheus()
+        self.assertEqual(registry.counter('items_total', source='vip'), 5)
+        self.assertIn('# HELP t_items_total Items.', text)
+        self.assertIn('# TYPE t_items_total counter', text)
+        self.assertIn('t_items_total{source="vip"} 5', text)
+        self.assertIn('t_items_total{source="home \\"latest\\""} 1', text)
+        self.assertIn('t_stage_seconds_count{stage="fetch"} 1', text)
+
+    def test_span_records_failures_too(self):
+        registry = Metrics()
+        with self.assertRaises(ValueError):
+            with registry.span('llm'):
+                raise ValueError
+        self.assertEqual(registry.stage('llm')[0], 1)
+
+    def test_exporter_writes_json_on_stop(self):
+        registry = Metrics()
+        registry.inc('llm_requests_total', 4)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.json')
+            MetricsExporter(path, fmt='json', interval=60, registry=registry).start().stop()
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot['counters']['llm_requests_total'], [{'value': 4}])
+
+
+class TestLogging(unittest.TestCase):
+
+    def tearDown(self):
+        # leave the hierarchy unconfigured for other tests
+        root = logging.getLogger('crypto_quant')
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(logging.NOTSET)
+        root.propagate = True
+
+    def test_json_lines_with_extra_fields(self):
+        setup_logging(fmt='json')
+        stream = io.StringIO()
+        logging.getLogger('crypto_quant').handlers[0].stream = stream
+        get_logger('main').info("最终建议 %s", "BUY", extra={'symbol': 'BTC'})
+        record = json.loads(stream.getvalue())
+        self.assertEqual((record['level'], record['logger'], record['msg'], record['symbol']),
+                         ('INFO', 'crypto_quant.main', '最终建议 BUY', 'BTC'))
+
+    def test_json_formatter_serializes_exceptions_and_objects(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord('crypto_quant.daemon', logging.ERROR, __file__, 1, "分析失败", None, sys.exc_info())
+        record.sources = {'news'}
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual((payload['level'], payload['msg'], payload['sources']), ('ERROR', '分析失败', "{'news'}"))
+        self.assertIn('ValueError: boom', payload['exc'])
+
+    def test_per_item_output_is_opt_in(self):
+        for verbose, expected in ((False, ''), (True, 'tweet')):
+            setup_logging(verbose_items=verbose)
+            stream = io.StringIO()
+            logging.getLogger('crypto_quant').handlers[0].stream = stream
+            logging.getLogger(ITEMS_LOGGER).info("tweet")
+            self.assertEqual(stream.getvalue().strip()[-len(expected):] if expected else stream.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
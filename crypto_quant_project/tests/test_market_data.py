@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.market_data import CandleSeries, MarketDataStore
+
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000 - 1_700_000_000_000 % HOUR_MS
+
+
+class FakeExchange:
+    """ccxt-like fetch_ohlcv over a synthetic hourly series whose close is 100 + index."""
+    def __init__(self, candles=500):
+        self.calls = []
+        self.rows = [[START_MS + i * HOUR_MS, 100.0 + i, 101.0 + i, 99.0 + i, 100.0 + i + 1, 1.0]
+                     for i in range(candles)]
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(since)
+        rows = [r for r in self.rows if r[0] >= since]
+        return [list(r) for r in rows[:limit]]
+
+
+class TestMarketDataStore(unittest.TestCase):
+
+    def make_store(self, tmp, exchange):
+        return MarketDataStore(exchange_id='fake', timeframe='1h', cache_dir=tmp, history_days=11,
+                               exchange=exchange, page_limit=100)
+
+    def test_incremental_update_does_not_redownload(self):
+        exchange = FakeExchange()
+        with tempfile.TemporaryDirectory() as tmp:
+            now = (START_MS + 240 * HOUR_MS) / 1000 + 1800    # candle 240 is still open
+            store = self.make_store(tmp, exchange)
+            self.assertEqual(store.update(['BTC/USDT'], now=now), {'BTC/USDT': 240})
+            self.assertEqual(len(exchange.calls), 3)
+
+            exchange.calls.clear()
+            reopened = self.make_store(tmp, exchange)  # a later run reads history from disk
+            self.assertEqual(reopened.update_symbol('BTC/USDT', now=now), 0)
+            self.assertEqual(exchange.calls, [])
+            self.assertEqual(reopened.update_symbol('BTC/USDT', now=now + 3 * 3600), 3)
+            self.assertEqual(exchange.calls, [START_MS + 240 * HOUR_MS])
+            close = reopened.candles('BTC/USDT')['close']
+            self.assertIsInstance(close, np.memmap)
+            np.testing.assert_array_equal(close, 101.0 + np.arange(243))
+
+    def test_join_sentiment_with_forward_returns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self.make_store(tmp, FakeExchange(candles=10))
+            store.update_symbol('ETH/USDT', now=(START_MS + 20 * HOUR_MS) / 1000)
+            start = START_MS / 1000
+            # 30 minutes into candle 0 -> enters at candle 1's open; the last point is beyond the cache
+            times = [start - 10, start + 1800, start + 9 * 3600, start + 30 * 3600]
+            returns = store.forward_returns('ETH/USDT', times, horizon=2)
+            np.testing.assert_allclose(returns[:2], [102 / 100 - 1, 103 / 101 - 1])
+            self.assertTrue(np.isnan(returns[2:]).all())
+            values, joined = store.join_sentiment('ETH/USDT', times, [0.5, -0.2, 0.1, 0.9], horizon=2)
+            np.testing.assert_array_equal(values, [0.5, -0.2])
+            corr, pairs = store.correlation('ETH/USDT', times, [0.5, -0.2, 0.1, 0.9], horizon=2)
+            self.assertEqual((round(corr, 6), pairs), (1.0, 2))
+
+    def test_times_outside_the_cache_get_nan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            exchange = FakeExchange(candles=10)
+            del exchange.rows[4:6]  # exchange downtime
+            store = self.make_store(tmp, exchange)
+            store.update_symbol('ETH/USDT', now=(START_MS + 20 * HOUR_MS) / 1000)
+            start = START_MS / 1000
+            # before the first candle, inside the gap, in the last (still cached) candle, past the end
+            returns = store.forward_returns('ETH/USDT', [start - 7200, start + 4.5 * 3600, start + 8.5 * 3600,
+                                                         start + 9.5 * 3600])
+            np.testing.assert_allclose(returns, [np.nan, np.nan, 110 / 109 - 1, np.nan])
+
+    def test_update_backfills_to_since(self):
+        exchange = FakeExchange(candles=300)
+        with tempfile.TemporaryDirectory() as tmp:
+            now = (START_MS + 300 * HOUR_MS) / 1000
+            store = self.make_store(tmp, exchange)
+            store.update_symbol('BTC/USDT', now=now)
+            self.assertEqual(store.series('BTC/USDT').first_timestamp(), START_MS + 36 * HOUR_MS)  # 11 days back
+
+            since = START_MS / 1000 + 1800  # recording started 30 minutes into candle 0
+            self.assertEqual(store.update_symbol('BTC/USDT', now=now, since=since), 300)
+            self.assertEqual(len(store.candles('BTC/USDT')['close']), 300)
+            self.assertFalse(np.isnan(store.forward_returns('BTC/USDT', [since])).any())
+            # nothing older exists on the exchange: the cache is kept, not downloaded again
+            exchange.calls.clear()
+            self.assertEqual(store.update_symbol('BTC/USDT', now=now, since=since - 86400), 0)
+            self.assertEqual(exchange.calls, [START_MS - 86400 * 1000])
+
+    def test_half_written_append_is_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            series = CandleSeries(tmp)
+            series.append(FakeExchange(candles=5).rows)
+            with open(os.path.join(tmp, 'close.f8'), 'ab') as f:
+                f.write(np.float64(1.0).tobytes())    # crashed before the timestamp was written
+            self.assertEqual(len(CandleSeries(tmp).columns()['close']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.prescorer import PreScorer
+from main_twitter_llm import generate_signal_from_llm
+
+
+class RecordingAnalyzer:
+    def __init__(self):
+        self.prompts = []
+
+    def analyze_text(self, text):
+        self.prompts.append(text)
+        return {'sentiment_score': 0.0, 'confidence': 0.5}
+
+
+class TestPreScorer(unittest.TestCase):
+
+    def setUp(self):
+        self.scorer = PreScorer(['BTC', 'ETH'], aliases={'ETH': ['二饼']})
+
+    def route(self, text):
+        return self.scorer.route([text])[0]
+
+    def test_irrelevant_items_are_dropped(self):
+        self.assertEqual(self.route("Had a fantastic lunch today")['route'], 'drop')
+
+    def test_clear_sentiment_is_decided_locally(self):
+        positive = self.route("Bitcoin rally: bullish breakout to a new ATH")
+        negative = self.route("比特币暴跌，跌破新低")
+        self.assertEqual((positive['route'], positive['symbols']), ('local', ['BTC']))
+        self.assertGreater(positive['score'], 0.5)
+        self.assertEqual(negative['route'], 'local')
+        self.assertLess(negative['score'], -0.5)
+
+    def test_negation_flips_polarity(self):
+        scores, hits = self.scorer.lexical_scores(["btc bullish rally", "btc not bullish, not rally"])
+        self.assertGreater(scores[0], 0)
+        self.assertLess(scores[1], 0)
+        self.assertEqual(list(hits), [2, 2])
+
+    def test_ambiguous_high_impact_and_vip_go_to_llm(self):
+        self.assertEqual(self.route("ETH price update")['route'], 'llm')
+        self.assertEqual(self.route("二饼 exchange hacked, bearish crash")['route'], 'llm')
+        self.assertEqual(self.route("[VIP][cz] BTC bullish breakout rally")['route'], 'llm')
+        self.assertEqual(self.route("Crypto market rally, bullish")['symbols'], ['BTC', 'ETH'])
+
+    def test_signal_only_sends_ambiguous_items(self):
+        analyzer = RecordingAnalyzer()
+        texts = ["[x4] Bitcoin rally: bullish breakout to a new ATH", "Nice weather", "ETH price update"]
+        signals = generate_signal_from_llm(analyzer, texts, ['BTC', 'ETH'], prescorer=self.scorer)
+        self.assertEqual(len(analyzer.prompts), 1)
+        self.assertIn("ETH price update", analyzer.prompts[0])
+        self.assertNotIn("Nice weather", analyzer.prompts[0])
+        self.assertEqual(signals['BTC'], 'BUY')
+        stats = self.scorer.stats()
+        self.assertEqual((stats['dropped'], stats['local'], stats['llm']), (1, 1, 1))
+        self.assertEqual(stats['llm_items_avoided'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.market_data import MarketDataStore
+from core.recorder import Recorder, read_records
+from core.resource_fetcher import ResourceFetcher
+from core.config import load_config
+from main_twitter_llm import (aggregate_twitter_content, analyze_texts, build_signal_prompt, open_prescorer,
+                              parse_symbol_pairs)
+from replay_backtest import market_correlation, replay
+from utils.logger import silenced
+
+
+class RecordingAnalyzer:
+    """Stands in for LLMAnalyzer: answers every prompt and records it like the live analyzer does."""
+    cache = None
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def analyze_text(self, text):
+        response = {'sentiment_score': 0.7, 'confidence': 0.9}
+        self.recorder.llm('text', 'deepseek-chat', 1, text, response, 1.0)
+        return response
+
+
+class TestRecorder(unittest.TestCase):
+
+    def test_append_and_truncated_tail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rec.jsonl.gz')
+            recorder = Recorder(path)
+            recorder.items('http://x/feed', [{'title': 'a'}])
+            recorder.close()
+            recorder = Recorder(path)  # reopening appends
+            recorder.cycle(['alice'], 'http://x')
+            recorder.close()
+            self.assertEqual([r['kind'] for r in read_records(path)], ['items', 'cycle'])
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            with open(path, 'wb') as f:
+                f.write(data + gzip.compress(b'{"kind":"items","url":"http://x/f')[:20])
+            self.assertEqual(len(list(read_records(path))), 2)
+
+    def test_record_then_replay(self):
+        symbols = ['BTC']
+        with tempfile.TemporaryDirectory() as tmp, FakeRssHub(items_per_feed=3) as hub:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write(f"[Cache]\nFEED_CACHE = false\n[Fetch]\nRSSHUB_BASE_URL = {hub.base_url}\n")
+            path = os.path.join(tmp, 'rec.jsonl.gz')
+            recorder = Recorder(path)
+            fetcher = ResourceFetcher(config_file=config_path)
+            fetcher.recorder = recorder
+            home_url = f"{hub.base_url}/twitter/home_latest"
+            seen = set()
+            for cycle in range(2):
+                new_ids = set()
+                texts = aggregate_twitter_content(fetcher, ['alice'], rsshub_url=home_url, tweet_log=seen,
+                                                  new_tweet_ids=new_ids)
+                seen.update(new_ids)
+                recorder.cycle(['alice'], hub.base_url, home_url, max_items=20)
+                if cycle == 0:
+                    recorder.llm('text', 'deepseek-chat', 1, build_signal_prompt(texts, symbols),
+                                 {'sentiment_score': 0.9, 'confidence': 0.8}, 1.5)
+                hub.items_per_feed = 5  # two new items per feed in the next cycle
+            recorder.close()
+
+            report = replay(path, symbols, stub='neutral', reparse=True)
+        self.assertEqual(report['cycles'], 2)
+        self.assertEqual([p['items'] for p in report['signals']], [6, 4])
+        self.assertEqual([p['signals']['BTC'] for p in report['signals']], ['BUY', 'HOLD'])
+        self.assertEqual((report['llm_recorded_hits'], report['llm_stubbed']), (1, 1))
+        self.assertEqual(report['stages']['parse']['items'], 16)
+        self.assertEqual(report['stages']['aggregate']['items'], 10)
+
+    def test_replay_rebuilds_live_prescorer_prompts(self):
+        """Prompts built with the configured prescorer during recording are found again on replay."""
+        symbols = ['BTC', 'ETH']
+        tweets = [{'title': title, 'summary': '', 'url': f"https://x.com/a/status/{i}", 'published': ''}
+                  for i, title in enumerate(["BTC ETF decision expected this week",
+                                             "ETH crash, massive dump and liquidations, very bearish",
+                                             "Lunch was great", "Whales moving BTC to exchanges"])]
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write("[PreScore]\nENABLED = true\nLOCAL_THRESHOLD = 0.3\n[Signals]\nENGINE = false\n")
+            config = load_config(config_path)
+            path = os.path.join(tmp, 'rec.jsonl.gz')
+            recorder = Recorder(path)
+            recorder.items('http://hub/twitter/home_latest', tweets)
+            texts = aggregate_twitter_content(_RecordedFetcher(tweets), [], rsshub_url='http://hub/twitter/home_latest')
+            live = analyze_texts(config, RecordingAnalyzer(recorder), texts, symbols, open_prescorer(config, symbols))
+            recorder.cycle([], 'http://hub', 'http://hub/twitter/home_latest', max_items=20)
+            recorder.close()
+
+            report = replay(path, symbols, config=config, stub='none', prescorer=open_prescorer(config, symbols))
+        self.assertGreater(report['llm_recorded_hits'], 0)
+        self.assertEqual(report['llm_stubbed'], 0)
+        self.assertEqual(report['signals'][0]['signals'], live)
+
+    def test_market_correlation_queries_pairs(self):
+        """Scores are keyed by symbol ('BTC') but candles must be fetched for the pair ('BTC/USDT')."""
+        hour = 3600
+        now = time.time() // hour * hour
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write("[Trading]\nSYMBOLS = BTC/USDT, ETH/USDT\n")
+            exchange = _PairOnlyExchange('BTC/USDT', start=now - 48 * hour, candles=48)
+            store = MarketDataStore(exchange_id='stub', timeframe='1h', cache_dir=tmp, history_days=1, exchange=exchange)
+            report = {'signals': [{'t': now - (30 - i) * hour + 60, 'scores': {'BTC': s, 'ETH': s}}
+                                  for i, s in enumerate([0.5, -0.2, 0.1, 0.9])]}
+            with silenced():
+                result = market_correlation(report, store, parse_symbol_pairs(load_config(config_path)))
+        self.assertEqual(set(result), {'BTC', 'ETH'})
+        self.assertEqual(result['BTC']['pairs'], 4)  # backfilled past HISTORY_DAYS to the first record
+        self.assertIsNotNone(result['BTC']['correlation'])
+        self.assertEqual(result['ETH'], {'correlation': None, 'pairs': 0})
+        self.assertEqual(set(exchange.symbols), {'BTC/USDT', 'ETH/USDT'})
+
+
+class _PairOnlyExchange:
+    """fetch_ohlcv stub that only lists one pair, like ccxt raising BadSymbol for 'BTC'."""
+    def __init__(self, pair, start, candles):
+        self.pair = pair
+        self.symbols = []
+        self.rows = [[int((start + i * 3600) * 1000), 100.0 + i % 3, 0, 0, 100.0 + (i * 7) % 5, 1.0]
+                     for i in range(candles)]
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.symbols.append(symbol)
+        if symbol != self.pair:
+            raise ValueError(f"unknown symbol {symbol}")
+        return [r for r in self.rows if r[0] >= since][:limit]
+
+
+class _RecordedFetcher:
+    feed_cache = None
+
+    def __init__(self, tweets):
+        self.tweets = tweets
+
+    def fetch_rsshub_twitter(self, rsshub_url, max_items=None):
+        return self.tweets[:max_items]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.ingestion import Ingestion, Source, items_from_reddit
+from core.reddit_stream import RedditStream
+from pipeline_daemon import PipelineDaemon
+
+
+class FakeSubmission:
+    def __init__(self, post_id, created_utc, subreddit='Bitcoin'):
+        self.id = post_id
+        self.created_utc = created_utc
+        self.subreddit = subreddit
+        self.title = f"post {post_id}"
+        self.selftext = "body"
+        self.url = f"https://reddit.com/{post_id}"
+
+
+class FakeReddit:
+    """praw.Reddit stand-in: subreddit(name).stream.submissions() replays ``posts`` then idles."""
+    def __init__(self, posts, fail_first=0):
+        self.posts = posts
+        self.fail_first = fail_first
+        self.names = []
+        self.stream = self
+
+    def subreddit(self, name):
+        self.names.append(name)
+        return self
+
+    def submissions(self, pause_after=None):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise ConnectionError("stream reset")
+        yield from self.posts
+        while True:
+            time.sleep(0.01)
+            yield None
+
+
+class IdleAnalyzer:
+    cache = None
+
+
+def wait_for(stream, n, timeout=2):
+    deadline = time.time() + timeout
+    while stream.queue.qsize() < n and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestRedditStream(unittest.TestCase):
+
+    def test_streams_combined_subreddits_and_resumes_from_checkpoint(self):
+        posts = [FakeSubmission('a', 100), FakeSubmission('b', 200), FakeSubmission('c', 200)]
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, 'reddit.json')
+            reddit = FakeReddit(posts)
+            stream = RedditStream(reddit, ['Bitcoin', ' ethereum '], checkpoint_path=checkpoint).start()
+            wait_for(stream, 3)
+            drained = stream.drain()
+            stream.stop()
+            self.assertEqual(reddit.names, ['Bitcoin+ethereum'])
+            self.assertEqual([p['id'] for p in drained], ['a', 'b', 'c'])
+            self.assertEqual(drained[0]['source'], 'Reddit (r/Bitcoin)')
+            # draining alone does not move the checkpoint: uncommitted posts are replayed after a restart
+            self.assertFalse(os.path.exists(checkpoint))
+            stream.commit(['a', 'b', 'c', 'unknown'])
+
+            # after a restart the stream's backlog is replayed, but only the unseen post comes through
+            restarted = RedditStream(FakeReddit(posts + [FakeSubmission('d', 200), FakeSubmission('e', 300)]),
+                                     ['Bitcoin'], checkpoint_path=checkpoint).start()
+            wait_for(restarted, 2)
+            time.sleep(0.05)
+            self.assertEqual([p['id'] for p in restarted.drain()], ['d', 'e'])
+            restarted.stop()
+
+    def test_bounded_queue_and_reconnect(self):
+        posts = [FakeSubmission(str(i), i) for i in range(1, 6)]
+        stream = RedditStream(FakeReddit(posts, fail_first=1), ['Bitcoin'], queue_size=2,
+                              retry_base_delay=0.01).start()
+        wait_for(stream, 2)
+        time.sleep(0.05)
+        self.assertEqual(stream.queue.qsize(), 2)  # the worker waits instead of growing the queue
+        received = []
+        deadline = time.time() + 2
+        while len(received) < 5 and time.time() < deadline:
+            received.extend(p['id'] for p in stream.drain())
+            time.sleep(0.01)
+        stream.stop()
+        self.assertEqual(received, ['1', '2', '3', '4', '5'])
+
+    def test_reconnect_skips_uncommitted_posts(self):
+        posts = [FakeSubmission('a', 100), FakeSubmission('b', 200)]
+
+        class FlakyReddit(FakeReddit):
+            """Replays its posts, then drops the connection once."""
+            def submissions(self, pause_after=None):
+                yield from self.posts
+                if not self.fail_first:
+                    self.fail_first = 1
+                    raise ConnectionError("stream reset")
+                while True:
+                    time.sleep(0.01)
+                    yield None
+
+        stream = RedditStream(FlakyReddit(posts), ['Bitcoin'], retry_base_delay=0.01).start()
+        wait_for(stream, 2)
+        drained = stream.drain()
+        time.sleep(0.1)
+        self.assertEqual([p['id'] for p in drained + stream.drain()], ['a', 'b'])
+        stream.commit(['a'])
+        self.assertEqual(stream.checkpoint, {'created_utc': 100.0, 'ids': {'a'}})
+        stream.stop()
+
+    def test_seen_posts_are_committed(self):
+        """A drained post that is already in the seen store is committed instead of pending forever."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.ini')
+            with open(config_path, 'w') as f:
+                f.write("[Trading]\nSYMBOLS = BTC/USDT\n[Cache]\nFEED_CACHE = false\nLLM_CACHE = false\n"
+                        "[Dedupe]\nENABLED = false\n[Ingestion]\nSOURCES = twitter_home\n")
+            daemon = PipelineDaemon(config_path, llm_analyzer=IdleAnalyzer())
+            stream = RedditStream(FakeReddit([FakeSubmission('a', 100), FakeSubmission('b', 200)]), ['Bitcoin'],
+                                  key=lambda post: items_from_reddit([post])[0].id).start()
+            daemon.ingestion.sources['reddit_stream'] = Source('reddit_stream', lambda: items_from_reddit(stream.drain()),
+                                                               commit=stream.commit, release=stream.release)
+            try:
+                wait_for(stream, 2)
+                seen = items_from_reddit([stream.queue.queue[0]])[0].id
+                daemon.seen_store.update([seen])
+                daemon._fetch('reddit_stream')
+                self.assertEqual(stream.checkpoint, {'created_utc': 100.0, 'ids': {'a'}})
+                self.assertEqual([p['id'] for p in stream._pending.values()], ['b'])
+                # the new post is committed together with its batch
+                daemon.batcher.get_batch(timeout=0)
+                daemon.ingestion.commit(list(daemon.seen.pending))
+                self.assertEqual(stream._pending, {})
+            finally:
+                stream.stop()
+                daemon.ingestion.close()
+                daemon.seen_store.close()
+
+    def test_posts_discarded_after_deadline_are_drained_again(self):
+        stream = RedditStream(FakeReddit([FakeSubmission('a', 100)]), ['Bitcoin'],
+                              key=lambda post: items_from_reddit([post])[0].id).start()
+
+        def slow_drain():
+            posts = stream.drain()
+            time.sleep(0.2)
+            return items_from_reddit(posts)
+
+        ingestion = Ingestion([Source('reddit_stream', slow_drain, deadline=0.05,
+                                      commit=stream.commit, release=stream.release)])
+        try:
+            wait_for(stream, 1)
+            self.assertEqual(ingestion.collect(), [])
+            self.assertEqual(ingestion.last_status['reddit_stream'], 'timeout')
+            time.sleep(0.3)  # the late result comes in and is handed back
+            item_ids = [item.id for item in items_from_reddit(stream.drain())]
+            self.assertEqual(len(item_ids), 1)
+            stream.commit(item_ids)
+            self.assertEqual(stream._pending, {})
+            self.assertEqual(stream.checkpoint, {'created_utc': 100.0, 'ids': {'a'}})
+        finally:
+            stream.stop()
+            ingestion.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
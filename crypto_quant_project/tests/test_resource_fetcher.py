@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.resource_fetcher import ResourceFetcher
+
+
+def make_fetcher(base_url, per_host_limit=2, timeout=5):
+    with tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False) as f:
+        f.write(f"[Cache]\nFEED_CACHE = false\n[Fetch]\nRSSHUB_BASE_URL = {base_url}\nMAX_WORKERS = 8\n"
+                f"PER_HOST_LIMIT = {per_host_limit}\nTIMEOUT = {timeout}\n")
+    try:
+        return ResourceFetcher(config_file=f.name)
+    finally:
+        os.remove(f.name)
+
+
+class TestConcurrentFetch(unittest.TestCase):
+
+    def test_concurrent_matches_serial_order(self):
+        """Concurrent fetching returns the same tweets in the same order as the serial path."""
+        users = [f"user{i}" for i in range(6)]
+        with FakeRssHub(latency=0.05, items_per_feed=3) as hub:
+            fetcher = make_fetcher(hub.base_url)
+            serial = fetcher.fetch_nitter_rss(users)
+            concurrent = fetcher.fetch_nitter_rss_concurrent(users)
+            by_user = fetcher.fetch_users_concurrently(['b', 'a'])
+        self.assertEqual(len(serial), 18)
+        self.assertEqual([t['url'] for t in serial], [t['url'] for t in concurrent])
+        self.assertEqual(list(by_user.keys()), ['b', 'a'])
+        self.assertTrue(all(by_user.values()))
+
+    def test_per_host_limit(self):
+        """No more than PER_HOST_LIMIT requests are in flight against one host."""
+        with FakeRssHub(latency=0.1, items_per_feed=1) as hub:
+            fetcher = make_fetcher(hub.base_url, per_host_limit=2)
+            fetcher.fetch_users_concurrently([f"user{i}" for i in range(8)])
+        self.assertEqual(hub.requests, 8)
+        self.assertLessEqual(hub.max_in_flight, 2)
+
+    def test_timeout_yields_empty_result(self):
+        """A request slower than TIMEOUT produces an empty list instead of blocking the cycle."""
+        with FakeRssHub(latency=0.5, items_per_feed=1) as hub:
+            fetcher = make_fetcher(hub.base_url, timeout=0.1)
+            results = fetcher.fetch_users_concurrently(['slow'])
+        self.assertEqual(results, {'slow': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,28 +3,54 @@
 """
 fetch_tweets.py
 
-可执行脚本：使用 undetected_chromedriver 绕过 Cloudflare，抓取 lightbrd.com 上的推文；结果保存为 CSV。
+可执行脚本：使用 undetected_chromedriver 绕过 Cloudflare，抓取 lightbrd.com 上的推文；结果保存为 CSV 或 JSONL。
+
+两种模式：
+  incremental（默认）每次下拉后只取新出现的推文节点，用流式HTML解析器（html.parser，不建DOM）解析，
+                     边抓边去重并逐批写入文件；下拉后轮询节点数而不是固定等待，某次下拉没有新推文即提前结束；
+                     多个关键词可并行抓取（每个关键词一个浏览器）。
+  full               原有方式：固定等待，全部下拉完后用 BeautifulSoup 解析整页，一次性写入 CSV。
 
 依赖：
-  pip install undetected-chromedriver beautifulsoup4 pandas
+  pip install undetected-chromedriver            # full 模式另需 beautifulsoup4
 """
 import argparse
 import csv
+import hashlib
+import json
+import threading
 import time
-from bs4 import BeautifulSoup
-import undetected_chromedriver as uc
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+SEARCH_URL = "https://lightbrd.com/search?f=tweets&q={query}"
+CARD_SELECTOR = 'div[class*="tweetCard"], article'
+FIELDS = ['created_at', 'user', 'text', 'url', 'query']
+
+# 从第 arguments[1] 个推文节点开始，返回之后所有节点的 outerHTML（只传输新增部分）
+NEW_CARDS_JS = ("return Array.from(document.querySelectorAll(arguments[0]))"
+                ".slice(arguments[1]).map(function (e) { return e.outerHTML; });")
+COUNT_CARDS_JS = "return document.querySelectorAll(arguments[0]).length;"
+SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight);"
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(description="抓取 lightbrd.com 搜索推文并导出 CSV")
-    parser.add_argument("-q", "--query", required=True, help="搜索关键词 (e.g. acconebtc)")
-    parser.add_argument("-n", "--scrolls", type=int, default=5, help="下拉加载次数, 默认 5")
-    parser.add_argument("-o", "--output", default="tweets.csv", help="输出 CSV 文件名")
+    parser = argparse.ArgumentParser(description="抓取 lightbrd.com 搜索推文并导出 CSV / JSONL")
+    parser.add_argument("-q", "--query", required=True, nargs='+', help="搜索关键词，可多个 (e.g. acconebtc bitcoin)")
+    parser.add_argument("-n", "--scrolls", type=int, default=5, help="最多下拉加载次数, 默认 5")
+    parser.add_argument("-o", "--output", default="tweets.csv", help="输出文件名，.jsonl 结尾时写 JSON Lines")
     parser.add_argument("--headless", action="store_true", help="是否以无头模式运行浏览器")
+    parser.add_argument("--mode", choices=['incremental', 'full'], default='incremental')
+    parser.add_argument("--parallel", type=int, default=4, help="同时抓取的关键词数（incremental 模式）")
+    parser.add_argument("--timeout", type=float, default=10.0, help="每次下拉后等待新推文的最长秒数")
+    parser.add_argument("--patience", type=int, default=0, help="连续多少次下拉没有新推文后停止，默认 0 即第一次就停止")
     return parser.parse_args()
 
 
 def init_driver(headless: bool = False):
+    import undetected_chromedriver as uc
     options = uc.ChromeOptions()
     if headless:
         options.add_argument('--headless=new')
@@ -34,14 +60,212 @@ def init_driver(headless: bool = False):
     return driver
 
 
+class TweetCardParser(HTMLParser):
+    """
+    Streaming extractor for tweet cards (``div[class*="tweetCard"]`` / ``article``) that
+    applies the same field rules as the BeautifulSoup version without building a DOM:
+    user = first ``a[href*="twitter.com"]``, text = ``div[class*="textContent"]`` or else the
+    first ``p``, created_at = ``time[datetime]`` or the time's text, url = first status link.
+    Works on a whole page or on a list of card fragments fed one after another.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards = []
+        self._card = None
+        self._stack = []      # tags open inside the current card, the card itself first
+        self._captures = []   # [(field, stack depth at which it started)]
+
+    def _start_capture(self, field):
+        self._card[field] = []
+        self._captures.append((field, len(self._stack)))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = attrs.get('class') or ''
+        if self._card is None:
+            if tag == 'article' or (tag == 'div' and 'tweetCard' in classes):
+                self._card = {}
+                self._stack = [tag]
+            return
+        if tag in VOID_TAGS:
+            return
+        self._stack.append(tag)
+        href = attrs.get('href') or ''
+        if tag == 'a' and 'twitter.com' in href:
+            if 'user' not in self._card:
+                self._start_capture('user')
+            if '/status/' in href and 'url' not in self._card:
+                self._card['url'] = href
+        elif tag == 'div' and 'textContent' in classes and 'text' not in self._card:
+            self._start_capture('text')
+        elif tag == 'p' and 'p' not in self._card:
+            self._start_capture('p')
+        elif tag == 'time' and 'created_at' not in self._card:
+            if attrs.get('datetime'):
+                self._card['created_at'] = attrs['datetime']
+            else:
+                self._start_capture('created_at')
+
+    def handle_endtag(self, tag):
+        if self._card is None or tag not in self._stack:
+            return
+        while self._stack:  # also closes tags the page left open
+            if self._stack.pop() == tag:
+                break
+        self._captures = [(field, depth) for field, depth in self._captures if depth <= len(self._stack)]
+        if not self._stack:
+            self._finish_card()
+
+    def handle_data(self, data):
+        for field, _ in self._captures:
+            self._card[field].append(data)
+
+    def _finish_card(self):
+        card, self._card, self._captures = self._card, None, []
+
+        def text_of(field):
+            value = card.get(field)
+            if isinstance(value, list):
+                value = ' '.join(''.join(value).split())
+            return value or None
+
+        text = text_of('text') or text_of('p')
+        if text:
+            self.cards.append({'created_at': text_of('created_at'), 'user': text_of('user'), 'text': text,
+                               'url': card.get('url')})
+
+
+def parse_cards(html_fragments):
+    """Tweets in a page (str) or in a list of card outerHTML fragments."""
+    parser = TweetCardParser()
+    for fragment in [html_fragments] if isinstance(html_fragments, str) else html_fragments:
+        parser.feed(fragment)
+    parser.close()
+    return parser.cards
+
+
+def tweet_key(tweet):
+    """Status URL if the card has one, otherwise a digest of user + time + text."""
+    if tweet.get('url'):
+        return tweet['url']
+    raw = '\x1f'.join(str(tweet.get(f) or '') for f in ('user', 'created_at', 'text'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SeenTweets:
+    """Thread-safe set of tweet keys shared by all queries."""
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def add(self, tweet):
+        """True if the tweet was not seen before."""
+        key = tweet_key(tweet)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class TweetWriter:
+    """Appends rows to a CSV (header first) or, for *.jsonl, JSON Lines; flushed after every batch."""
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.jsonl = path.endswith('.jsonl')
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+    def write(self, tweets, query=None):
+        if not tweets:
+            return
+        rows = [dict({f: tweet.get(f) for f in FIELDS}, query=query) for tweet in tweets]
+        with self._lock:
+            for row in rows:
+                if self.jsonl:
+                    self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+                else:
+                    self._csv.writerow(row)
+            self._file.flush()
+            self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+
+def wait_for_cards(driver, more_than, timeout, poll=0.25):
+    """轮询推文节点数，超过 more_than 即返回（不再固定等待）；超时返回当前节点数。"""
+    deadline = time.monotonic() + timeout
+    while True:
+        count = driver.execute_script(COUNT_CARDS_JS, CARD_SELECTOR)
+        if count > more_than or time.monotonic() >= deadline:
+            return count
+        time.sleep(poll)
+
+
+def scrape_incremental(query, writer, seen, scrolls=5, timeout=10.0, patience=0, headless=False,
+                       driver_factory=init_driver, poll=0.25):
+    """
+    增量抓取一个关键词：每次下拉后只解析新增的推文节点，去重后立即写入 writer。
+    连续 patience+1 次下拉没有新推文时提前结束。返回写入的新推文数。
+    """
+    driver = driver_factory(headless=headless)
+    written = idle = offset = 0
+    try:
+        driver.get(SEARCH_URL.format(query=query))
+        wait_for_cards(driver, 0, timeout, poll)
+        for scroll in range(scrolls + 1):
+            fragments = driver.execute_script(NEW_CARDS_JS, CARD_SELECTOR, offset)
+            offset += len(fragments)
+            fresh = [t for t in parse_cards(fragments) if seen.add(t)]
+            writer.write(fresh, query)
+            written += len(fresh)
+            idle = 0 if fresh else idle + 1
+            print(f"[{query}] 第 {scroll} 次下拉：新节点 {len(fragments)} 个，新推文 {len(fresh)} 条")
+            if idle > patience or scroll == scrolls:
+                break
+            driver.execute_script(SCROLL_JS)
+            wait_for_cards(driver, offset, timeout, poll)
+    finally:
+        driver.quit()
+    return written
+
+
+def scrape_queries(queries, output, parallel=4, **kwargs):
+    """多个关键词并行增量抓取，共享去重集合与输出文件。返回 {关键词: 新推文数}。"""
+    writer = TweetWriter(output)
+    seen = SeenTweets()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(queries)))) as pool:
+            futures = {q: pool.submit(scrape_incremental, q, writer, seen, **kwargs) for q in queries}
+            results = {}
+            for query, future in futures.items():
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    print(f"[{query}] 抓取失败: {e}")
+                    results[query] = 0
+            return results
+    finally:
+        writer.close()
+
+
 def fetch_tweets_via_selenium(query: str, scrolls: int, delay: float, headless: bool):
+    from bs4 import BeautifulSoup
     driver = init_driver(headless=headless)
     try:
-        url = f"https://lightbrd.com/search?f=tweets&q={query}"
+        url = SEARCH_URL.format(query=query)
         driver.get(url)
         time.sleep(delay)
         for _ in range(scrolls):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            driver.execute_script(SCROLL_JS)
             time.sleep(delay)
         html = driver.page_source
     finally:
@@ -50,7 +274,7 @@ def fetch_tweets_via_selenium(query: str, scrolls: int, delay: float, headless:
     soup = BeautifulSoup(html, 'html.parser')
     tweets = []
     # 根据页面结构提取推文元素
-    for card in soup.select('div[class*="tweetCard"], article'):  # 支持多种可能结构
+    for card in soup.select(CARD_SELECTOR):  # 支持多种可能结构
         user_el = card.select_one('a[href*="twitter.com"]')
         text_el = card.select_one('div[class*="textContent"]') or card.select_one('p')
         time_el = card.select_one('time')
@@ -77,9 +301,17 @@ def save_to_csv(data, output_file):
 def main():
     args = parse_args()
     print("开始使用 Selenium 绕过 Cloudflare 抓取推文...")
-    tweets = fetch_tweets_via_selenium(args.query, scrolls=args.scrolls, delay=2.0, headless=args.headless)
-    print(f"共抓取到 {len(tweets)} 条推文。")
-    save_to_csv(tweets, args.output)
+    if args.mode == 'full':
+        tweets = [t for q in args.query
+                  for t in fetch_tweets_via_selenium(q, scrolls=args.scrolls, delay=2.0, headless=args.headless)]
+        print(f"共抓取到 {len(tweets)} 条推文。")
+        save_to_csv(tweets, args.output)
+        return
+    start = time.monotonic()
+    results = scrape_queries(args.query, args.output, parallel=args.parallel, scrolls=args.scrolls,
+                             timeout=args.timeout, patience=args.patience, headless=args.headless)
+    print(f"共抓取到 {sum(results.values())} 条新推文（{time.monotonic() - start:.1f}s），已写入 {args.output}：" +
+          "，".join(f"{q} {n} 条" for q, n in results.items()))
 
 
 if __name__ == '__main__':
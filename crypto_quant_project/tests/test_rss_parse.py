@@ -0,0 +1,111 @@
+import unittest
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from test_rss import (COUNT_CARDS_JS, NEW_CARDS_JS, SCROLL_JS, SeenTweets, TweetWriter, parse_cards, scrape_incremental,
+                      scrape_queries)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'lightbrd_search.html')
+
+
+def card_fragments(html):
+    """Top-level tweet cards of the fixture, as the browser's outerHTML would return them."""
+    body = html[html.index('<div class="timeline">') + len('<div class="timeline">'):html.rindex('</div>\n</main>')]
+    return [m.group(0) for m in re.finditer(r'\n    (<(div|article)\b.*?\n    </\2>)', body, re.S)]
+
+
+class FakeDriver:
+    """Serves one page of card fragments per scroll through the same execute_script calls as Chrome."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.loaded = 1
+        self.calls = []
+
+    def cards(self):
+        return [c for page in self.pages[:self.loaded] for c in page]
+
+    def get(self, url):
+        self.calls.append(url)
+
+    def execute_script(self, script, *args):
+        if script == COUNT_CARDS_JS:
+            return len(self.cards())
+        if script == NEW_CARDS_JS:
+            return self.cards()[args[1]:]
+        if script == SCROLL_JS:
+            self.loaded += 1
+            self.calls.append('scroll')
+
+    def quit(self):
+        self.calls.append('quit')
+
+
+class TestTweetCardParser(unittest.TestCase):
+
+    def setUp(self):
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.html = f.read()
+
+    def test_full_page(self):
+        tweets = parse_cards(self.html)
+        self.assertEqual(tweets[0], {'created_at': '2025-06-23T08:00:00.000Z', 'user': '@acconebtc',
+                                     'text': 'BTC breaking out & bullish above 70k',
+                                     'url': 'https://twitter.com/acconebtc/status/1001'})
+        self.assertEqual(tweets[1], {'created_at': '2h', 'user': 'Whale Alert',
+                                     'text': '10,000 ETH transferred to Binance', 'url': None})
+        # the image-only card has no text and is skipped; the nested card counts once
+        self.assertEqual([t['text'] for t in tweets[2:]], ['ETH/BTC at support 🚀', 'BTC breaking out & bullish above 70k'])
+
+    def test_fragments_parse_like_the_page(self):
+        fragments = card_fragments(self.html)
+        self.assertEqual(len(fragments), 5)
+        self.assertEqual(parse_cards(fragments), parse_cards(self.html))
+
+    def test_dedupe_by_status_url(self):
+        seen = SeenTweets()
+        fresh = [t for t in parse_cards(self.html) if seen.add(t)]
+        self.assertEqual(len(fresh), 3)
+
+
+class TestIncrementalScrape(unittest.TestCase):
+
+    def test_streams_new_cards_and_stops_when_a_scroll_adds_nothing(self):
+        with open(FIXTURE, encoding='utf-8') as f:
+            cards = card_fragments(f.read())
+        # scroll 1 repeats a tweet already seen, scroll 2 adds nothing new -> stop before scroll 3
+        driver = FakeDriver([cards[:2], cards[2:4], cards[4:], cards[:1]])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tweets.jsonl')
+            writer = TweetWriter(path)
+            written = scrape_incremental('acconebtc', writer, SeenTweets(), scrolls=10, timeout=0.01,
+                                         driver_factory=lambda headless: driver, poll=0)
+            writer.close()
+            with open(path, encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual(written, 3)
+        self.assertEqual([r['query'] for r in rows], ['acconebtc'] * 3)
+        self.assertEqual(driver.calls.count('scroll'), 2)
+        self.assertEqual(driver.calls[-1], 'quit')
+
+    def test_parallel_queries_share_dedupe_and_csv(self):
+        with open(FIXTURE, encoding='utf-8') as f:
+            cards = card_fragments(f.read())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tweets.csv')
+            results = scrape_queries(['a', 'b'], path, parallel=2, scrolls=0, timeout=0.01,
+                                     driver_factory=lambda headless: FakeDriver([cards]), poll=0)
+            with open(path, encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(sum(results.values()), 3)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0]), ['created_at', 'user', 'text', 'url', 'query'])
+
+
+if __name__ == '__main__':
+    unittest.main()
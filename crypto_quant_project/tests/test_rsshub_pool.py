@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_rsshub import FakeRssHub
+from core.resource_fetcher import ResourceFetcher
+from core.rsshub_pool import NoHealthyInstance, RssHubPool
+from utils.logger import metrics, silenced
+
+URLS = ['http://hub-a:1200', 'http://hub-b:1200', 'http://hub-c:1200']
+USERS = [f"user{i}" for i in range(300)]
+
+
+def make_fetcher(base_urls):
+    with tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False) as f:
+        f.write(f"[Cache]\nFEED_CACHE = false\n[Fetch]\nRSSHUB_BASE_URLS = {', '.join(base_urls)}\n"
+                f"TIMEOUT = 5\nRSSHUB_FAILURE_THRESHOLD = 1\nRSSHUB_RESET_SECONDS = 300\n")
+    try:
+        return ResourceFetcher(config_file=f.name)
+    finally:
+        os.remove(f.name)
+
+
+class TestRssHubPool(unittest.TestCase):
+
+    def test_sharding_is_stable_and_spread(self):
+        """Users spread over all instances; removing one instance only moves the users it had."""
+        before = {u: i.base_url for u, i in RssHubPool(URLS).assignment(USERS).items()}
+        self.assertEqual(before, {u: i.base_url for u, i in RssHubPool(URLS).assignment(USERS).items()})
+        counts = {url: list(before.values()).count(url) for url in URLS}
+        self.assertTrue(all(60 < n < 140 for n in counts.values()), counts)
+
+        after = {u: i.base_url for u, i in RssHubPool(URLS[:2]).assignment(USERS).items()}
+        moved = [u for u in USERS if before[u] != after[u]]
+        self.assertEqual(set(moved), {u for u in USERS if before[u] == URLS[2]})
+
+    def test_slow_instance_sheds_users(self):
+        pool = RssHubPool(URLS)
+        for instance, seconds in zip(pool.instances, (0.1, 0.1, 0.5)):
+            instance.record_success(seconds, probe=True)
+        self.assertEqual(list(pool.weights().values()), [1.0, 1.0, 0.25])
+        share = sum(i is pool.instances[2] for i in pool.assignment(USERS).values()) / len(USERS)
+        self.assertLess(share, 0.2)
+
+    def test_failover_and_health_check(self):
+        """A down instance's users are served by another instance until a health check succeeds."""
+        with FakeRssHub(items_per_feed=2) as hub_a, FakeRssHub(items_per_feed=2) as hub_b:
+            fetcher = make_fetcher([hub_a.base_url, hub_b.base_url])
+            pool = fetcher.rsshub_pool
+            users = USERS[:20]
+            hub_a.down = True
+            with silenced():
+                results = fetcher.fetch_users_concurrently(users)
+            self.assertTrue(all(len(tweets) == 2 for tweets in results.values()))
+            down, up = pool.instances
+            self.assertFalse(down.healthy)
+            self.assertEqual(up.items, 40)
+            self.assertEqual(metrics.counter('rsshub_items_total', instance=up.name), 40)
+
+            with silenced():
+                self.assertEqual(pool.check_health(fetcher.session), {hub_a.base_url: False, hub_b.base_url: True})
+            hub_a.down = False
+            self.assertEqual(pool.check_health(fetcher.session), {hub_a.base_url: True, hub_b.base_url: True})
+            home = fetcher.fetch_rsshub_twitter(f"{hub_a.base_url}/twitter/home_latest", raise_errors=True)
+            self.assertEqual(len(home), 2)
+
+            hub_a.down = hub_b.down = True
+            with silenced():
+                self.assertEqual(fetcher.fetch_users_concurrently(['x']), {'x': []})
+                with self.assertRaises(NoHealthyInstance):
+                    fetcher.fetch_rsshub_route('twitter/user/x', raise_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
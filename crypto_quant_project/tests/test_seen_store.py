@@ -0,0 +1,60 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.seen_store import SeenStore, content_digest
+
+
+class TestSeenStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'seen.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_digest_is_stable(self):
+        """Digests ignore whitespace differences and do not depend on PYTHONHASHSEED."""
+        self.assertEqual(content_digest("BTC  to the\nmoon"), content_digest("BTC to the moon"))
+        self.assertEqual(content_digest("abc"), "sha1:a9993e364706816aba3e25717850c26c9cd0d89d")
+
+    def test_persists_across_reopen(self):
+        store = SeenStore(self.db_path)
+        store.update(['a', 'b'])
+        store.add('a')
+        store.close()
+        reopened = SeenStore(self.db_path)
+        self.assertIn('a', reopened)
+        self.assertIn('b', reopened)
+        self.assertEqual(len(reopened), 2)
+        reopened.close()
+
+    def test_ttl_and_size_eviction(self):
+        store = SeenStore(self.db_path, ttl_days=1, max_items=3)
+        store.update(['old'], seen_at=0)
+        store.update(['x1', 'x2', 'x3', 'x4'])
+        removed = store.prune()
+        self.assertEqual(removed, 2)
+        self.assertNotIn('old', store)
+        self.assertEqual(len(store), 3)
+        store.close()
+
+    def test_migrate_from_json(self):
+        legacy = os.path.join(self.tmp.name, 'tweet_log.json')
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump(['https://twitter.com/a/status/1', '-123456789'], f)
+        store = SeenStore(self.db_path)
+        self.assertEqual(store.migrate_from_json(legacy), 1)
+        self.assertIn('https://twitter.com/a/status/1', store)
+        self.assertFalse(os.path.exists(legacy))
+        self.assertEqual(store.migrate_from_json(legacy), 0)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
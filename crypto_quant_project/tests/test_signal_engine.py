@@ -0,0 +1,76 @@
+import unittest
+import math
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.prescorer import PreScorer
+from core.signal_engine import SignalEngine, SymbolSeries
+from main_twitter_llm import generate_symbol_signals
+
+
+class BatchAnalyzer:
+    def __init__(self, score):
+        self.score = score
+        self.batches = []
+
+    def analyze_batch(self, items):
+        self.batches.append(items)
+        return {item['id']: {'sentiment_score': self.score, 'confidence': 1.0} for item in items}
+
+
+class TestSignalEngine(unittest.TestCase):
+
+    def test_decay_weighting(self):
+        engine = SignalEngine(['BTC'], half_life_seconds=100, min_weight=0)
+        engine.update('BTC', [0], [1.0], [1.0])
+        engine.update('BTC', [100], [-1.0], [1.0])
+        score, weight = engine.score('BTC', now=100)
+        # the older item counts half: (0.5 * 1 - 1) / 1.5
+        self.assertAlmostEqual(score, -1 / 3, places=5)
+        self.assertAlmostEqual(weight, 1.5, places=5)
+        self.assertAlmostEqual(engine.score('BTC', now=200)[1], 0.75, places=5)
+
+    def test_ring_buffer_matches_full_recompute(self):
+        series = SymbolSeries(capacity=8, decay_rate=math.log(2) / 50)
+        for t in range(0, 100, 3):
+            series.append([t, t + 1, t + 2], [0.5, -0.2, 0.9], [1.0, 0.5, 0.25])
+        incremental = (series.s_sum, series.w_sum)
+        series.recompute()
+        self.assertEqual(series.count, 8)
+        self.assertAlmostEqual(incremental[0], series.s_sum, places=5)
+        self.assertAlmostEqual(incremental[1], series.w_sum, places=5)
+
+    def test_per_symbol_thresholds_and_min_weight(self):
+        engine = SignalEngine(['BTC', 'ETH', 'SOL'], thresholds={'ETH': (0.5, -0.5)}, min_weight=0.5)
+        engine.update('BTC', [0], [0.3], [1.0])
+        engine.update('ETH', [0], [0.3], [1.0])
+        engine.update('SOL', [0], [0.9], [0.1])
+        self.assertEqual(engine.signals(now=0), {'BTC': 'BUY', 'ETH': 'HOLD', 'SOL': 'HOLD'})
+
+    def test_save_and_load(self):
+        engine = SignalEngine(['BTC'], capacity=4)
+        engine.update('BTC', [1, 2, 3, 4, 5], [0.1, 0.2, 0.3, 0.4, 0.5], [1, 1, 1, 1, 1])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.npz')
+            engine.save(path)
+            restored = SignalEngine(['BTC'], capacity=4)
+            self.assertTrue(restored.load(path))
+        self.assertEqual(restored.series['BTC'].count, 4)
+        for a, b in zip(engine.score('BTC', now=10), restored.score('BTC', now=10)):
+            self.assertAlmostEqual(a, b, places=5)
+
+    def test_generate_symbol_signals(self):
+        engine = SignalEngine(['BTC', 'ETH'], min_weight=0.1)
+        analyzer = BatchAnalyzer(score=-0.8)
+        prescorer = PreScorer(['BTC', 'ETH'])
+        texts = ["Bitcoin rally: bullish breakout to a new ATH", "ETH price update", "lunch"]
+        signals = generate_symbol_signals(analyzer, texts, ['BTC', 'ETH'], engine, prescorer, now=0)
+        self.assertEqual(signals, {'BTC': 'BUY', 'ETH': 'SELL'})
+        self.assertEqual([item['text'] for item in analyzer.batches[0]], ["ETH price update"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.token_budget import estimate_tokens, pack_texts
+from main_twitter_llm import generate_signal_from_llm, merge_analyses
+
+
+class FakeAnalyzer:
+    def __init__(self, score):
+        self.score = score
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def analyze_text(self, text):
+        with self.lock:
+            self.prompts.append(text)
+        return {'sentiment_score': self.score, 'confidence': 0.8}
+
+
+class TestTokenBudget(unittest.TestCase):
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("比特币"), 3)
+
+    def test_pack_texts_respects_budget_and_order(self):
+        texts = [f"tweet number {i} " * 5 for i in range(50)]
+        chunks = pack_texts(texts, max_tokens=100)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([t for chunk in chunks for t in chunk], texts)
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(t) + 1 for t in chunk), 100)
+
+    def test_oversized_text_is_truncated(self):
+        chunks = pack_texts(["x" * 4000, "short"], max_tokens=50)
+        self.assertEqual(len(chunks), 2)
+        self.assertLessEqual(estimate_tokens(chunks[0][0]), 49)
+
+    def test_merge_is_confidence_weighted(self):
+        merged = merge_analyses([{'sentiment_score': 1.0, 'confidence': 0.9},
+                                 {'sentiment_score': -1.0, 'confidence': 0.1},
+                                 None], weights=[1, 1, 5])
+        self.assertAlmostEqual(merged['sentiment_score'], 0.8)
+        self.assertAlmostEqual(merged['confidence'], 0.5)
+        self.assertIsNone(merge_analyses([None], [1]))
+
+    def test_generate_signal_map_reduce(self):
+        analyzer = FakeAnalyzer(score=0.5)
+        texts = [f"BTC headline {i} " * 20 for i in range(40)]
+        signals = generate_signal_from_llm(analyzer, texts, ['BTC', 'ETH'], chunk_tokens=800, parallelism=3)
+        self.assertGreater(len(analyzer.prompts), 1)
+        self.assertEqual(signals, {'BTC': 'BUY', 'ETH': 'BUY'})
+
+
+if __name__ == '__main__':
+    unittest.main()
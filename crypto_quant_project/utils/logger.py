@@ -0,0 +1,266 @@
+"""
+Logging and metrics for the pipeline.
+
+- ``get_logger(name)`` returns a logger under the ``crypto_quant`` namespace; ``setup_logging``
+  configures level, text or JSON-lines output and an optional log file once at startup.
+  Extra fields passed as ``extra={...}`` appear as keys of the JSON record.
+- Per-item output (every fetched tweet) goes to the ``crypto_quant.items`` logger, which is
+  silent unless ``verbose_items`` is enabled.
+- ``metrics`` is the process-wide registry of counters and timing spans; it renders the
+  Prometheus text exposition format or a JSON snapshot, and ``MetricsExporter`` writes
+  either one to a file periodically.
+"""
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+ROOT_LOGGER = 'crypto_quant'
+ITEMS_LOGGER = ROOT_LOGGER + '.items'
+METRIC_PREFIX = 'crypto_quant_'
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus any ``extra`` fields."""
+    def format(self, record):
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        payload.update({k: v for k, v in vars(record).items() if k not in _RESERVED and not k.startswith('_')})
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging(level='INFO', fmt='text', log_file=None, verbose_items=False):
+    """
+    Configures the ``crypto_quant`` logger hierarchy (idempotent; replaces earlier handlers).
+    :param fmt: 'text' for human-readable lines, 'json' for JSON lines
+    :param log_file: also append to this file when set
+    :param verbose_items: log every fetched item on ``crypto_quant.items``
+    """
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    formatter = JsonFormatter() if fmt == 'json' else logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s', '%Y-%m-%d %H:%M:%S')
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        directory = os.path.dirname(os.path.abspath(log_file))
+        os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+    logging.getLogger(ITEMS_LOGGER).setLevel(logging.INFO if verbose_items else logging.WARNING)
+    return root
+
+
+def setup_logging_from_config(config, base_dir):
+    """setup_logging with the [Logging] section of a ConfigParser; relative paths are resolved against base_dir."""
+    log_file = config.get('Logging', 'FILE', fallback='') or None
+    if log_file and not os.path.isabs(log_file):
+        log_file = os.path.join(base_dir, log_file)
+    return setup_logging(level=config.get('Logging', 'LEVEL', fallback='INFO'),
+                         fmt=config.get('Logging', 'FORMAT', fallback='text'),
+                         log_file=log_file,
+                         verbose_items=config.getboolean('Logging', 'VERBOSE_ITEMS', fallback=False))
+
+
+@contextlib.contextmanager
+def silenced(level=logging.CRITICAL):
+    """Temporarily raises the level of the whole ``crypto_quant`` hierarchy (e.g. for replays and benchmarks)."""
+    root = logging.getLogger(ROOT_LOGGER)
+    previous = root.level
+    root.setLevel(level)
+    try:
+        yield
+    finally:
+        root.setLevel(previous)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in key)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + '}'
+
+
+class Metrics:
+    """
+    Thread-safe counters and stage timings.
+
+    Counters are monotonically increasing totals keyed by name and labels. Spans record
+    the count, total and maximum seconds per stage and are exported as a Prometheus summary
+    (``<prefix>stage_seconds_count`` / ``_sum``) plus a ``stage_seconds_max`` gauge.
+    """
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}   # name -> {label key: value}
+        self._stages = {}     # stage -> [count, sum, max]
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        if not value:
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextlib.contextmanager
+    def span(self, stage, logger=None):
+        """Times the enclosed block as one observation of ``stage`` (also on error)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(stage, elapsed)
+            if logger is not None and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("stage %s took %.1f ms", stage, elapsed * 1000,
+                             extra={'stage': stage, 'seconds': elapsed})
+
+    def stage(self, stage):
+        """(count, total seconds, max seconds) of a stage."""
+        with self._lock:
+            return tuple(self._stages.get(stage, (0, 0.0, 0.0)))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._stages.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'ts': time.time(),
+                'counters': {name: [dict(key, value=value) for key, value in series.items()]
+                             for name, series in self._counters.items()},
+                'stages': {stage: {'count': c, 'sum_seconds': s, 'max_seconds': m}
+                           for stage, (c, s, m) in self._stages.items()},
+            }
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                full = f"{self.prefix}{name}"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{full}{_format_labels(key)} {value}")
+            if self._stages:
+                full = f"{self.prefix}stage_seconds"
+                lines.append(f"# HELP {full} Wall time spent per pipeline stage.")
+                lines.append(f"# TYPE {full} summary")
+                for stage, (count, total, _) in sorted(self._stages.items()):
+                    label = _format_labels((('stage', stage),))
+                    lines.append(f"{full}_sum{label} {total:.6f}")
+                    lines.append(f"{full}_count{label} {count}")
+                lines.append(f"# TYPE {full}_max gauge")
+                for stage, (_, _, longest) in sorted(self._stages.items()):
+                    lines.append(f"{full}_max{_format_labels((('stage', stage),))} {longest:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, fmt='prometheus'):
+        """Writes the current metrics atomically in 'prometheus' text or 'json' format."""
+        content = self.render_prometheus() if fmt == 'prometheus' else json.dumps(self.snapshot(), ensure_ascii=False)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+metrics.describe('items_fetched_total', 'Items returned by the feeds, before filtering.')
+metrics.describe('items_new_total', 'Items not processed before.')
+metrics.describe('items_collapsed_total', 'New items merged into a near-duplicate cluster.')
+metrics.describe('items_routed_total', 'Items per pre-scorer route (drop/local/llm).')
+metrics.describe('fetch_errors_total', 'Failed feed requests or parses.')
+metrics.describe('feed_early_stops_total', 'Feed parses stopped early (max_items reached or seen tweets).')
+metrics.describe('feed_parse_fallbacks_total', 'Malformed feeds parsed by feedparser instead of the streaming parser.')
+metrics.describe('llm_requests_total', 'LLM API requests sent, including retries.')
+metrics.describe('llm_tokens_total', 'LLM tokens reported by the API (estimated when absent).')
+metrics.describe('llm_errors_total', 'Failed LLM requests.')
+metrics.describe('llm_cache_hits_total', 'LLM answers served from the response cache.')
+
+
+class MetricsExporter:
+    """Background thread writing ``registry`` to ``path`` every ``interval`` seconds (and once on stop)."""
+    def __init__(self, path, fmt='prometheus', interval=15.0, registry=None):
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self.registry = registry or metrics
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            self.registry.write(self.path, self.fmt)
+        except OSError as e:
+            get_logger('metrics').warning("写入指标文件失败: %s", e)
+
+    def start(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._write()
+
+
+def start_metrics_exporter(config, base_dir):
+    """Starts a MetricsExporter from [Logging] METRICS_FILE / METRICS_FORMAT / METRICS_INTERVAL, or returns None."""
+    path = config.get('Logging', 'METRICS_FILE', fallback='')
+    if not path:
+        return None
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    fmt = config.get('Logging', 'METRICS_FORMAT', fallback='prometheus').lower()
+    return MetricsExporter(path, fmt=fmt, interval=config.getfloat('Logging', 'METRICS_INTERVAL', fallback=15)).start()